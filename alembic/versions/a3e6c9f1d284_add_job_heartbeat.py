@@ -0,0 +1,27 @@
+"""add jobs.heartbeat_at
+
+Revision ID: a3e6c9f1d284
+Revises: f1d9b3e7a520
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3e6c9f1d284'
+down_revision: Union[str, None] = 'f1d9b3e7a520'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+    # Jobs running during the upgrade are judged by their start, as before
+    op.execute("UPDATE jobs SET heartbeat_at = started_at WHERE status = 'RUNNING'")
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'heartbeat_at')
@@ -0,0 +1,36 @@
+"""add slug redirects
+
+Revision ID: a7d2e4f6c813
+Revises: f5c1a8e3b902
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d2e4f6c813'
+down_revision: Union[str, None] = 'f5c1a8e3b902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'slug_redirects',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('old_slug', sa.String(length=350), nullable=False),
+        sa.Column('article_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(['article_id'], ['articles.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('old_slug'),
+    )
+    op.create_index(op.f('ix_slug_redirects_article_id'), 'slug_redirects', ['article_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_slug_redirects_article_id'), table_name='slug_redirects')
+    op.drop_table('slug_redirects')
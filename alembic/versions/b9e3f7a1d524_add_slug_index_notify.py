@@ -0,0 +1,45 @@
+"""notify workers when the slug namespace changes
+
+Revision ID: b9e3f7a1d524
+Revises: a7d2e4f6c813
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9e3f7a1d524'
+down_revision: Union[str, None] = 'a7d2e4f6c813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Statement-level and payload-free: Postgres folds duplicate notifications
+    # within a transaction, so a bulk import sends one message on commit.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_slug_index() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('slug_index', '');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER articles_slug_index
+        AFTER INSERT OR DELETE OR UPDATE OF slug, status ON articles
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_slug_index()
+    """)
+    op.execute("""
+        CREATE TRIGGER slug_redirects_slug_index
+        AFTER INSERT OR UPDATE OR DELETE ON slug_redirects
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_slug_index()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS slug_redirects_slug_index ON slug_redirects")
+    op.execute("DROP TRIGGER IF EXISTS articles_slug_index ON articles")
+    op.execute("DROP FUNCTION IF EXISTS notify_slug_index()")
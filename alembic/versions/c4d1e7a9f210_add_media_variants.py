@@ -0,0 +1,40 @@
+"""add media variants
+
+Revision ID: c4d1e7a9f210
+Revises: b5e8d2f43c10
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d1e7a9f210'
+down_revision: Union[str, None] = 'b5e8d2f43c10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'media_variants',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('media_id', sa.Integer(), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=False),
+        sa.Column('width', sa.Integer(), nullable=False),
+        sa.Column('height', sa.Integer(), nullable=False),
+        sa.Column('format', sa.String(length=10), nullable=False),
+        sa.Column('file_size', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(['media_id'], ['media.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('filename'),
+    )
+    op.create_index(op.f('ix_media_variants_media_id'), 'media_variants', ['media_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_media_variants_media_id'), table_name='media_variants')
+    op.drop_table('media_variants')
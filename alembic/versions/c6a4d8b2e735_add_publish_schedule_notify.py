@@ -0,0 +1,37 @@
+"""notify the publish scheduler when schedules change
+
+Revision ID: c6a4d8b2e735
+Revises: b9e3f7a1d524
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6a4d8b2e735'
+down_revision: Union[str, None] = 'b9e3f7a1d524'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_publish_schedule() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('publish_schedule', '');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER articles_publish_schedule
+        AFTER INSERT OR DELETE OR UPDATE OF status, scheduled_publish_at ON articles
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_publish_schedule()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS articles_publish_schedule ON articles")
+    op.execute("DROP FUNCTION IF EXISTS notify_publish_schedule()")
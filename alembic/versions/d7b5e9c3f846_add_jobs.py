@@ -0,0 +1,67 @@
+"""add jobs queue
+
+Revision ID: d7b5e9c3f846
+Revises: c6a4d8b2e735
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7b5e9c3f846'
+down_revision: Union[str, None] = 'c6a4d8b2e735'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'jobs',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('kind', sa.String(length=50), nullable=False),
+        sa.Column('payload', postgresql.JSONB(), nullable=False, server_default='{}'),
+        sa.Column('status', sa.Enum('QUEUED', 'RUNNING', 'DONE', 'FAILED', name='jobstatus'), nullable=False),
+        sa.Column('priority', sa.SmallInteger(), nullable=False, server_default='0'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('max_attempts', sa.Integer(), nullable=False, server_default='5'),
+        sa.Column('dedupe_key', sa.String(length=100), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('run_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('dedupe_key'),
+    )
+    op.create_index(
+        'ix_jobs_queued', 'jobs', [sa.text('priority DESC'), 'run_at'],
+        postgresql_where=sa.text("status = 'QUEUED'"),
+    )
+    op.create_index('ix_jobs_status_finished', 'jobs', ['status', 'finished_at'])
+    # Wake idle workers on LISTEN jobs instead of making them poll
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_jobs() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('jobs', '');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER jobs_notify
+        AFTER INSERT OR UPDATE OF run_at ON jobs
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_jobs()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS jobs_notify ON jobs")
+    op.execute("DROP FUNCTION IF EXISTS notify_jobs()")
+    op.drop_index('ix_jobs_status_finished', table_name='jobs')
+    op.drop_index('ix_jobs_queued', table_name='jobs')
+    op.drop_table('jobs')
+    sa.Enum(name='jobstatus').drop(op.get_bind())
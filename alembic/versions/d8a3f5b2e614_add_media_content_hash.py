@@ -0,0 +1,29 @@
+"""add media content hash and ref count
+
+Revision ID: d8a3f5b2e614
+Revises: c4d1e7a9f210
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a3f5b2e614'
+down_revision: Union[str, None] = 'c4d1e7a9f210'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('media', sa.Column('sha256', sa.String(length=64), nullable=True))
+    op.add_column('media', sa.Column('ref_count', sa.Integer(), nullable=False, server_default='1'))
+    op.create_unique_constraint('media_sha256_key', 'media', ['sha256'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('media_sha256_key', 'media', type_='unique')
+    op.drop_column('media', 'ref_count')
+    op.drop_column('media', 'sha256')
@@ -0,0 +1,62 @@
+"""add media usage
+
+Revision ID: e2b7c9d4a1f3
+Revises: d8a3f5b2e614
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7c9d4a1f3'
+down_revision: Union[str, None] = 'd8a3f5b2e614'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'media_usage',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('media_id', sa.Integer(), nullable=False),
+        sa.Column('article_id', sa.Integer(), nullable=True),
+        sa.Column('page_id', sa.Integer(), nullable=True),
+        sa.CheckConstraint('num_nonnulls(article_id, page_id) = 1', name='ck_media_usage_one_owner'),
+        sa.ForeignKeyConstraint(['media_id'], ['media.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['article_id'], ['articles.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['page_id'], ['static_pages.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_media_usage_article_id'), 'media_usage', ['article_id'], unique=False)
+    op.create_index(op.f('ix_media_usage_page_id'), 'media_usage', ['page_id'], unique=False)
+    op.create_index('uq_media_usage_article', 'media_usage', ['media_id', 'article_id'], unique=True)
+    op.create_index('uq_media_usage_page', 'media_usage', ['media_id', 'page_id'], unique=True)
+
+    # One-off backfill from existing content; from here on the index is kept
+    # up to date when articles and pages are saved.
+    op.execute("""
+        INSERT INTO media_usage (media_id, article_id)
+        SELECT m.id, a.id
+        FROM media m
+        JOIN articles a ON strpos(
+            coalesce(a.content_md, '') || ' ' || coalesce(a.featured_image, '') || ' ' || coalesce(a.og_image, ''),
+            '/static/uploads/' || m.filename
+        ) > 0
+    """)
+    op.execute("""
+        INSERT INTO media_usage (media_id, page_id)
+        SELECT m.id, p.id
+        FROM media m
+        JOIN static_pages p ON strpos(p.content_md, '/static/uploads/' || m.filename) > 0
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_media_usage_page', table_name='media_usage')
+    op.drop_index('uq_media_usage_article', table_name='media_usage')
+    op.drop_index(op.f('ix_media_usage_page_id'), table_name='media_usage')
+    op.drop_index(op.f('ix_media_usage_article_id'), table_name='media_usage')
+    op.drop_table('media_usage')
@@ -0,0 +1,103 @@
+"""partition comments by created_at month
+
+Revision ID: e4c8a2f6b931
+Revises: d7b5e9c3f846
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4c8a2f6b931'
+down_revision: Union[str, None] = 'd7b5e9c3f846'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, article_id, nickname, content, is_approved, ip_address, created_at"
+
+
+def _create_comments(**kw) -> None:
+    op.create_table(
+        'comments',
+        sa.Column('id', sa.Integer(), nullable=False, server_default=sa.text("nextval('comments_id_seq')")),
+        sa.Column('article_id', sa.Integer(), nullable=False),
+        sa.Column('nickname', sa.String(length=100), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('is_approved', sa.Boolean(), nullable=False),
+        sa.Column('ip_address', sa.String(length=45), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['article_id'], ['articles.id'], ondelete='CASCADE'),
+        **kw,
+    )
+
+
+def _move_aside() -> None:
+    # The old table keeps its data until it has been copied; its index and
+    # constraint names are freed for the new table. The id sequence is reused.
+    op.drop_index('ix_comments_article_created', table_name='comments')
+    op.execute("ALTER TABLE comments RENAME TO comments_old")
+    op.execute("ALTER TABLE comments_old RENAME CONSTRAINT comments_pkey TO comments_old_pkey")
+    op.execute("ALTER SEQUENCE comments_id_seq OWNED BY NONE")
+
+
+def _copy_back() -> None:
+    op.execute(f"INSERT INTO comments ({COLUMNS}) SELECT {COLUMNS} FROM comments_old")
+    op.execute("DROP TABLE comments_old")
+    op.execute("ALTER SEQUENCE comments_id_seq OWNED BY comments.id")
+
+
+def upgrade() -> None:
+    op.drop_index('ix_comments_is_approved', table_name='comments')
+    _move_aside()
+
+    _create_comments(
+        sa.PrimaryKeyConstraint('id', 'created_at', name='comments_pkey'),
+        postgresql_partition_by='RANGE (created_at)',
+    )
+    # One partition per month from the oldest comment to three months ahead;
+    # later months are added by the comment_partitions job
+    op.execute("""
+        DO $$
+        DECLARE m date;
+        BEGIN
+            FOR m IN
+                SELECT generate_series(
+                    date_trunc('month', coalesce((SELECT min(created_at) FROM comments_old), now() AT TIME ZONE 'UTC')),
+                    date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months',
+                    interval '1 month'
+                )::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF comments FOR VALUES FROM (%L) TO (%L)',
+                    'comments_p' || to_char(m, 'YYYYMM'), m, (m + interval '1 month')::date
+                );
+            END LOOP;
+        END $$
+    """)
+    # Catches anything outside the monthly ranges (e.g. imported old comments)
+    op.execute("CREATE TABLE comments_default PARTITION OF comments DEFAULT")
+
+    _copy_back()
+
+    # Built after the copy; creating them on the parent creates them on every partition
+    op.create_index('ix_comments_article_created', 'comments', ['article_id', 'created_at'])
+    op.create_index(
+        'ix_comments_article_approved', 'comments', ['article_id', 'created_at'],
+        postgresql_where=sa.text('is_approved'),
+    )
+    op.create_index('ix_comments_hidden', 'comments', ['id'], postgresql_where=sa.text('NOT is_approved'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_comments_hidden', table_name='comments')
+    op.drop_index('ix_comments_article_approved', table_name='comments')
+    _move_aside()
+
+    _create_comments(sa.PrimaryKeyConstraint('id', name='comments_pkey'))
+    _copy_back()  # dropping comments_old drops its partitions too
+
+    op.create_index('ix_comments_article_created', 'comments', ['article_id', 'created_at'])
+    op.create_index('ix_comments_is_approved', 'comments', ['is_approved'])
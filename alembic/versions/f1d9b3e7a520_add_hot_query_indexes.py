@@ -0,0 +1,52 @@
+"""add indexes for the hot public and panel queries
+
+Revision ID: f1d9b3e7a520
+Revises: e4c8a2f6b931
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1d9b3e7a520'
+down_revision: Union[str, None] = 'e4c8a2f6b931'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PUBLISHED = sa.text("status = 'PUBLISHED'")
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_articles_published_published_at', 'articles', [sa.text('published_at DESC')],
+        postgresql_where=PUBLISHED,
+    )
+    op.create_index(
+        'ix_articles_published_created_at', 'articles', [sa.text('created_at DESC')],
+        postgresql_where=PUBLISHED,
+    )
+    op.create_index(
+        'ix_articles_published_category', 'articles', ['category_id', sa.text('published_at DESC')],
+        postgresql_where=PUBLISHED,
+    )
+    op.create_index(
+        'ix_articles_scheduled', 'articles', ['scheduled_publish_at'],
+        postgresql_where=sa.text("status = 'SCHEDULED'"),
+    )
+    op.create_index('ix_articles_created_id', 'articles', ['created_at', 'id'])
+    op.create_index('ix_article_tags_tag', 'article_tags', ['tag_id', 'article_id'])
+    # Superseded by the partial published_at index
+    op.drop_index('ix_articles_status_published', table_name='articles')
+
+
+def downgrade() -> None:
+    op.create_index('ix_articles_status_published', 'articles', ['status', 'published_at'])
+    op.drop_index('ix_article_tags_tag', table_name='article_tags')
+    op.drop_index('ix_articles_created_id', table_name='articles')
+    op.drop_index('ix_articles_scheduled', table_name='articles')
+    op.drop_index('ix_articles_published_category', table_name='articles')
+    op.drop_index('ix_articles_published_created_at', table_name='articles')
+    op.drop_index('ix_articles_published_published_at', table_name='articles')
@@ -8,6 +8,36 @@ class Settings(BaseSettings):
     SITE_NAME: str = "Projekt FIRE"
 
     DATABASE_URL: str = "postgresql+asyncpg://fire:fire@db:5432/projektfire"
+    # Per worker. Peak connections = WEB_CONCURRENCY x (DB_POOL_SIZE + DB_MAX_OVERFLOW
+    # + DEDICATED_CONNECTIONS); keep it below Postgres max_connections.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Seconds to wait for a free connection before failing the request
+    DB_POOL_TIMEOUT: float = 10
+    # Seconds after which a connection is replaced (-1 = never)
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Extra connections per worker used to run a request's independent reads
+    # concurrently (gather_reads); 0 runs them sequentially
+    DB_PARALLEL_READS: int = 4
+    # SQLAlchemy compiled-SQL cache entries, per engine
+    DB_QUERY_CACHE_SIZE: int = 500
+    # asyncpg prepared statements kept per connection; 0 disables (needed behind
+    # pgbouncer in transaction mode)
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Optional read-only replica for public pages; empty = everything on the primary
+    DATABASE_REPLICA_URL: str = ""
+    # Replica reads fall back to the primary while it lags more than this
+    REPLICA_MAX_LAG_SECONDS: float = 5
+    # After a write, that client reads from the primary for this long
+    READ_YOUR_WRITES_SECONDS: int = 10
+    # Request deadlines per route group (seconds). Past the deadline the request
+    # is cancelled with a 504 and its queries hit statement_timeout.
+    DEADLINE_SEARCH_SECONDS: float = 2
+    DEADLINE_PAGES_SECONDS: float = 5
+    DEADLINE_PANEL_SECONDS: float = 30
+    # uvicorn worker count (uvicorn reads the same variable)
+    WEB_CONCURRENCY: int = 1
 
     ADMIN_USERNAME: str = "admin"
     ADMIN_PASSWORD: str = "change-me"
@@ -16,6 +46,26 @@ class Settings(BaseSettings):
 
     UMAMI_WEBSITE_ID: str = ""
 
+    # Shared offload pools (app.utils.offload): bcrypt etc. in threads,
+    # Markdown and image variants in processes
+    OFFLOAD_THREADS: int = 4
+    OFFLOAD_PROCESSES: int = 2
+    # Tasks that may wait for a free worker, per pool
+    OFFLOAD_QUEUE_SIZE: int = 32
+    # Unreferenced uploads older than this are garbage-collected; 0 disables
+    MEDIA_ORPHAN_GRACE_DAYS: int = 30
+    # Hidden (spam) comments are deleted once their month is this old; 0 keeps them
+    COMMENT_HIDDEN_RETENTION_DAYS: int = 90
+    # Newest revisions kept per article; older ones are pruned daily
+    ARTICLE_REVISIONS_KEEP: int = 50
+    # Background jobs run at once per web worker (each holds a pool connection
+    # while it runs); 0 leaves them to separate `python -m app.worker` processes
+    JOB_CONCURRENCY: int = 2
+    # Idle job workers look for due retries this often (new jobs wake them at once)
+    JOB_POLL_SECONDS: float = 5
+    # Finished jobs are kept this long for the panel's latency figures
+    JOB_KEEP_DAYS: int = 7
+
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8", "extra": "ignore"}
 
 
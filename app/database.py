@@ -1,17 +1,194 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
+from starlette.requests import Request
 
 from app.config import settings
+from app.utils.pool_metrics import InstrumentedPool, instrument_pool
+
+logger = logging.getLogger(__name__)
 
-engine = create_async_engine(settings.DATABASE_URL, echo=(settings.ENV == "development"))
+# Outside the pool, per worker: the slug index listener, the publish scheduler
+# and the job worker's listener
+DEDICATED_CONNECTIONS = 3
+
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=(settings.ENV == "development"),
+    poolclass=InstrumentedPool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+    connect_args={"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+)
+instrument_pool(engine.sync_engine.pool)
 
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Optional read replica for public GET routes (get_read_db)
+replica_engine = create_async_engine(
+    settings.DATABASE_REPLICA_URL,
+    echo=(settings.ENV == "development"),
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+    connect_args={"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+) if settings.DATABASE_REPLICA_URL else None
+replica_session = (
+    async_sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+    if replica_engine is not None else None
+)
+
+REPLICA_CHECK_SECONDS = 5
+# Set by a client's successful write; while present its reads go to the primary
+PRIMARY_COOKIE = "read_primary"
+
+# Per-worker replica state, kept by check_replica(). Reads stay on the primary
+# until the first check passes.
+_replica_ok = False
+_replica_lag: float | None = None
+
+# Zero when everything received has been replayed, so an idle primary doesn't
+# look like lag, and for a server that isn't a standby at all. NULL when the
+# standby's WAL receiver isn't streaming: received = replayed holds then too,
+# but only because nothing new arrives, so its lag is unknown.
+_REPLICA_LAG_SQL = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN NULL"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
 
 class Base(DeclarativeBase):
     pass
 
 
-async def get_db() -> AsyncSession:
+def asyncpg_dsn() -> str:
+    """DATABASE_URL in plain asyncpg form, for dedicated (non-pooled) connections."""
+    return engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+# SET LOCAL statement_timeout, with the value as a bind parameter so it stays
+# one prepared statement whatever the remaining time
+_STATEMENT_TIMEOUT_SQL = text("SELECT set_config('statement_timeout', :timeout, true)")
+
+
+def _limit_to_deadline(session: AsyncSession, deadline: float | None) -> AsyncSession:
+    """Limit each transaction of session to the time left before deadline (time.monotonic())."""
+    if deadline is not None:
+        session.info["deadline"] = deadline
+
+        @event.listens_for(session.sync_session, "after_begin")
+        def _set_statement_timeout(sync_session, transaction, connection):
+            remaining_ms = max(int((deadline - time.monotonic()) * 1000), 1)
+            connection.execute(_STATEMENT_TIMEOUT_SQL, {"timeout": f"{remaining_ms}ms"})
+    return session
+
+
+def _bound_by_deadline(session: AsyncSession, request: Request) -> AsyncSession:
+    """Apply the request's deadline (set by DeadlineMiddleware), if it has one."""
+    return _limit_to_deadline(session, getattr(request.state, "deadline", None))
+
+
+async def get_db(request: Request) -> AsyncSession:
     async with async_session() as session:
-        yield session
+        yield _bound_by_deadline(session, request)
+
+
+async def check_replica() -> None:
+    """Measure replica lag and switch replica reads on or off accordingly."""
+    global _replica_ok, _replica_lag
+    was_ok = _replica_ok
+    try:
+        async with replica_engine.connect() as conn:
+            lag = (await conn.execute(_REPLICA_LAG_SQL)).scalar_one()
+        _replica_lag = None if lag is None else float(lag)
+        _replica_ok = _replica_lag is not None and _replica_lag <= settings.REPLICA_MAX_LAG_SECONDS
+    except (OSError, DBAPIError):
+        _replica_lag = None
+        _replica_ok = False
+    if _replica_ok != was_ok:
+        logger.warning("Replica reads %s (lag: %s s)", "enabled" if _replica_ok else "disabled", _replica_lag)
+
+
+def replica_status() -> dict:
+    return {"configured": replica_engine is not None, "ok": _replica_ok, "lag": _replica_lag}
+
+
+async def get_read_db(request: Request) -> AsyncSession:
+    """Session for read-only public routes.
+
+    Uses the replica when one is configured, healthy and within
+    REPLICA_MAX_LAG_SECONDS, unless this client wrote something recently
+    (PRIMARY_COOKIE). If the replica can't be reached, falls back to the primary.
+    """
+    global _replica_ok
+    if replica_session is not None and _replica_ok and PRIMARY_COOKIE not in request.cookies:
+        async with replica_session() as session:
+            _bound_by_deadline(session, request)
+            try:
+                # Connect now, so a dead replica means primary reads rather than a 500
+                await session.connection()
+            except (OSError, DBAPIError):
+                logger.warning("Replica unreachable, reading from the primary")
+                _replica_ok = False
+            else:
+                yield session
+                return
+    async with async_session() as session:
+        yield _bound_by_deadline(session, request)
+
+
+# Extra connections this worker's gather_reads() calls currently hold
+_parallel_in_use = 0
+
+
+async def gather_reads(session: AsyncSession, *loaders: Callable[[AsyncSession], Awaitable[Any]]) -> list:
+    """Run independent read-only loaders concurrently; returns their results in order.
+
+    Each loader is an `async (session) -> result` callable. The first runs on
+    `session`, the others each on a short-lived session of its own, i.e. on a
+    separate pooled connection, so latency is the slowest query rather than the
+    sum. That only happens while there is spare capacity: at most
+    DB_PARALLEL_READS extra connections per worker, and only while the pool is
+    below its base size. Under load the loaders run one after another on
+    `session`, as they would without this helper.
+    """
+    global _parallel_in_use
+    extra = len(loaders) - 1
+    pool = session.bind.sync_engine.pool
+    if (
+        extra < 1
+        or _parallel_in_use + extra > settings.DB_PARALLEL_READS
+        or pool.checkedout() + extra > pool.size()
+    ):
+        return [await load(session) for load in loaders]
+
+    async def on_own_session(load):
+        async with AsyncSession(session.bind, expire_on_commit=False) as own:
+            return await load(_limit_to_deadline(own, session.info.get("deadline")))
+
+    _parallel_in_use += extra
+    try:
+        # return_exceptions: every loader has finished before this returns or raises
+        results = await asyncio.gather(loaders[0](session), *map(on_own_session, loaders[1:]), return_exceptions=True)
+    finally:
+        _parallel_in_use -= extra
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
@@ -4,26 +4,33 @@ from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, Request
-from fastapi.responses import RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeout
 
 from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 
 from app.config import settings
-from app.database import async_session, engine
-from app.middleware import CSRFMiddleware, SecurityHeadersMiddleware
+from app.database import PRIMARY_COOKIE, async_session, asyncpg_dsn, engine, replica_engine
+from app.middleware import CSRFMiddleware, DeadlineMiddleware, ReadYourWritesMiddleware, SecurityHeadersMiddleware
+from app.templating import templates
+from app.utils.offload import OffloadBusy
 
 logger = logging.getLogger(__name__)
 
 BASE_DIR = Path(__file__).resolve().parent
 
+# SQLSTATE of a query cancelled by statement_timeout
+QUERY_CANCELED = "57014"
+
 
 async def _ensure_admin():
     """Create or update admin user from env vars on startup."""
     from sqlalchemy import select
     from app.database import async_session
     from app.models.admin import AdminUser
-    from app.utils.security import hash_password
+    from app.utils.offload import run_in_thread
+    from app.utils.security import hash_password, verify_password
 
     async with async_session() as session:
         result = await session.execute(
@@ -31,39 +38,139 @@ async def _ensure_admin():
         )
         admin = result.scalar_one_or_none()
 
+        if admin is not None and await run_in_thread(
+            "bcrypt_verify", verify_password, settings.ADMIN_PASSWORD, admin.password_hash
+        ):
+            return
+
+        password_hash = await run_in_thread("bcrypt_hash", hash_password, settings.ADMIN_PASSWORD)
         if admin is None:
-            session.add(AdminUser(
-                username=settings.ADMIN_USERNAME,
-                password_hash=hash_password(settings.ADMIN_PASSWORD),
-            ))
+            session.add(AdminUser(username=settings.ADMIN_USERNAME, password_hash=password_hash))
         else:
-            admin.password_hash = hash_password(settings.ADMIN_PASSWORD)
+            admin.password_hash = password_hash
 
         await session.commit()
 
 
-async def _scheduled_publish_loop():
-    """Background task: publish scheduled articles every 60 seconds."""
-    from app.services.article_service import publish_scheduled_articles
+async def _dashboard_stats_loop():
+    """Background task: keep the panel dashboard snapshot warm."""
+    from app.services.stats_service import STATS_REFRESH_SECONDS, refresh_dashboard_stats
+
+    while True:
+        try:
+            async with async_session() as session:
+                await refresh_dashboard_stats(session)
+        except Exception:
+            logger.exception("Dashboard stats refresh error")
+        await asyncio.sleep(STATS_REFRESH_SECONDS)
+
+
+async def _variant_index_loop():
+    """Background task: reload the srcset index so uploads from other workers show up."""
+    from app.services.media_service import load_variant_index
+
+    while True:
+        try:
+            async with async_session() as session:
+                await load_variant_index(session)
+        except Exception:
+            logger.exception("Variant index reload error")
+        await asyncio.sleep(300)
+
+
+async def _maintenance_loop():
+    """Background task: queue the daily housekeeping jobs.
+
+    Every web worker does this hourly; dedupe keys leave one job per kind per
+    day, which whichever job worker is free then runs.
+    """
+    from app.worker import enqueue_maintenance
+
+    while True:
+        try:
+            await enqueue_maintenance()
+        except Exception:
+            logger.exception("Maintenance scheduling error")
+        await asyncio.sleep(3600)
+
+
+async def _slug_index_loop():
+    """Background task: periodic reload of the slug index (fallback for missed notifications)."""
+    from app.services.slug_service import SLUG_INDEX_REFRESH_SECONDS, load_slug_index
 
     while True:
-        await asyncio.sleep(60)
         try:
             async with async_session() as session:
-                count = await publish_scheduled_articles(session)
-                if count:
-                    logger.info("Published %d scheduled article(s)", count)
+                await load_slug_index(session)
+        except Exception:
+            logger.exception("Slug index reload error")
+        await asyncio.sleep(SLUG_INDEX_REFRESH_SECONDS)
+
+
+async def _slug_index_listener():
+    """Background task: LISTEN for slug/status changes made by any worker.
+
+    Uses its own asyncpg connection rather than holding one from the pool.
+    """
+    import asyncpg
+    from app.services.slug_service import SLUG_INDEX_CHANNEL, invalidate_slug_index
+
+    while True:
+        try:
+            conn = await asyncpg.connect(asyncpg_dsn())
+            try:
+                await conn.add_listener(SLUG_INDEX_CHANNEL, lambda *_: invalidate_slug_index())
+                invalidate_slug_index()  # anything missed while disconnected
+                while not conn.is_closed():
+                    await asyncio.sleep(5)
+            finally:
+                await conn.close()
+        except Exception:
+            logger.exception("Slug index listener error")
+        await asyncio.sleep(5)
+
+
+async def _replica_health_loop():
+    """Background task: keep checking replica lag; reads fall back to the primary when it's behind."""
+    from app.database import REPLICA_CHECK_SECONDS, check_replica
+
+    while True:
+        try:
+            await check_replica()
         except Exception:
-            logger.exception("Scheduled publish error")
+            logger.exception("Replica health check error")
+        await asyncio.sleep(REPLICA_CHECK_SECONDS)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    from app.services.publish_scheduler import run_publish_scheduler
+    from app.services.slug_service import ensure_slug_index
+    from app.utils.offload import shutdown_pools
+    from app.worker import run_worker
+
     await _ensure_admin()
-    task = asyncio.create_task(_scheduled_publish_loop())
+    # Loaded before serving: an empty index would 404 every article
+    await ensure_slug_index()
+    tasks = [
+        asyncio.create_task(run_publish_scheduler()),
+        asyncio.create_task(_dashboard_stats_loop()),
+        asyncio.create_task(_variant_index_loop()),
+        asyncio.create_task(_slug_index_loop()),
+        asyncio.create_task(_slug_index_listener()),
+    ]
+    if replica_engine is not None:
+        tasks.append(asyncio.create_task(_replica_health_loop()))
+    tasks.append(asyncio.create_task(_maintenance_loop()))
+    if settings.JOB_CONCURRENCY > 0:
+        tasks.append(asyncio.create_task(run_worker(settings.JOB_CONCURRENCY)))
     yield
-    task.cancel()
+    for task in tasks:
+        task.cancel()
+    shutdown_pools()
     await engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
 
 
 app = FastAPI(
@@ -73,8 +180,27 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-app.add_middleware(SecurityHeadersMiddleware)
 app.add_middleware(CSRFMiddleware)
+if replica_engine is not None:
+    app.add_middleware(
+        ReadYourWritesMiddleware, cookie_name=PRIMARY_COOKIE, max_age=settings.READ_YOUR_WRITES_SECONDS
+    )
+app.add_middleware(
+    DeadlineMiddleware,
+    deadlines=[
+        ("/static/", None),
+        # Long-running by design: streamed uploads, imports and exports
+        ("/panel/import", None),
+        ("/panel/export", None),
+        ("/panel/media/upload", None),
+        ("/panel", settings.DEADLINE_PANEL_SECONDS),
+        ("/htmx/search", settings.DEADLINE_SEARCH_SECONDS),
+        ("/", settings.DEADLINE_PAGES_SECONDS),
+    ],
+    timeout_response=lambda scope: _error_page(Request(scope), 504),
+)
+# Outside DeadlineMiddleware, so its 504 page gets the headers too
+app.add_middleware(SecurityHeadersMiddleware)
 app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=["*"])
 
 app.mount("/static", StaticFiles(directory=BASE_DIR / "static"), name="static")
@@ -93,6 +219,30 @@ app.include_router(seo_router)
 app.include_router(blog_router)  # Must be last - contains catch-all /{slug}
 
 
+def _error_page(request: Request, status_code: int) -> HTMLResponse:
+    return templates.TemplateResponse(f"pages/{status_code}.html", {"request": request}, status_code=status_code)
+
+
+@app.exception_handler(PoolTimeout)
+async def pool_timeout_handler(request: Request, exc: PoolTimeout):
+    logger.warning("No free DB connection for %s", request.url.path)
+    return _error_page(request, 503)
+
+
+@app.exception_handler(OffloadBusy)
+async def offload_busy_handler(request: Request, exc: OffloadBusy):
+    logger.warning("%s (%s)", exc, request.url.path)
+    return _error_page(request, 503)
+
+
+@app.exception_handler(DBAPIError)
+async def statement_timeout_handler(request: Request, exc: DBAPIError):
+    if getattr(exc.orig, "sqlstate", None) != QUERY_CANCELED:
+        raise exc
+    logger.warning("Statement timeout on %s", request.url.path)
+    return _error_page(request, 504)
+
+
 @app.exception_handler(RequireLoginException)
 async def require_login_handler(request: Request, exc: RequireLoginException):
     return RedirectResponse(url="/panel/login", status_code=303)
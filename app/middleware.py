@@ -1,62 +1,101 @@
+import asyncio
 import secrets
+import time
+from typing import Callable
 from urllib.parse import parse_qs
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+from starlette.requests import Request, cookie_parser
 from starlette.responses import Response
 from starlette.types import ASGIApp, Receive, Scope, Send
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Add security headers to all responses."""
+# Appended as-is to every response; any same-named header set by a route is replaced
+SECURITY_HEADERS = [
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+    (b"permissions-policy", b"camera=(), microphone=(), geolocation=()"),
+    (b"x-xss-protection", b"1; mode=block"),
+]
+_SECURITY_HEADER_NAMES = frozenset(name for name, _ in SECURITY_HEADERS)
 
-    async def dispatch(self, request: Request, call_next):
-        response: Response = await call_next(request)
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Permissions-Policy"] = "camera=(), microphone=(), geolocation=()"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        return response
+
+class SecurityHeadersMiddleware:
+    """Add security headers to all responses (pure ASGI).
+
+    Only the http.response.start message is touched, so streamed responses
+    pass through unbuffered.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *(h for h in message.get("headers", ()) if h[0].lower() not in _SECURITY_HEADER_NAMES),
+                    *SECURITY_HEADERS,
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
 
 
 class CSRFMiddleware:
     """CSRF protection using double-submit cookie pattern (pure ASGI).
 
     Avoids BaseHTTPMiddleware which consumes the request body stream,
-    making it unavailable to downstream route handlers.
+    making it unavailable to downstream route handlers. The cookie is read
+    straight from the scope; a Request is only built to read a form body.
+    Static files get neither a token nor the cookie.
     """
 
     COOKIE_NAME = "csrf_token"
     FIELD_NAME = "csrf_token"
     SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+    SKIP_PREFIXES = ("/static/",)
+    # Multipart endpoints that stream the body themselves and verify the token
+    # in-stream (see app.utils.uploads); buffering them here would defeat that.
+    STREAMED_UPLOAD_PATHS = {"/panel/media/upload", "/panel/import"}
 
     def __init__(self, app: ASGIApp):
         self.app = app
 
+    @classmethod
+    def _read_cookie(cls, scope: Scope) -> str | None:
+        for name, value in scope["headers"]:
+            if name == b"cookie":
+                return cookie_parser(value.decode("latin-1")).get(cls.COOKIE_NAME)
+        return None
+
     async def __call__(self, scope: Scope, receive: Receive, send: Send):
-        if scope["type"] != "http":
+        if scope["type"] != "http" or scope["path"].startswith(self.SKIP_PREFIXES):
             await self.app(scope, receive, send)
             return
 
-        request = Request(scope, receive)
-
         # Ensure CSRF token exists
-        csrf_cookie = request.cookies.get(self.COOKIE_NAME)
+        csrf_cookie = self._read_cookie(scope)
         if not csrf_cookie:
             csrf_cookie = secrets.token_hex(32)
 
         # Make token available to templates via request.state
-        request.state.csrf_token = csrf_cookie
+        scope.setdefault("state", {})["csrf_token"] = csrf_cookie
 
         # Validate on unsafe methods (POST, PUT, DELETE)
-        if request.method not in self.SAFE_METHODS:
-            path = request.url.path
+        if scope["method"] not in self.SAFE_METHODS:
+            path = scope["path"]
 
             # Skip CSRF for API-like endpoints (HTMX sends its own headers)
             if not path.startswith("/htmx/"):
+                request = Request(scope, receive)
                 content_type = request.headers.get("content-type", "")
-                if "form" in content_type or "multipart" in content_type:
+                streamed = "multipart" in content_type and path in self.STREAMED_UPLOAD_PATHS
+                if not streamed and ("form" in content_type or "multipart" in content_type):
                     body = await request.body()
 
                     # Extract CSRF token from form data
@@ -80,14 +119,121 @@ class CSRFMiddleware:
 
         # Inject CSRF cookie into response
         cookie = f"{self.COOKIE_NAME}={csrf_cookie}; Path=/; Max-Age=86400; SameSite=Strict"
-        if request.url.scheme == "https":
+        if scope["scheme"] == "https":
             cookie += "; Secure"
+        cookie_header = (b"set-cookie", cookie.encode())
 
         async def send_with_cookie(message):
             if message["type"] == "http.response.start":
-                headers = list(message.get("headers", []))
-                headers.append((b"set-cookie", cookie.encode()))
-                message["headers"] = headers
+                message["headers"] = [*message.get("headers", []), cookie_header]
             await send(message)
 
         await self.app(scope, receive, send_with_cookie)
+
+
+class ReadYourWritesMiddleware:
+    """After a successful write, pin the client's reads to the primary (pure ASGI).
+
+    Sets a short-lived cookie that get_read_db() checks, so a visitor sees their
+    own comment even if the replica hasn't replayed it yet.
+    """
+
+    SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+    def __init__(self, app: ASGIApp, *, cookie_name: str, max_age: int):
+        self.app = app
+        self.cookie = f"{cookie_name}=1; Path=/; Max-Age={max_age}; HttpOnly; SameSite=Lax".encode()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] in self.SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", self.cookie)]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+class DeadlineMiddleware:
+    """Per-route-group request deadlines and cancel-on-disconnect (pure ASGI).
+
+    The first prefix in `deadlines` that matches the path sets how long the
+    request may take (None: no deadline). The absolute deadline (time.monotonic()) is stored in
+    request.state.deadline, where the DB session dependencies turn it into a
+    statement_timeout. When it passes before the response has started, the
+    handler is cancelled and `timeout_response` is sent instead. A client
+    that disconnects gets its handler cancelled at any point.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        deadlines: list[tuple[str, float | None]],
+        timeout_response: Callable[[Scope], Response],
+    ):
+        self.app = app
+        self.deadlines = deadlines
+        self.timeout_response = timeout_response
+
+    def _seconds_for(self, path: str) -> float | None:
+        for prefix, seconds in self.deadlines:
+            if path.startswith(prefix):
+                return seconds
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        seconds = self._seconds_for(scope["path"]) if scope["type"] == "http" else None
+        if seconds is None:
+            await self.app(scope, receive, send)
+            return
+        scope.setdefault("state", {})["deadline"] = time.monotonic() + seconds
+
+        # Body messages are handed over one at a time, so a streamed upload
+        # keeps its backpressure; once the body is read, the relay waits on
+        # receive() purely to notice a disconnect.
+        inbox: asyncio.Queue = asyncio.Queue(maxsize=1)
+        started = finished = disconnected = False
+
+        async def send_tracking(message):
+            nonlocal started, finished
+            if message["type"] == "http.response.start":
+                started = True
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                finished = True
+            await send(message)
+
+        async def relay():
+            nonlocal disconnected
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    # Servers also report a disconnect once the response is
+                    # complete; background tasks after it must keep running.
+                    if not finished:
+                        disconnected = True
+                        handler.cancel()
+                    return
+                await inbox.put(message)
+
+        handler = asyncio.create_task(self.app(scope, inbox.get, send_tracking))
+        relay_task = asyncio.create_task(relay())
+        try:
+            await asyncio.wait({handler}, timeout=seconds)
+            if not handler.done() and not started:
+                handler.cancel()
+                await asyncio.gather(handler, return_exceptions=True)
+                if not disconnected:
+                    await self.timeout_response(scope)(scope, receive, send)
+                return
+            try:
+                await handler
+            except asyncio.CancelledError:
+                if not disconnected:
+                    raise
+        finally:
+            relay_task.cancel()
+            handler.cancel()
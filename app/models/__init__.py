@@ -1,10 +1,15 @@
 from app.models.admin import AdminUser
 from app.models.article import Article, ArticleStatus, article_tag
+from app.models.article_revision import ArticleRevision
 from app.models.blacklisted_word import BlacklistedWord
 from app.models.category import Category
 from app.models.comment import Comment
 from app.models.contact_message import ContactMessage
+from app.models.job import Job, JobStatus
 from app.models.media import Media
+from app.models.media_usage import MediaUsage
+from app.models.media_variant import MediaVariant
+from app.models.slug_redirect import SlugRedirect
 from app.models.static_page import StaticPage
 from app.models.tag import Tag
 
@@ -13,11 +18,17 @@ __all__ = [
     "Article",
     "ArticleStatus",
     "article_tag",
+    "ArticleRevision",
     "BlacklistedWord",
     "Category",
     "Comment",
     "ContactMessage",
+    "Job",
+    "JobStatus",
     "Media",
+    "MediaUsage",
+    "MediaVariant",
+    "SlugRedirect",
     "StaticPage",
     "Tag",
 ]
@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, Integer, LargeBinary, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class ArticleRevision(Base):
+    """One saved version of an article's title and content.
+
+    ``data`` is either a compressed full copy of content_md (snapshot) or a
+    compressed delta from the previous revision - see app.utils.textdelta.
+    """
+
+    __tablename__ = "article_revisions"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    article_id: Mapped[int] = mapped_column(
+        ForeignKey("articles.id", ondelete="CASCADE"), nullable=False
+    )
+    revision: Mapped[int] = mapped_column(Integer, nullable=False)
+    is_snapshot: Mapped[bool] = mapped_column(nullable=False)
+    title: Mapped[str] = mapped_column(String(300), nullable=False)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    # Hash of the full content at this revision: detects edits made outside update_article
+    content_hash: Mapped[str] = mapped_column(String(40), nullable=False)
+    content_length: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("article_id", "revision", name="uq_article_revisions_article_revision"),
+    )
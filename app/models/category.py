@@ -15,4 +15,7 @@ class Category(Base):
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
 
-    articles: Mapped[list["Article"]] = relationship(back_populates="category")  # noqa: F821
+    # ON DELETE SET NULL does the unlinking; the ORM doesn't load articles for it
+    articles: Mapped[list["Article"]] = relationship(  # noqa: F821
+        back_populates="category", passive_deletes=True
+    )
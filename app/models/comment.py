@@ -1,15 +1,22 @@
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, Index, String, Text
+from sqlalchemy import ForeignKey, Index, PrimaryKeyConstraint, String, Text, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
 
 
 class Comment(Base):
+    """Range-partitioned by created_at month (comments_pYYYYMM + comments_default).
+
+    The partition key has to be part of the primary key; ids still come from
+    one sequence, so id alone stays unique. Partitions are created ahead of time
+    and old spam is purged by the comment_partitions job (comment_service).
+    """
+
     __tablename__ = "comments"
 
-    id: Mapped[int] = mapped_column(primary_key=True)
+    id: Mapped[int] = mapped_column(autoincrement=True)
     article_id: Mapped[int] = mapped_column(ForeignKey("articles.id", ondelete="CASCADE"), nullable=False)
     nickname: Mapped[str] = mapped_column(String(100), nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
@@ -20,6 +27,12 @@ class Comment(Base):
     article: Mapped["Article"] = relationship(back_populates="comments")  # noqa: F821
 
     __table_args__ = (
+        PrimaryKeyConstraint("id", "created_at"),
+        # All comments of an article: moderation filter, import dedupe, FK cascade
         Index("ix_comments_article_created", "article_id", "created_at"),
-        Index("ix_comments_is_approved", "is_approved"),
+        # Public thread: only approved rows, so spam doesn't grow it
+        Index("ix_comments_article_approved", "article_id", "created_at", postgresql_where=text("is_approved")),
+        # Hidden queue and the pending count
+        Index("ix_comments_hidden", "id", postgresql_where=text("NOT is_approved")),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
@@ -0,0 +1,59 @@
+import enum
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Enum, Index, SmallInteger, String, Text, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class Job(Base):
+    """A unit of background work, run by app.worker.
+
+    Workers claim the highest-priority due job with FOR UPDATE SKIP LOCKED, so
+    any number of them can share the table. A failed job goes back to QUEUED
+    with a later run_at until max_attempts is used up, then stays FAILED.
+    """
+
+    __tablename__ = "jobs"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    status: Mapped[JobStatus] = mapped_column(
+        Enum(JobStatus), nullable=False, default=JobStatus.QUEUED
+    )
+    # Higher runs first
+    priority: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=0)
+    attempts: Mapped[int] = mapped_column(nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(nullable=False, default=5)
+    # While a job with this key exists, enqueueing another one is a no-op
+    dedupe_key: Mapped[str | None] = mapped_column(String(100), unique=True, nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    run_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    started_at: Mapped[datetime | None] = mapped_column(nullable=True)
+    # Bumped while the job runs; a RUNNING job whose heartbeat stops is reaped
+    heartbeat_at: Mapped[datetime | None] = mapped_column(nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(nullable=True)
+
+    __table_args__ = (
+        # Exactly the claim query's order, over queued rows only, so it stays
+        # small however many finished jobs are kept
+        Index(
+            "ix_jobs_queued",
+            text("priority DESC"),
+            "run_at",
+            postgresql_where=text("status = 'QUEUED'"),
+        ),
+        Index("ix_jobs_status_finished", "status", "finished_at"),
+    )
@@ -1,7 +1,7 @@
 from datetime import datetime
 
 from sqlalchemy import Integer, String
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
 
@@ -16,4 +16,12 @@ class Media(Base):
     file_size: Mapped[int] = mapped_column(Integer, nullable=False)
     mime_type: Mapped[str] = mapped_column(String(100), nullable=False)
     alt_text: Mapped[str | None] = mapped_column(String(300), nullable=True)
+    # Content address of the file; NULL only for uploads that predate hashing
+    sha256: Mapped[str | None] = mapped_column(String(64), unique=True, nullable=True)
+    # Number of uploads deduplicated into this row; the file goes away at zero
+    ref_count: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+
+    variants: Mapped[list["MediaVariant"]] = relationship(  # noqa: F821
+        back_populates="media", passive_deletes=True
+    )
@@ -0,0 +1,30 @@
+from sqlalchemy import CheckConstraint, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class MediaUsage(Base):
+    """One row per (media, article) or (media, static page) reference.
+
+    Maintained at save time from content_md, featured_image and og_image.
+    """
+
+    __tablename__ = "media_usage"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    media_id: Mapped[int] = mapped_column(
+        ForeignKey("media.id", ondelete="CASCADE"), nullable=False
+    )
+    article_id: Mapped[int | None] = mapped_column(
+        ForeignKey("articles.id", ondelete="CASCADE"), nullable=True, index=True
+    )
+    page_id: Mapped[int | None] = mapped_column(
+        ForeignKey("static_pages.id", ondelete="CASCADE"), nullable=True, index=True
+    )
+
+    __table_args__ = (
+        CheckConstraint("num_nonnulls(article_id, page_id) = 1", name="ck_media_usage_one_owner"),
+        Index("uq_media_usage_article", "media_id", "article_id", unique=True),
+        Index("uq_media_usage_page", "media_id", "page_id", unique=True),
+    )
@@ -2,14 +2,15 @@ import math
 
 from fastapi import APIRouter, Depends, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
-from sqlalchemy import func, select
+from sqlalchemy import bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.database import get_db
-from app.models.article import Article, ArticleStatus
+from app.database import gather_reads, get_read_db
+from app.models.article import IS_PUBLISHED, Article
 from app.models.category import Category
-from app.services.article_service import get_all_categories, get_articles
+from app.services.article_service import get_all_categories, get_published_summaries
+from app.services.slug_service import ensure_slug_index, is_published_slug, lookup_redirect
 from app.config import settings
 from app.templating import templates
 
@@ -17,6 +18,15 @@ router = APIRouter(tags=["blog"])
 
 PER_PAGE = 10
 _BASE = settings.SITE_URL
+_not_found_body: str | None = None
+
+# Hot statements, built once per process; values are bound per request
+_PUBLISHED_ARTICLE = (
+    select(Article)
+    .options(selectinload(Article.category), selectinload(Article.tags))
+    .where(Article.slug == bindparam("slug"), IS_PUBLISHED)
+)
+_CATEGORY_BY_SLUG = select(Category).where(Category.slug == bindparam("slug"))
 
 
 async def _sidebar_data(db: AsyncSession) -> dict:
@@ -25,13 +35,21 @@ async def _sidebar_data(db: AsyncSession) -> dict:
     }
 
 
+def _not_found(request: Request) -> HTMLResponse:
+    """404 page, rendered once per worker - it has no per-request content."""
+    global _not_found_body
+    if _not_found_body is None:
+        _not_found_body = templates.get_template("pages/404.html").render(request=request)
+    return HTMLResponse(_not_found_body, status_code=404)
+
+
 # ──── Blog list ───────────────────────────────────────────────────────────────
 
 
 @router.get("/", response_class=HTMLResponse)
 async def homepage(
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     return await _render_blog_list(request, db, page=1)
 
@@ -45,7 +63,7 @@ async def blog_redirect():
 async def blog_list_paginated(
     request: Request,
     page_num: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     if page_num <= 1:
         return RedirectResponse(url="/", status_code=301)
@@ -60,9 +78,12 @@ async def blog_page_redirect(page_num: int):
 
 
 async def _render_blog_list(request: Request, db: AsyncSession, page: int):
-    articles, total = await get_articles(db, status=ArticleStatus.PUBLISHED, page=page, per_page=PER_PAGE)
+    (articles, total), sidebar = await gather_reads(
+        db,
+        lambda s: get_published_summaries(s, order_by=Article.created_at, page=page, per_page=PER_PAGE),
+        _sidebar_data,
+    )
     total_pages = math.ceil(total / PER_PAGE) if total > 0 else 1
-    sidebar = await _sidebar_data(db)
 
     return templates.TemplateResponse("blog/list.html", {
         "request": request,
@@ -85,7 +106,7 @@ async def _render_blog_list(request: Request, db: AsyncSession, page: int):
 async def category_page(
     request: Request,
     slug: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     return await _render_category(request, db, slug, page=1)
 
@@ -95,7 +116,7 @@ async def category_page_paginated(
     request: Request,
     slug: str,
     page_num: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     if page_num <= 1:
         return RedirectResponse(url=f"/kategoria/{slug}", status_code=301)
@@ -103,28 +124,17 @@ async def category_page_paginated(
 
 
 async def _render_category(request: Request, db: AsyncSession, slug: str, page: int):
-    result = await db.execute(select(Category).where(Category.slug == slug))
+    result = await db.execute(_CATEGORY_BY_SLUG, {"slug": slug})
     category = result.scalar_one_or_none()
     if not category:
         return templates.TemplateResponse("pages/404.html", {"request": request}, status_code=404)
 
-    count_q = select(func.count(Article.id)).where(
-        Article.status == ArticleStatus.PUBLISHED,
-        Article.category_id == category.id,
+    (articles, total), sidebar = await gather_reads(
+        db,
+        lambda s: get_published_summaries(s, category_id=category.id, page=page, per_page=PER_PAGE),
+        _sidebar_data,
     )
-    total = (await db.execute(count_q)).scalar() or 0
-
-    articles_q = (
-        select(Article)
-        .options(selectinload(Article.category), selectinload(Article.tags))
-        .where(Article.status == ArticleStatus.PUBLISHED, Article.category_id == category.id)
-        .order_by(Article.published_at.desc())
-        .offset((page - 1) * PER_PAGE)
-        .limit(PER_PAGE)
-    )
-    articles = list((await db.execute(articles_q)).scalars().all())
     total_pages = math.ceil(total / PER_PAGE) if total > 0 else 1
-    sidebar = await _sidebar_data(db)
 
     return templates.TemplateResponse("blog/category.html", {
         "request": request,
@@ -150,16 +160,21 @@ async def _render_category(request: Request, db: AsyncSession, slug: str, page:
 async def article_detail(
     request: Request,
     slug: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    result = await db.execute(
-        select(Article)
-        .options(selectinload(Article.category), selectinload(Article.tags))
-        .where(Article.slug == slug, Article.status == ArticleStatus.PUBLISHED)
-    )
+    # Answered from memory: the index reloads (from the primary) only after a
+    # write marked it stale; only real articles reach the query below.
+    await ensure_slug_index()
+    target = lookup_redirect(slug)
+    if target:
+        return RedirectResponse(url=f"/{target}", status_code=301)
+    if not is_published_slug(slug):
+        return _not_found(request)
+
+    result = await db.execute(_PUBLISHED_ARTICLE, {"slug": slug})
     article = result.scalar_one_or_none()
     if not article:
-        return templates.TemplateResponse("pages/404.html", {"request": request}, status_code=404)
+        return _not_found(request)
 
     breadcrumbs = [
         {"name": "Strona główna", "url": _BASE},
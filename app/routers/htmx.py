@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, Request
 from fastapi.responses import HTMLResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.services.comment_service import create_comment, get_comments_for_article
 from app.services.search_service import search_articles
 from app.templating import templates
@@ -20,7 +20,7 @@ router = APIRouter(prefix="/htmx", tags=["htmx"])
 async def htmx_search(
     request: Request,
     q: str = "",
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     articles = await search_articles(db, q) if q.strip() else []
     return templates.TemplateResponse("components/search_results.html", {
@@ -34,7 +34,7 @@ async def htmx_search(
 async def htmx_comments_list(
     request: Request,
     article_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     comments = await get_comments_for_article(db, article_id)
     return templates.TemplateResponse("components/comment_list.html", {
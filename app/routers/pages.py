@@ -4,43 +4,39 @@ from fastapi import APIRouter, Depends, Request
 from fastapi.responses import HTMLResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.config import settings
-from app.database import get_db
-from app.models.article import Article, ArticleStatus, article_tag
+from app.database import get_db, get_read_db
+from app.models.article import IS_PUBLISHED, Article, article_tag
 from app.models.contact_message import ContactMessage
 from app.models.static_page import StaticPage
 from app.models.tag import Tag
+from app.services.article_service import fetch_summaries, summary_select
+from app.services.stats_service import invalidate_dashboard_stats
 from app.templating import templates
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["pages"])
 
+# Built once per process rather than per request
+_BEGINNER_ARTICLES = (
+    summary_select()
+    .join(article_tag, Article.id == article_tag.c.article_id)
+    .join(Tag, Tag.id == article_tag.c.tag_id)
+    .where(IS_PUBLISHED, Tag.slug == "beginner")
+    .order_by(Article.published_at.desc())
+)
+_ABOUT_PAGE = select(StaticPage).where(StaticPage.slug == "o-mnie")
+
 
 @router.get("/tutaj-zacznij", response_class=HTMLResponse)
 async def start_here(
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    # Get articles with "beginner" tag
-    result = await db.execute(select(Tag).where(Tag.slug == "beginner"))
-    beginner_tag = result.scalar_one_or_none()
-
-    articles = []
-    if beginner_tag:
-        articles_q = (
-            select(Article)
-            .options(selectinload(Article.category), selectinload(Article.tags))
-            .join(article_tag, Article.id == article_tag.c.article_id)
-            .where(
-                Article.status == ArticleStatus.PUBLISHED,
-                article_tag.c.tag_id == beginner_tag.id,
-            )
-            .order_by(Article.published_at.desc())
-        )
-        articles = list((await db.execute(articles_q)).scalars().all())
+    # Articles with the "beginner" tag
+    articles = await fetch_summaries(db, _BEGINNER_ARTICLES)
 
     return templates.TemplateResponse("pages/start_here.html", {
         "request": request,
@@ -56,9 +52,9 @@ async def start_here(
 @router.get("/o-mnie", response_class=HTMLResponse)
 async def about(
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    result = await db.execute(select(StaticPage).where(StaticPage.slug == "o-mnie"))
+    result = await db.execute(_ABOUT_PAGE)
     page = result.scalar_one_or_none()
 
     if not page:
@@ -143,6 +139,7 @@ async def contact_submit(request: Request, db: AsyncSession = Depends(get_db)):
         name=name, email=email, subject=subject, message=message, ip_address=client_ip,
     ))
     await db.commit()
+    invalidate_dashboard_stats()
     logger.info("Contact form saved: name=%s, email=%s, subject=%s", name, email, subject)
 
     return templates.TemplateResponse("pages/contact.html", {
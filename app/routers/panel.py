@@ -1,15 +1,16 @@
 from datetime import datetime, timezone
+from urllib.parse import urlencode
 from zoneinfo import ZoneInfo
 
-from fastapi import APIRouter, Depends, Request, UploadFile
-from fastapi.responses import HTMLResponse, RedirectResponse
-from sqlalchemy import select
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, RedirectResponse, Response, StreamingResponse
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.database import get_db
-from app.models.article import Article, ArticleStatus
+from app.database import async_session, gather_reads, get_db
+from app.models.article import ArticleStatus
 from app.models.contact_message import ContactMessage
 
 WARSAW_TZ = ZoneInfo("Europe/Warsaw")
@@ -40,22 +41,44 @@ def _utc_to_warsaw_display(dt: datetime | None) -> str:
     return aware_utc.astimezone(WARSAW_TZ).strftime("%d.%m.%Y %H:%M")
 from app.models.blacklisted_word import BlacklistedWord
 from app.models.category import Category
-from app.models.comment import Comment
 from app.models.static_page import StaticPage
 from app.models.tag import Tag
 from app.services.article_service import (
     create_article,
-    delete_article,
+    delete_articles,
     get_all_categories,
     get_all_tags,
     get_article_by_id,
-    get_articles,
+    get_articles_page,
     update_article,
 )
 from app.services.auth_service import authenticate_admin
-from app.services.media_service import delete_media, get_all_media, upload_media
+from app.services.comment_service import (
+    delete_comments,
+    get_comments_by_ids,
+    get_moderation_queue,
+    set_comments_approved,
+)
+from app.services.media_service import (
+    UPLOAD_DIR,
+    delete_media,
+    ensure_thumbnail,
+    get_media_by_id,
+    get_media_page,
+    get_media_usage,
+    get_usage_counts,
+    receive_uploads,
+    sync_media_usage,
+    upload_media,
+)
+from app.services.job_service import enqueue, get_queue_stats, retry_job
+from app.services.revision_service import get_revision_pair, get_revisions
+from app.services.slug_service import invalidate_slug_index
+from app.services.stats_service import get_dashboard_stats, get_runtime_metrics, invalidate_dashboard_stats
+from app.services.transfer_service import export_jsonl, export_markdown_zip, import_jsonl, receive_import
 from app.templating import templates
-from app.utils.markdown import render_markdown
+from app.utils.markdown import render_markdown_async
+from app.utils.offload import run_in_process
 from app.utils.seo import generate_slug
 from app.utils.security import (
     check_rate_limit,
@@ -63,10 +86,18 @@ from app.utils.security import (
     decode_access_token,
     record_login_attempt,
 )
+from app.utils.textdelta import html_diff_table
+from app.utils.uploads import UploadRejected
 
 router = APIRouter(prefix="/panel", tags=["panel"])
 
 COOKIE_NAME = "session_token"
+MEDIA_PER_PAGE = 30
+PICKER_PER_PAGE = 24
+UPLOAD_FLASH = {
+    "1": "Plik przesłany.",
+    "dup": "Plik przesłany. Część plików była już w bibliotece - użyto istniejących.",
+}
 
 
 class RequireLoginException(Exception):
@@ -87,6 +118,11 @@ async def require_admin(request: Request) -> dict:
     return admin
 
 
+def _is_htmx(request: Request) -> bool:
+    """True for HTMX fragment requests (but not history restores, which need the full page)."""
+    return bool(request.headers.get("hx-request")) and not request.headers.get("hx-history-restore-request")
+
+
 # ──── Auth ────────────────────────────────────────────────────────────────────
 
 
@@ -153,28 +189,14 @@ async def dashboard(
     admin: dict = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    total = (await db.execute(select(func.count(Article.id)))).scalar() or 0
-    published = (await db.execute(
-        select(func.count(Article.id)).where(Article.status == ArticleStatus.PUBLISHED)
-    )).scalar() or 0
-    drafts = total - published
-    comments = (await db.execute(select(func.count(Comment.id)))).scalar() or 0
-    categories = (await db.execute(select(func.count(Category.id)))).scalar() or 0
-
-    recent_articles, _ = await get_articles(db, page=1, per_page=5)
+    snapshot = await get_dashboard_stats(db)
 
     return templates.TemplateResponse("panel/dashboard.html", {
         "request": request,
         "admin": admin,
         "active_page": "dashboard",
-        "stats": {
-            "articles": total,
-            "published": published,
-            "drafts": drafts,
-            "comments": comments,
-            "categories": categories,
-        },
-        "recent_articles": recent_articles,
+        "stats": snapshot["stats"],
+        "recent_articles": snapshot["recent_articles"],
     })
 
 
@@ -187,13 +209,58 @@ async def article_list(
     admin: dict = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    articles, total = await get_articles(db)
-    return templates.TemplateResponse("panel/articles/list.html", {
+    params = request.query_params
+    status = params.get("status", "")
+    category_id = params.get("category", "")
+    tag_id = params.get("tag", "")
+    q = params.get("q", "").strip()
+    sort = params.get("sort", "created_at")
+    order = "asc" if params.get("order") == "asc" else "desc"
+
+    page = await get_articles_page(
+        db,
+        status=ArticleStatus(status) if status in {s.value for s in ArticleStatus} else None,
+        category_id=int(category_id) if category_id.isdigit() else None,
+        tag_id=int(tag_id) if tag_id.isdigit() else None,
+        q=q or None,
+        sort=sort,
+        descending=order == "desc",
+        after=params.get("after") or None,
+        before=params.get("before") or None,
+    )
+
+    filters = {"status": status, "category": category_id, "tag": tag_id, "q": q}
+
+    def url(**extra) -> str:
+        query = {k: v for k, v in {**filters, "sort": sort, "order": order, **extra}.items() if v}
+        return "/panel/articles" + (f"?{urlencode(query)}" if query else "")
+
+    context = {
         "request": request,
+        "articles": page.articles,
+        "total": page.total,
+        "sort": sort,
+        "order": order,
+        "next_url": url(after=page.next_cursor) if page.next_cursor else None,
+        "prev_url": url(before=page.prev_cursor) if page.prev_cursor else None,
+        "sort_urls": {
+            col: url(sort=col, order="asc" if col == sort and order == "desc" else "desc")
+            for col in ("title", "created_at", "updated_at")
+        },
+    }
+
+    # HTMX filter/sort/page requests only swap the table fragment
+    if _is_htmx(request):
+        return templates.TemplateResponse("panel/articles/table.html", context)
+
+    categories, tags = await gather_reads(db, get_all_categories, get_all_tags)
+    return templates.TemplateResponse("panel/articles/list.html", {
+        **context,
         "admin": admin,
         "active_page": "articles",
-        "articles": articles,
-        "total": total,
+        "filters": filters,
+        "categories": categories,
+        "tags": tags,
     })
 
 
@@ -203,9 +270,7 @@ async def article_new(
     admin: dict = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    categories = await get_all_categories(db)
-    tags = await get_all_tags(db)
-    media_list = await get_all_media(db)
+    categories, tags = await gather_reads(db, get_all_categories, get_all_tags)
     return templates.TemplateResponse("panel/articles/form.html", {
         "request": request,
         "admin": admin,
@@ -213,7 +278,6 @@ async def article_new(
         "article": None,
         "categories": categories,
         "tags": tags,
-        "media_list": media_list,
         "scheduled_publish_at_value": "",
         "scheduled_publish_at_display": "",
     })
@@ -249,6 +313,18 @@ async def article_create(
     return RedirectResponse(url=f"/panel/articles/{article.id}/edit?saved=1", status_code=303)
 
 
+@router.post("/articles/bulk-delete")
+async def articles_bulk_delete(
+    request: Request,
+    admin: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    form = await request.form()
+    ids = [int(i) for i in form.getlist("ids") if str(i).isdigit()]
+    await delete_articles(db, ids)
+    return RedirectResponse(url="/panel/articles", status_code=303)
+
+
 @router.get("/articles/{article_id}/edit", response_class=HTMLResponse)
 async def article_edit(
     request: Request,
@@ -256,14 +332,12 @@ async def article_edit(
     admin: dict = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    article = await get_article_by_id(db, article_id)
+    article, categories, tags = await gather_reads(
+        db, lambda s: get_article_by_id(s, article_id), get_all_categories, get_all_tags
+    )
     if not article:
         return RedirectResponse(url="/panel/articles", status_code=303)
 
-    categories = await get_all_categories(db)
-    tags = await get_all_tags(db)
-    media_list = await get_all_media(db)
-
     return templates.TemplateResponse("panel/articles/form.html", {
         "request": request,
         "admin": admin,
@@ -271,7 +345,6 @@ async def article_edit(
         "article": article,
         "categories": categories,
         "tags": tags,
-        "media_list": media_list,
         "flash_success": "Artykuł zapisany." if request.query_params.get("saved") else None,
         "scheduled_publish_at_value": _utc_to_warsaw_input(article.scheduled_publish_at),
         "scheduled_publish_at_display": _utc_to_warsaw_display(article.scheduled_publish_at),
@@ -314,6 +387,48 @@ async def article_update(
     return RedirectResponse(url=f"/panel/articles/{article_id}/edit?saved=1", status_code=303)
 
 
+@router.get("/articles/{article_id}/history", response_class=HTMLResponse)
+async def article_history(
+    request: Request,
+    article_id: int,
+    admin: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    article = await get_article_by_id(db, article_id)
+    if not article:
+        return RedirectResponse(url="/panel/articles", status_code=303)
+
+    revisions = await get_revisions(db, article_id)
+    selected = request.query_params.get("rev")
+    selected = int(selected) if selected and selected.isdigit() else (revisions[0].revision if revisions else None)
+
+    diff_table = previous = current = None
+    if selected is not None:
+        pair = await get_revision_pair(db, article_id, selected)
+        if pair:
+            previous, current = pair
+            diff_table = await run_in_process(
+                "revision_diff",
+                html_diff_table,
+                previous.content if previous else "",
+                current.content,
+                f"Rewizja {previous.revision}" if previous else "",
+                f"Rewizja {current.revision}",
+            )
+
+    return templates.TemplateResponse("panel/articles/history.html", {
+        "request": request,
+        "admin": admin,
+        "active_page": "articles",
+        "article": article,
+        "revisions": revisions,
+        "selected": selected,
+        "previous": previous,
+        "current": current,
+        "diff_table": diff_table,
+    })
+
+
 @router.post("/articles/{article_id}/toggle-status")
 async def article_toggle_status(
     request: Request,
@@ -335,6 +450,8 @@ async def article_toggle_status(
         if article.published_at is None:
             article.published_at = datetime.utcnow()
     await db.commit()
+    invalidate_dashboard_stats()
+    invalidate_slug_index()
 
     referer = request.headers.get("referer", "")
     if f"/articles/{article_id}/edit" in referer:
@@ -349,9 +466,7 @@ async def article_delete(
     admin: dict = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    article = await get_article_by_id(db, article_id)
-    if article:
-        await delete_article(db, article)
+    await delete_articles(db, [article_id])
     return RedirectResponse(url="/panel/articles", status_code=303)
 
 
@@ -398,6 +513,7 @@ async def category_create(
     category = Category(name=name, slug=slug, description=description)
     db.add(category)
     await db.commit()
+    invalidate_dashboard_stats()
     return RedirectResponse(url="/panel/categories?saved=1", status_code=303)
 
 
@@ -428,11 +544,11 @@ async def category_delete(
     admin: dict = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(Category).where(Category.id == category_id))
-    category = result.scalar_one_or_none()
-    if category:
-        await db.delete(category)
-        await db.commit()
+    # Articles keep existing uncategorised (ON DELETE SET NULL)
+    result = await db.execute(delete(Category).where(Category.id == category_id))
+    await db.commit()
+    if result.rowcount:
+        invalidate_dashboard_stats()
     return RedirectResponse(url="/panel/categories", status_code=303)
 
 
@@ -478,16 +594,15 @@ async def tag_delete(
     admin: dict = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(Tag).where(Tag.id == tag_id))
-    tag = result.scalar_one_or_none()
-    if tag:
-        await db.delete(tag)
-        await db.commit()
+    await db.execute(delete(Tag).where(Tag.id == tag_id))
+    await db.commit()
     return RedirectResponse(url="/panel/tags", status_code=303)
 
 
 # ──── Comments moderation ─────────────────────────────────────────────────────
 
+COMMENT_STATES = {"approved": True, "hidden": False}
+
 
 @router.get("/comments", response_class=HTMLResponse)
 async def comments_page(
@@ -495,20 +610,76 @@ async def comments_page(
     admin: dict = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(Comment)
-        .options(selectinload(Comment.article))
-        .order_by(Comment.created_at.desc())
+    params = request.query_params
+    state = params.get("state", "")
+    article_id = params.get("article", "")
+    ip = params.get("ip", "").strip()
+    before = params.get("before", "")
+
+    comments, has_more = await get_moderation_queue(
+        db,
+        approved=COMMENT_STATES.get(state),
+        article_id=int(article_id) if article_id.isdigit() else None,
+        ip_address=ip or None,
+        before_id=int(before) if before.isdigit() else None,
     )
-    comments = list(result.scalars().all())
-    return templates.TemplateResponse("panel/comments/list.html", {
+
+    filters = {"state": state, "article": article_id, "ip": ip}
+    more_url = None
+    if has_more:
+        query = {k: v for k, v in filters.items() if v}
+        more_url = f"/panel/comments?{urlencode({**query, 'before': comments[-1].id})}"
+
+    context = {
         "request": request,
+        "comments": comments,
+        "more_url": more_url,
+    }
+    if _is_htmx(request):
+        return templates.TemplateResponse("panel/comments/rows.html", context)
+
+    return templates.TemplateResponse("panel/comments/list.html", {
+        **context,
         "admin": admin,
         "active_page": "comments",
-        "comments": comments,
+        "filters": filters,
     })
 
 
+async def _moderate(request: Request, db: AsyncSession, action: str, ids: list[int]):
+    """Apply a moderation action to comment ids.
+
+    HTMX callers get out-of-band fragments for just the affected rows; plain
+    form posts fall back to the old redirect.
+    """
+    if action == "delete":
+        await delete_comments(db, ids)
+    elif action in ("approve", "hide"):
+        await set_comments_approved(db, ids, action == "approve")
+
+    if not _is_htmx(request):
+        return RedirectResponse(url="/panel/comments", status_code=303)
+
+    if action == "delete":
+        return HTMLResponse("".join(f'<div id="comment-{i}" hx-swap-oob="delete"></div>' for i in ids))
+    return templates.TemplateResponse("panel/comments/rows.html", {
+        "request": request,
+        "comments": await get_comments_by_ids(db, ids),
+        "oob": True,
+    })
+
+
+@router.post("/comments/bulk")
+async def comments_bulk(
+    request: Request,
+    admin: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    form = await request.form()
+    ids = [int(i) for i in form.getlist("ids") if str(i).isdigit()]
+    return await _moderate(request, db, form.get("action", ""), ids)
+
+
 @router.post("/comments/{comment_id}/approve")
 async def comment_approve(
     request: Request,
@@ -516,12 +687,7 @@ async def comment_approve(
     admin: dict = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(Comment).where(Comment.id == comment_id))
-    comment = result.scalar_one_or_none()
-    if comment:
-        comment.is_approved = True
-        await db.commit()
-    return RedirectResponse(url="/panel/comments", status_code=303)
+    return await _moderate(request, db, "approve", [comment_id])
 
 
 @router.post("/comments/{comment_id}/hide")
@@ -531,12 +697,7 @@ async def comment_hide(
     admin: dict = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(Comment).where(Comment.id == comment_id))
-    comment = result.scalar_one_or_none()
-    if comment:
-        comment.is_approved = False
-        await db.commit()
-    return RedirectResponse(url="/panel/comments", status_code=303)
+    return await _moderate(request, db, "hide", [comment_id])
 
 
 @router.post("/comments/{comment_id}/delete")
@@ -546,12 +707,7 @@ async def comment_delete(
     admin: dict = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(Comment).where(Comment.id == comment_id))
-    comment = result.scalar_one_or_none()
-    if comment:
-        await db.delete(comment)
-        await db.commit()
-    return RedirectResponse(url="/panel/comments", status_code=303)
+    return await _moderate(request, db, "delete", [comment_id])
 
 
 # ──── Blacklist ───────────────────────────────────────────────────────────────
@@ -594,11 +750,8 @@ async def blacklist_delete(
     admin: dict = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(BlacklistedWord).where(BlacklistedWord.id == word_id))
-    word = result.scalar_one_or_none()
-    if word:
-        await db.delete(word)
-        await db.commit()
+    await db.execute(delete(BlacklistedWord).where(BlacklistedWord.id == word_id))
+    await db.commit()
     return RedirectResponse(url="/panel/blacklist", status_code=303)
 
 
@@ -611,37 +764,116 @@ async def media_page(
     admin: dict = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    media_list = await get_all_media(db)
+    return await _render_media_page(
+        request, admin, db,
+        flash_success=UPLOAD_FLASH.get(request.query_params.get("uploaded", "")),
+    )
+
+
+async def _render_media_page(request: Request, admin: dict, db: AsyncSession, **flash):
+    after = request.query_params.get("after")
+    media_list, next_cursor = await get_media_page(db, after=after, per_page=MEDIA_PER_PAGE)
     return templates.TemplateResponse("panel/media.html", {
         "request": request,
         "admin": admin,
         "active_page": "media",
         "media_list": media_list,
-        "flash_success": request.query_params.get("uploaded") and "Plik przesłany." or None,
+        "usage_counts": await get_usage_counts(db, [m.id for m in media_list]),
+        "is_first_page": not after,
+        "next_url": f"/panel/media?after={next_cursor}" if next_cursor else None,
+        **flash,
+    })
+
+
+@router.get("/media/picker", response_class=HTMLResponse)
+async def media_picker(
+    request: Request,
+    admin: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """Media picker grid for the article editor, loaded via HTMX when opened."""
+    q = request.query_params.get("q", "").strip()
+    media_list, next_cursor = await get_media_page(
+        db, q=q or None, after=request.query_params.get("after"), per_page=PICKER_PER_PAGE
+    )
+    next_url = None
+    if next_cursor:
+        next_url = "/panel/media/picker?" + urlencode({k: v for k, v in {"q": q, "after": next_cursor}.items() if v})
+    return templates.TemplateResponse("panel/media_picker.html", {
+        "request": request,
+        "media_list": media_list,
+        "next_url": next_url,
+        "query": q,
     })
 
 
+@router.get("/media/{media_id}/thumb")
+async def media_thumbnail(
+    media_id: int,
+    admin: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    media = await get_media_by_id(db, media_id)
+    if not media:
+        return Response(status_code=404)
+    try:
+        path = await ensure_thumbnail(media)
+    except (OSError, ValueError):
+        # Not decodable by Pillow - fall back to the original file, if it's still there
+        path = UPLOAD_DIR / media.filename
+        if not path.is_file():
+            return Response(status_code=404)
+    return FileResponse(path, headers={"Cache-Control": "private, max-age=86400"})
+
+
 @router.post("/media/upload")
 async def media_upload(
     request: Request,
     admin: dict = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    form = await request.form()
-    file: UploadFile = form.get("file")
-    alt_text = form.get("alt_text", "").strip() or None
-
-    result = await upload_media(db, file, alt_text)
-    if isinstance(result, str):
-        media_list = await get_all_media(db)
-        return templates.TemplateResponse("panel/media.html", {
-            "request": request,
-            "admin": admin,
-            "active_page": "media",
-            "media_list": media_list,
-            "flash_error": result,
-        })
-    return RedirectResponse(url="/panel/media?uploaded=1", status_code=303)
+    # The body is streamed here rather than via request.form(); CSRFMiddleware
+    # leaves this path to us and the token is checked before any file is written.
+    try:
+        fields, uploads = await receive_uploads(request, csrf_token=request.cookies.get("csrf_token") or "")
+    except UploadRejected as exc:
+        return Response(str(exc), status_code=exc.status_code)
+
+    alt_text = fields.get("alt_text", "").strip() or None
+    errors = []
+    reused = False
+    try:
+        for upload in uploads:
+            result = await upload_media(db, upload, alt_text)
+            if isinstance(result, str):
+                errors.append(result)
+            elif result.ref_count > 1:
+                reused = True
+    finally:
+        for upload in uploads:
+            upload.discard()  # temp files not renamed into place (errors, exceptions)
+
+    if errors:
+        return await _render_media_page(request, admin, db, flash_error=" ".join(errors))
+    if not uploads:
+        return await _render_media_page(request, admin, db, flash_error="Nie wybrano pliku.")
+    return RedirectResponse(url=f"/panel/media?uploaded={'dup' if reused else '1'}", status_code=303)
+
+
+@router.get("/media/{media_id}/usage", response_class=HTMLResponse)
+async def media_usage(
+    request: Request,
+    media_id: int,
+    admin: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """Articles and pages using one media file, loaded into the media grid via HTMX."""
+    articles, pages = await get_media_usage(db, media_id)
+    return templates.TemplateResponse("panel/media_usage.html", {
+        "request": request,
+        "articles": articles,
+        "pages": pages,
+    })
 
 
 @router.post("/media/{media_id}/delete")
@@ -651,7 +883,9 @@ async def media_delete_endpoint(
     admin: dict = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    await delete_media(db, media_id)
+    error = await delete_media(db, media_id)
+    if error:
+        return await _render_media_page(request, admin, db, flash_error=error)
     return RedirectResponse(url="/panel/media", status_code=303)
 
 
@@ -690,6 +924,7 @@ async def message_toggle_read(
     if msg:
         msg.is_read = not msg.is_read
         await db.commit()
+        invalidate_dashboard_stats()
     return RedirectResponse(url="/panel/messages", status_code=303)
 
 
@@ -700,11 +935,10 @@ async def message_delete(
     admin: dict = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(ContactMessage).where(ContactMessage.id == message_id))
-    msg = result.scalar_one_or_none()
-    if msg:
-        await db.delete(msg)
-        await db.commit()
+    result = await db.execute(delete(ContactMessage).where(ContactMessage.id == message_id))
+    await db.commit()
+    if result.rowcount:
+        invalidate_dashboard_stats()
     return RedirectResponse(url="/panel/messages", status_code=303)
 
 
@@ -747,8 +981,150 @@ async def page_update(
     form = await request.form()
     page.title = form.get("title", "").strip()
     page.content_md = form.get("content_md", "")
-    page.content_html = render_markdown(page.content_md)
+    page.content_html = await render_markdown_async(page.content_md)
     page.meta_title = form.get("meta_title", "").strip() or None
     page.meta_description = form.get("meta_description", "").strip() or None
+    await sync_media_usage(db, page_id=page.id, texts=(page.content_md,))
     await db.commit()
     return RedirectResponse(url=f"/panel/pages/{slug}/edit?saved=1", status_code=303)
+
+
+# ──── Export / import ────────────────────────────────────────────────────────
+
+EXPORT_FORMATS = {
+    "jsonl": (export_jsonl, "application/x-ndjson", "jsonl"),
+    "zip": (export_markdown_zip, "application/zip", "zip"),
+}
+
+
+@router.get("/transfer", response_class=HTMLResponse)
+async def transfer_page(
+    request: Request,
+    admin: dict = Depends(require_admin),
+):
+    return templates.TemplateResponse("panel/transfer.html", {
+        "request": request,
+        "admin": admin,
+        "active_page": "transfer",
+    })
+
+
+@router.get("/export")
+async def export_content(
+    request: Request,
+    admin: dict = Depends(require_admin),
+):
+    exporter, media_type, ext = EXPORT_FORMATS.get(request.query_params.get("format", ""), EXPORT_FORMATS["jsonl"])
+
+    # The request-scoped session is closed before a streaming body is sent,
+    # so the export owns its session for as long as it streams.
+    async def body():
+        async with async_session() as session:
+            async for chunk in exporter(session):
+                yield chunk
+
+    filename = f"projektfire-{datetime.utcnow():%Y%m%d-%H%M}.{ext}"
+    return StreamingResponse(body(), media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    })
+
+
+@router.post("/import", response_class=HTMLResponse)
+async def import_content(
+    request: Request,
+    admin: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    # Streamed like media uploads: CSRFMiddleware leaves this path to us.
+    try:
+        _, uploads = await receive_import(request, csrf_token=request.cookies.get("csrf_token") or "")
+    except UploadRejected as exc:
+        return Response(str(exc), status_code=exc.status_code)
+
+    context = {"request": request, "admin": admin, "active_page": "transfer"}
+    try:
+        if not uploads:
+            context["flash_error"] = "Nie wybrano pliku."
+        elif uploads[0].error:
+            context["flash_error"] = "Plik zbyt duży lub nieobsługiwany typ pliku (oczekiwano .jsonl)."
+        else:
+            try:
+                context["result"] = await import_jsonl(db, uploads[0].temp_path)
+                context["flash_success"] = "Import zakończony."
+            except SQLAlchemyError as exc:
+                await db.rollback()
+                context["flash_error"] = f"Import przerwany, nic nie zostało zapisane: {exc.__class__.__name__}"
+            except (ValueError, TypeError) as exc:
+                await db.rollback()
+                context["flash_error"] = f"Nieprawidłowe dane w pliku importu, nic nie zostało zapisane: {exc}"
+    finally:
+        for upload in uploads:
+            upload.discard()
+    return templates.TemplateResponse("panel/transfer.html", context)
+
+
+# ──── Runtime metrics ─────────────────────────────────────────────────────────
+
+
+@router.get("/metrics", response_class=HTMLResponse)
+async def metrics_page(
+    request: Request,
+    admin: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    return templates.TemplateResponse("panel/metrics.html", {
+        "request": request,
+        "admin": admin,
+        "active_page": "metrics",
+        "metrics": await get_runtime_metrics(db),
+    })
+
+
+@router.get("/metrics.json")
+async def metrics_json(
+    admin: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """Same figures for scripts; each call reports the worker that served it."""
+    return JSONResponse(await get_runtime_metrics(db))
+
+
+# ──── Background jobs ─────────────────────────────────────────────────────────
+
+
+@router.get("/jobs", response_class=HTMLResponse)
+async def jobs_page(
+    request: Request,
+    admin: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    return templates.TemplateResponse("panel/jobs.html", {
+        "request": request,
+        "admin": admin,
+        "active_page": "jobs",
+        "queue": await get_queue_stats(db),
+        "queued": request.query_params.get("queued"),
+    })
+
+
+@router.post("/jobs/{job_id}/retry")
+async def job_retry(
+    request: Request,
+    job_id: int,
+    admin: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    await retry_job(db, job_id)
+    return RedirectResponse(url="/panel/jobs", status_code=303)
+
+
+@router.post("/jobs/rerender")
+async def jobs_rerender(
+    request: Request,
+    admin: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """Queue a re-render of every article and page (e.g. after a Markdown change)."""
+    await enqueue(db, "rerender_content")
+    await db.commit()
+    return RedirectResponse(url="/panel/jobs?queued=1", status_code=303)
@@ -4,16 +4,23 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.database import get_db
-from app.models.article import Article, ArticleStatus
+from app.database import get_read_db
+from app.models.article import IS_PUBLISHED, Article
 from app.models.category import Category
 from app.models.static_page import StaticPage
 
 router = APIRouter(tags=["seo"])
 
+_SITEMAP_ARTICLES = (
+    select(Article.slug, Article.updated_at, Article.published_at, Article.created_at)
+    .where(IS_PUBLISHED)
+    .order_by(Article.published_at.desc())
+)
+_SITEMAP_CATEGORIES = select(Category.slug).order_by(Category.name)
+
 
 @router.get("/sitemap.xml", response_class=Response)
-async def sitemap(request: Request, db: AsyncSession = Depends(get_db)):
+async def sitemap(request: Request, db: AsyncSession = Depends(get_read_db)):
     base = settings.SITE_URL
 
     urls = []
@@ -28,13 +35,8 @@ async def sitemap(request: Request, db: AsyncSession = Depends(get_db)):
     urls.extend(static_pages)
 
     # Published articles
-    result = await db.execute(
-        select(Article)
-        .where(Article.status == ArticleStatus.PUBLISHED)
-        .order_by(Article.published_at.desc())
-    )
-    articles = result.scalars().all()
-    for article in articles:
+    result = await db.execute(_SITEMAP_ARTICLES)
+    for article in result:
         lastmod = (article.updated_at or article.published_at or article.created_at).strftime("%Y-%m-%d")
         urls.append({
             "loc": f"{base}/{article.slug}",
@@ -44,9 +46,8 @@ async def sitemap(request: Request, db: AsyncSession = Depends(get_db)):
         })
 
     # Categories
-    result = await db.execute(select(Category).order_by(Category.name))
-    categories = result.scalars().all()
-    for cat in categories:
+    result = await db.execute(_SITEMAP_CATEGORIES)
+    for cat in result:
         urls.append({
             "loc": f"{base}/kategoria/{cat.slug}",
             "priority": "0.6",
@@ -1,13 +1,23 @@
+import re
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 
-from sqlalchemy import func, select
+from sqlalchemy import Integer, any_, bindparam, delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import contains_eager, load_only, noload, selectinload
 
-from app.models.article import Article, ArticleStatus, article_tag
+from app.database import gather_reads
+from app.models.article import IS_PUBLISHED, IS_SCHEDULED, Article, ArticleStatus, article_tag
 from app.models.category import Category
 from app.models.tag import Tag
-from app.utils.markdown import render_markdown
+from app.services.media_service import sync_media_usage
+from app.services.revision_service import record_revision
+from app.services.slug_service import invalidate_slug_index, record_slug_change, release_slug
+from app.services.stats_service import invalidate_dashboard_stats
+from app.utils.markdown import render_markdown_async
+from app.utils.pagination import decode_cursor, encode_cursor
 from app.utils.seo import generate_slug
 
 
@@ -39,6 +49,204 @@ async def get_articles(
     return articles, total
 
 
+# Columns the panel article table can be sorted by (whitelist for ?sort=).
+PANEL_SORT_COLUMNS = {
+    "created_at": Article.created_at,
+    "updated_at": Article.updated_at,
+    "title": Article.title,
+}
+
+
+@dataclass
+class ArticlePage:
+    """One keyset-paginated page of the panel article table."""
+
+    articles: list[Article]
+    total: int
+    next_cursor: str | None
+    prev_cursor: str | None
+
+
+async def get_articles_page(
+    session: AsyncSession,
+    *,
+    status: ArticleStatus | None = None,
+    category_id: int | None = None,
+    tag_id: int | None = None,
+    q: str | None = None,
+    sort: str = "created_at",
+    descending: bool = True,
+    after: str | None = None,
+    before: str | None = None,
+    per_page: int = 25,
+) -> ArticlePage:
+    """Keyset-paginated article list for the panel.
+
+    Only the columns shown in the table are loaded (no content_md/content_html,
+    no tags) and the category name comes from the same query via a join.
+    """
+    if sort not in PANEL_SORT_COLUMNS:
+        sort = "created_at"
+    sort_col = PANEL_SORT_COLUMNS[sort]
+
+    filters = []
+    if status:
+        filters.append(Article.status == status)
+    if category_id:
+        filters.append(Article.category_id == category_id)
+    if tag_id:
+        filters.append(
+            Article.id.in_(select(article_tag.c.article_id).where(article_tag.c.tag_id == tag_id))
+        )
+    if q:
+        filters.append(Article.title.icontains(q, autoescape=True))
+
+    total = (await session.execute(select(func.count(Article.id)).where(*filters))).scalar() or 0
+
+    query = (
+        select(Article)
+        .outerjoin(Article.category)
+        .options(
+            load_only(
+                Article.id,
+                Article.title,
+                Article.slug,
+                Article.status,
+                Article.category_id,
+                Article.created_at,
+                Article.updated_at,
+                Article.published_at,
+                Article.scheduled_publish_at,
+            ),
+            contains_eager(Article.category).load_only(Category.id, Category.name),
+            noload(Article.tags),
+        )
+        .where(*filters)
+    )
+
+    # Paging backwards walks the index in the opposite direction, then flips the rows.
+    backwards = before is not None and after is None
+    token = before if backwards else after
+    cursor = decode_cursor(token, is_datetime=sort != "title") if token else None
+    forward_desc = descending != backwards
+    if cursor:
+        key = tuple_(sort_col, Article.id)
+        query = query.where(key < tuple_(*cursor) if forward_desc else key > tuple_(*cursor))
+    if forward_desc:
+        query = query.order_by(sort_col.desc(), Article.id.desc())
+    else:
+        query = query.order_by(sort_col.asc(), Article.id.asc())
+    query = query.limit(per_page + 1)
+
+    articles = list((await session.execute(query)).scalars().unique().all())
+    has_more = len(articles) > per_page
+    articles = articles[:per_page]
+    if backwards:
+        articles.reverse()
+
+    if backwards:
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, cursor is not None
+
+    return ArticlePage(
+        articles=articles,
+        total=total,
+        next_cursor=encode_cursor(getattr(articles[-1], sort), articles[-1].id) if has_next and articles else None,
+        prev_cursor=encode_cursor(getattr(articles[0], sort), articles[0].id) if has_prev and articles else None,
+    )
+
+
+class CategoryRef:
+    """Category name/slug carried by an ArticleSummary (what the cards link to)."""
+
+    __slots__ = ("name", "slug")
+
+    def __init__(self, name: str, slug: str):
+        self.name = name
+        self.slug = slug
+
+
+class ArticleSummary:
+    """Read-only projection of an article for listings (cards, search, start page).
+
+    Built straight from result rows, so listings skip content_md/content_html,
+    tags and the ORM identity map entirely.
+    """
+
+    __slots__ = ("id", "title", "slug", "excerpt", "featured_image", "published_at", "created_at", "category")
+
+    def __init__(self, row):
+        self.id = row.id
+        self.title = row.title
+        self.slug = row.slug
+        self.excerpt = row.excerpt
+        self.featured_image = row.featured_image
+        self.published_at = row.published_at
+        self.created_at = row.created_at
+        self.category = CategoryRef(row.category_name, row.category_slug) if row.category_slug else None
+
+
+def summary_select():
+    """SELECT of the card columns with the category joined in the same query."""
+    return select(
+        Article.id,
+        Article.title,
+        Article.slug,
+        Article.excerpt,
+        Article.featured_image,
+        Article.published_at,
+        Article.created_at,
+        Category.name.label("category_name"),
+        Category.slug.label("category_slug"),
+    ).outerjoin(Category, Article.category_id == Category.id)
+
+
+async def fetch_summaries(session: AsyncSession, query, params: dict | None = None) -> list[ArticleSummary]:
+    result = await session.execute(query, params)
+    return [ArticleSummary(row) for row in result]
+
+
+@lru_cache(maxsize=None)
+def _published_summaries_stmts(order_by: str, by_category: bool):
+    """(page, count) statements for one listing variant, built once per process.
+
+    Values are bound at execute time (:category_id, :offset, :limit). Reusing
+    the same statement object skips rebuilding it and its cache key per request.
+    """
+    filters = [IS_PUBLISHED]
+    if by_category:
+        filters.append(Article.category_id == bindparam("category_id"))
+    page = (
+        summary_select()
+        .where(*filters)
+        .order_by(getattr(Article, order_by).desc())
+        .offset(bindparam("offset"))
+        .limit(bindparam("limit"))
+    )
+    return page, select(func.count(Article.id)).where(*filters)
+
+
+async def get_published_summaries(
+    session: AsyncSession,
+    *,
+    category_id: int | None = None,
+    order_by=Article.published_at,
+    page: int = 1,
+    per_page: int = 10,
+) -> tuple[list[ArticleSummary], int]:
+    """Paginated published articles as summaries. Returns (summaries, total_count)."""
+    page_stmt, count_stmt = _published_summaries_stmts(order_by.key, category_id is not None)
+    params = {"category_id": category_id} if category_id is not None else {}
+
+    total, summaries = await gather_reads(
+        session,
+        lambda s: s.scalar(count_stmt, params),
+        lambda s: fetch_summaries(s, page_stmt, {**params, "offset": (page - 1) * per_page, "limit": per_page}),
+    )
+    return summaries, total or 0
+
+
 async def get_article_by_id(session: AsyncSession, article_id: int) -> Article | None:
     result = await session.execute(
         select(Article)
@@ -48,19 +256,30 @@ async def get_article_by_id(session: AsyncSession, article_id: int) -> Article |
     return result.scalar_one_or_none()
 
 
-async def _ensure_unique_slug(session: AsyncSession, slug: str, exclude_id: int | None = None) -> str:
-    """Ensure slug is unique, appending -2, -3, etc. if needed."""
-    base_slug = slug
-    counter = 1
-    while True:
-        query = select(Article.id).where(Article.slug == slug)
-        if exclude_id:
-            query = query.where(Article.id != exclude_id)
-        result = await session.execute(query)
-        if result.scalar_one_or_none() is None:
-            return slug
+def first_free_slug(base: str, taken: set[str]) -> str:
+    """base, or base-2, base-3, ... - the first one not in taken."""
+    slug, counter = base, 1
+    while slug in taken:
         counter += 1
-        slug = f"{base_slug}-{counter}"
+        slug = f"{base}-{counter}"
+    return slug
+
+
+def slug_family_pattern(bases) -> str:
+    """Regex matching each base slug and its numeric-suffix variants."""
+    return "^(" + "|".join(re.escape(b) for b in bases) + ")(-[0-9]+)?$"
+
+
+async def _ensure_unique_slug(session: AsyncSession, slug: str, exclude_id: int | None = None) -> str:
+    """Ensure slug is unique, appending -2, -3, etc. if needed.
+
+    All slug, slug-N rows are fetched in one query and the gap found in Python.
+    """
+    query = select(Article.slug).where(Article.slug.regexp_match(slug_family_pattern([slug])))
+    if exclude_id:
+        query = query.where(Article.id != exclude_id)
+    taken = set((await session.execute(query)).scalars())
+    return first_free_slug(slug, taken)
 
 
 async def _resolve_tags(session: AsyncSession, tag_ids: list[int]) -> list[Tag]:
@@ -70,6 +289,10 @@ async def _resolve_tags(session: AsyncSession, tag_ids: list[int]) -> list[Tag]:
     return list(result.scalars().all())
 
 
+def _media_fields(article: Article) -> tuple[str | None, ...]:
+    return (article.content_md, article.featured_image, article.og_image)
+
+
 async def create_article(
     session: AsyncSession,
     *,
@@ -87,7 +310,7 @@ async def create_article(
 ) -> Article:
     raw_slug = generate_slug(custom_slug) if custom_slug else generate_slug(title)
     slug = await _ensure_unique_slug(session, raw_slug)
-    content_html = render_markdown(content_md)
+    content_html = await render_markdown_async(content_md)
 
     article = Article(
         title=title,
@@ -113,7 +336,13 @@ async def create_article(
     article.tags = await _resolve_tags(session, tag_ids or [])
 
     session.add(article)
+    await session.flush()
+    await release_slug(session, slug)
+    await sync_media_usage(session, article_id=article.id, texts=_media_fields(article))
+    await record_revision(session, article.id, title=title, content=content_md)
     await session.commit()
+    invalidate_dashboard_stats()
+    invalidate_slug_index()
     await session.refresh(article)
     return article
 
@@ -134,9 +363,11 @@ async def update_article(
     scheduled_publish_at: datetime | None = None,
     custom_slug: str | None = None,
 ) -> Article:
+    media_before = _media_fields(article)
+    old_title, old_content = article.title, article.content_md
     article.title = title
     article.content_md = content_md
-    article.content_html = render_markdown(content_md)
+    article.content_html = await render_markdown_async(content_md)
     article.excerpt = excerpt
     article.featured_image = featured_image
     article.category_id = category_id
@@ -151,7 +382,13 @@ async def update_article(
     else:
         new_slug = generate_slug(title)
     if new_slug != article.slug:
+        old_slug = article.slug
         article.slug = await _ensure_unique_slug(session, new_slug, exclude_id=article.id)
+        # Only slugs that were ever public have links worth keeping
+        if article.published_at is not None:
+            await record_slug_change(session, article.id, old_slug, article.slug)
+        else:
+            await release_slug(session, article.slug)
 
     # Handle published_at
     if status == ArticleStatus.PUBLISHED and article.published_at is None:
@@ -165,18 +402,58 @@ async def update_article(
 
     article.tags = await _resolve_tags(session, tag_ids or [])
 
+    # Most saves don't touch images - only re-index when the source fields changed
+    if _media_fields(article) != media_before:
+        await sync_media_usage(session, article_id=article.id, texts=_media_fields(article))
+    if (title, content_md) != (old_title, old_content):
+        await record_revision(
+            session, article.id,
+            title=title, content=content_md, old_title=old_title, old_content=old_content,
+        )
+
     await session.commit()
+    invalidate_dashboard_stats()
+    invalidate_slug_index()
     await session.refresh(article)
     return article
 
 
-async def delete_article(session: AsyncSession, article: Article) -> None:
-    await session.delete(article)
+async def delete_articles(session: AsyncSession, ids: list[int]) -> int:
+    """Delete articles in a single DELETE. Returns affected row count.
+
+    Comments, tag links, revisions, slug redirects and media usage go with
+    them through ON DELETE CASCADE, so nothing is loaded into the session.
+    """
+    if not ids:
+        return 0
+    result = await session.execute(
+        delete(Article)
+        .where(Article.id == any_(bindparam("ids", value=list(ids), type_=ARRAY(Integer))))
+        .execution_options(synchronize_session=False)
+    )
     await session.commit()
+    invalidate_dashboard_stats()
+    invalidate_slug_index()
+    return result.rowcount
+
+
+_UPCOMING_PUBLISH_TIMES = select(Article.scheduled_publish_at).where(
+    IS_SCHEDULED,
+    Article.scheduled_publish_at.is_not(None),
+)
+
+
+async def get_upcoming_publish_times(session: AsyncSession) -> list[datetime]:
+    """scheduled_publish_at of every scheduled article, for the publish scheduler."""
+    result = await session.execute(_UPCOMING_PUBLISH_TIMES)
+    return list(result.scalars().all())
+
+
+_ALL_CATEGORIES = select(Category).order_by(Category.name)
 
 
 async def get_all_categories(session: AsyncSession) -> list[Category]:
-    result = await session.execute(select(Category).order_by(Category.name))
+    result = await session.execute(_ALL_CATEGORIES)
     return list(result.scalars().all())
 
 
@@ -186,13 +463,18 @@ async def get_all_tags(session: AsyncSession) -> list[Tag]:
 
 
 async def publish_scheduled_articles(session: AsyncSession) -> int:
-    """Publish articles whose scheduled_publish_at has passed. Returns count."""
+    """Publish articles whose scheduled_publish_at has passed. Returns count.
+
+    Rows another transaction is already publishing are skipped, not waited on.
+    """
     now = datetime.utcnow()
     result = await session.execute(
-        select(Article).where(
-            Article.status == ArticleStatus.SCHEDULED,
+        select(Article)
+        .where(
+            IS_SCHEDULED,
             Article.scheduled_publish_at <= now,
         )
+        .with_for_update(skip_locked=True)
     )
     articles = list(result.scalars().all())
     for article in articles:
@@ -201,4 +483,6 @@ async def publish_scheduled_articles(session: AsyncSession) -> int:
         article.scheduled_publish_at = None
     if articles:
         await session.commit()
+        invalidate_dashboard_stats()
+        invalidate_slug_index()
     return len(articles)
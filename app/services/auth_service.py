@@ -2,6 +2,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.admin import AdminUser
+from app.utils.offload import run_in_thread
 from app.utils.security import verify_password
 
 
@@ -11,7 +12,10 @@ async def authenticate_admin(session: AsyncSession, username: str, password: str
     )
     admin = result.scalar_one_or_none()
 
-    if admin is None or not verify_password(password, admin.password_hash):
+    if admin is None:
+        return None
+    # bcrypt releases the GIL, so a thread keeps the event loop responsive
+    if not await run_in_thread("bcrypt_verify", verify_password, password, admin.password_hash):
         return None
 
     return admin
@@ -1,15 +1,34 @@
-from sqlalchemy import select
+import logging
+import re
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import Integer, any_, bindparam, delete, select, text, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, load_only, noload
 
+from app.models.article import Article
 from app.models.comment import Comment
+from app.services.stats_service import invalidate_dashboard_stats
+
+logger = logging.getLogger(__name__)
+
+MODERATION_PER_PAGE = 50
+# Monthly partitions kept ready beyond the current month
+PARTITION_MONTHS_AHEAD = 3
+# DDL on the parent needs a brief exclusive lock; give up rather than queue behind readers
+PARTITION_LOCK_TIMEOUT = "5s"
+_PARTITION_NAME_RE = re.compile(r"^comments_p(\d{4})(\d{2})$")
+
+_APPROVED_COMMENTS = (
+    select(Comment)
+    .where(Comment.article_id == bindparam("article_id"), Comment.is_approved == True)
+    .order_by(Comment.created_at.asc())
+)
 
 
 async def get_comments_for_article(session: AsyncSession, article_id: int) -> list[Comment]:
-    result = await session.execute(
-        select(Comment)
-        .where(Comment.article_id == article_id, Comment.is_approved == True)
-        .order_by(Comment.created_at.asc())
-    )
+    result = await session.execute(_APPROVED_COMMENTS, {"article_id": article_id})
     return list(result.scalars().all())
 
 
@@ -30,5 +49,152 @@ async def create_comment(
     )
     session.add(comment)
     await session.commit()
+    invalidate_dashboard_stats()
     await session.refresh(comment)
     return comment
+
+
+def _ids_param(ids: list[int]):
+    """`= ANY(:ids)` - one array parameter regardless of how many rows are selected."""
+    return any_(bindparam("ids", value=list(ids), type_=ARRAY(Integer)))
+
+
+def _with_article_title(query):
+    return query.options(
+        joinedload(Comment.article).options(load_only(Article.id, Article.title), noload(Article.tags))
+    )
+
+
+async def get_moderation_queue(
+    session: AsyncSession,
+    *,
+    approved: bool | None = None,
+    article_id: int | None = None,
+    ip_address: str | None = None,
+    before_id: int | None = None,
+    per_page: int = MODERATION_PER_PAGE,
+) -> tuple[list[Comment], bool]:
+    """Newest-first page of comments for moderation. Returns (comments, has_more).
+
+    Pages by id (monotonic with created_at), so deep pages cost the same as the first.
+    """
+    query = select(Comment)
+    if approved is not None:
+        query = query.where(Comment.is_approved == approved)
+    if article_id:
+        query = query.where(Comment.article_id == article_id)
+    if ip_address:
+        query = query.where(Comment.ip_address == ip_address)
+    if before_id:
+        query = query.where(Comment.id < before_id)
+
+    query = _with_article_title(query).order_by(Comment.id.desc()).limit(per_page + 1)
+    comments = list((await session.execute(query)).scalars().all())
+    return comments[:per_page], len(comments) > per_page
+
+
+async def get_comments_by_ids(session: AsyncSession, ids: list[int]) -> list[Comment]:
+    if not ids:
+        return []
+    query = _with_article_title(select(Comment).where(Comment.id == _ids_param(ids)))
+    result = await session.execute(query.order_by(Comment.id.desc()))
+    return list(result.scalars().all())
+
+
+async def set_comments_approved(session: AsyncSession, ids: list[int], approved: bool) -> int:
+    """Approve or hide many comments in a single UPDATE. Returns affected row count."""
+    if not ids:
+        return 0
+    result = await session.execute(
+        update(Comment)
+        .where(Comment.id == _ids_param(ids))
+        .values(is_approved=approved)
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    invalidate_dashboard_stats()
+    return result.rowcount
+
+
+async def delete_comments(session: AsyncSession, ids: list[int]) -> int:
+    """Delete many comments in a single DELETE. Returns affected row count."""
+    if not ids:
+        return 0
+    result = await session.execute(
+        delete(Comment)
+        .where(Comment.id == _ids_param(ids))
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    invalidate_dashboard_stats()
+    return result.rowcount
+
+
+# ──── Partitions ──────────────────────────────────────────────────────────────
+
+
+def _month_start(d: date, offset: int = 0) -> date:
+    months = d.year * 12 + d.month - 1 + offset
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"comments_p{month:%Y%m}"
+
+
+async def _partition_months(session: AsyncSession) -> dict[date, str]:
+    """Existing monthly partitions of comments, keyed by first day of the month."""
+    result = await session.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid"
+        " WHERE i.inhparent = 'comments'::regclass"
+    ))
+    months = {}
+    for (name,) in result:
+        if m := _PARTITION_NAME_RE.match(name):
+            months[date(int(m[1]), int(m[2]), 1)] = name
+    return months
+
+
+async def ensure_comment_partitions(session: AsyncSession, *, months_ahead: int = PARTITION_MONTHS_AHEAD) -> int:
+    """Create any missing partitions from this month to months_ahead. Returns how many."""
+    existing = await _partition_months(session)
+    this_month = _month_start(datetime.utcnow().date())
+    created = 0
+    await session.execute(text(f"SET LOCAL lock_timeout = '{PARTITION_LOCK_TIMEOUT}'"))
+    for offset in range(months_ahead + 1):
+        month = _month_start(this_month, offset)
+        if month in existing:
+            continue
+        await session.execute(text(
+            f"CREATE TABLE {partition_name(month)} PARTITION OF comments"
+            f" FOR VALUES FROM ('{month}') TO ('{_month_start(month, 1)}')"
+        ))
+        created += 1
+    await session.commit()
+    return created
+
+
+async def purge_hidden_comments(session: AsyncSession, *, older_than_days: int) -> tuple[int, int]:
+    """Delete hidden comments from months wholly older than the cutoff.
+
+    Each DELETE touches a single partition through its ix_comments_hidden.
+    A month left with no comments at all is detached and dropped, which
+    hands its space back at once instead of waiting for VACUUM.
+    Returns (comments deleted, partitions dropped).
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    deleted = dropped = 0
+    for month, name in sorted((await _partition_months(session)).items()):
+        if datetime.combine(_month_start(month, 1), datetime.min.time()) > cutoff:
+            break
+        result = await session.execute(text(f"DELETE FROM {name} WHERE NOT is_approved"))
+        deleted += result.rowcount
+        if await session.scalar(text(f"SELECT NOT EXISTS (SELECT 1 FROM {name})")):
+            await session.execute(text(f"SET LOCAL lock_timeout = '{PARTITION_LOCK_TIMEOUT}'"))
+            await session.execute(text(f"ALTER TABLE comments DETACH PARTITION {name}"))
+            await session.execute(text(f"DROP TABLE {name}"))
+            dropped += 1
+        await session.commit()
+    if deleted:
+        invalidate_dashboard_stats()
+    return deleted, dropped
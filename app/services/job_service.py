@@ -0,0 +1,227 @@
+"""Durable background jobs in Postgres (the jobs table).
+
+enqueue() adds a row inside the caller's transaction, so a job exists exactly
+when the change that needs it was committed. A trigger NOTIFYs JOB_CHANNEL on
+insert, waking idle workers (app.worker). Workers claim one job at a time with
+FOR UPDATE SKIP LOCKED: concurrent claimers never block each other and never
+get the same row.
+"""
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.job import Job, JobStatus
+
+JOB_CHANNEL = "jobs"
+# Retry n waits BACKOFF_BASE_SECONDS * 2**(n-1), capped, +-20% jitter
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+# Workers bump heartbeat_at this often while a job runs. A RUNNING job whose
+# heartbeat is older than STALE_AFTER belonged to a worker that died; one that
+# is merely slow keeps beating and is left alone.
+HEARTBEAT_SECONDS = 30
+STALE_AFTER = timedelta(minutes=5)
+LAST_ERROR_MAX_CHARS = 2000
+RECENT_FAILURES = 20
+
+
+async def enqueue(
+    session: AsyncSession,
+    kind: str,
+    payload: dict | None = None,
+    *,
+    priority: int = 0,
+    run_at: datetime | None = None,
+    max_attempts: int = 5,
+    dedupe_key: str | None = None,
+) -> None:
+    """Queue a job; it becomes visible to workers when the caller commits.
+
+    With dedupe_key, nothing is added while a job with that key exists.
+    """
+    stmt = pg_insert(Job).values(
+        kind=kind,
+        payload=payload or {},
+        priority=priority,
+        run_at=run_at or datetime.utcnow(),
+        max_attempts=max_attempts,
+        dedupe_key=dedupe_key,
+    )
+    if dedupe_key is not None:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[Job.dedupe_key])
+    await session.execute(stmt)
+
+
+async def claim_job(session: AsyncSession) -> Job | None:
+    """Mark the next due job RUNNING and return it, or None if nothing is due."""
+    now = datetime.utcnow()
+    next_id = (
+        select(Job.id)
+        .where(Job.status == JobStatus.QUEUED, Job.run_at <= now)
+        .order_by(Job.priority.desc(), Job.run_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    result = await session.execute(
+        update(Job)
+        .where(Job.id == next_id)
+        .values(status=JobStatus.RUNNING, attempts=Job.attempts + 1, started_at=now, heartbeat_at=now)
+        .returning(Job)
+    )
+    job = result.scalar_one_or_none()
+    await session.commit()
+    return job
+
+
+def backoff_seconds(attempts: int) -> float:
+    delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+async def heartbeat(session: AsyncSession, job_id: int) -> None:
+    """Mark a claimed job as still running, so requeue_stale_jobs leaves it alone."""
+    await session.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == JobStatus.RUNNING)
+        .values(heartbeat_at=datetime.utcnow())
+    )
+    await session.commit()
+
+
+async def finish_job(session: AsyncSession, job: Job, error: str | None = None) -> None:
+    """Record the outcome of a claimed job: done, retry later, or failed for good."""
+    now = datetime.utcnow()
+    if error is None:
+        values = {"status": JobStatus.DONE, "finished_at": now, "last_error": None}
+    elif job.attempts < job.max_attempts:
+        values = {
+            "status": JobStatus.QUEUED,
+            "run_at": now + timedelta(seconds=backoff_seconds(job.attempts)),
+            "last_error": error[:LAST_ERROR_MAX_CHARS],
+        }
+    else:
+        values = {"status": JobStatus.FAILED, "finished_at": now, "last_error": error[:LAST_ERROR_MAX_CHARS]}
+    await session.execute(update(Job).where(Job.id == job.id).values(**values))
+    await session.commit()
+
+
+async def requeue_stale_jobs(session: AsyncSession) -> int:
+    """Return RUNNING jobs whose heartbeat stopped (worker killed mid-job) to the queue. Returns count.
+
+    Ones that already used up their attempts are marked FAILED instead.
+    """
+    now = datetime.utcnow()
+    stale = (Job.status == JobStatus.RUNNING, Job.heartbeat_at < now - STALE_AFTER)
+    error = "Worker stopped before the job finished"
+    failed = await session.execute(
+        update(Job)
+        .where(*stale, Job.attempts >= Job.max_attempts)
+        .values(status=JobStatus.FAILED, finished_at=now, last_error=error)
+    )
+    requeued = await session.execute(
+        update(Job).where(*stale).values(status=JobStatus.QUEUED, run_at=now, last_error=error)
+    )
+    await session.commit()
+    return failed.rowcount + requeued.rowcount
+
+
+async def prune_jobs(session: AsyncSession, *, keep_days: int) -> int:
+    """Delete DONE jobs finished more than keep_days ago. Returns count.
+
+    Failed jobs are kept for the panel until retried or the queue is cleared by hand.
+    """
+    result = await session.execute(
+        delete(Job).where(
+            Job.status == JobStatus.DONE,
+            Job.finished_at < datetime.utcnow() - timedelta(days=keep_days),
+        )
+    )
+    await session.commit()
+    return result.rowcount
+
+
+async def retry_job(session: AsyncSession, job_id: int) -> bool:
+    """Put a FAILED job back in the queue with a fresh set of attempts."""
+    result = await session.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == JobStatus.FAILED)
+        .values(status=JobStatus.QUEUED, attempts=0, run_at=datetime.utcnow(), finished_at=None)
+    )
+    await session.commit()
+    return result.rowcount > 0
+
+
+def _latency(interval):
+    seconds = func.extract("epoch", interval)
+    return (
+        func.avg(seconds),
+        func.percentile_cont(0.95).within_group(seconds),
+    )
+
+
+async def get_queue_stats(session: AsyncSession, *, window: timedelta = timedelta(hours=1)) -> dict:
+    """Queue depth per kind and status, plus wait/run latency of jobs finished in the window."""
+    now = datetime.utcnow()
+    depth_rows = await session.execute(
+        select(
+            Job.kind,
+            func.count().filter(Job.status == JobStatus.QUEUED, Job.run_at <= now),
+            func.count().filter(Job.status == JobStatus.QUEUED, Job.run_at > now),
+            func.count().filter(Job.status == JobStatus.RUNNING),
+            func.count().filter(Job.status == JobStatus.FAILED),
+            func.min(Job.run_at).filter(Job.status == JobStatus.QUEUED, Job.run_at <= now),
+        )
+        .where(Job.status != JobStatus.DONE)
+        .group_by(Job.kind)
+        .order_by(Job.kind)
+    )
+    depth = [
+        {
+            "kind": kind,
+            "ready": ready,
+            "delayed": delayed,
+            "running": running,
+            "failed": failed,
+            "oldest_wait": (now - oldest).total_seconds() if oldest else None,
+        }
+        for kind, ready, delayed, running, failed, oldest in depth_rows
+    ]
+
+    since = now - window
+    wait_avg, wait_p95 = _latency(Job.started_at - Job.run_at)
+    run_avg, run_p95 = _latency(Job.finished_at - Job.started_at)
+    latency_rows = await session.execute(
+        select(Job.kind, func.count(), wait_avg, wait_p95, run_avg, run_p95)
+        .where(Job.status == JobStatus.DONE, Job.finished_at >= since)
+        .group_by(Job.kind)
+        .order_by(Job.kind)
+    )
+    latency = [
+        {
+            "kind": kind,
+            "done": done,
+            "wait_avg_ms": round(float(w_avg) * 1000, 1),
+            "wait_p95_ms": round(float(w_p95) * 1000, 1),
+            "run_avg_ms": round(float(r_avg) * 1000, 1),
+            "run_p95_ms": round(float(r_p95) * 1000, 1),
+        }
+        for kind, done, w_avg, w_p95, r_avg, r_p95 in latency_rows
+    ]
+
+    failures = (await session.execute(
+        select(Job)
+        .where(Job.status == JobStatus.FAILED)
+        .order_by(Job.finished_at.desc())
+        .limit(RECENT_FAILURES)
+    )).scalars().all()
+
+    return {
+        "depth": depth,
+        "latency": latency,
+        "window_minutes": int(window.total_seconds() // 60),
+        "failures": failures,
+    }
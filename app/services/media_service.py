@@ -1,67 +1,343 @@
+import asyncio
+import logging
 import os
-import uuid
+import re
+from datetime import datetime, timedelta
 from pathlib import Path
 
-from fastapi import UploadFile
-from sqlalchemy import select
+from fastapi import Request
+from sqlalchemy import delete, exists, func, literal_column, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.media import Media
+from app.models.article import Article
+from app.models.media_usage import MediaUsage
+from app.models.media_variant import MediaVariant
+from app.models.static_page import StaticPage
+from app.services.job_service import enqueue
+from app.utils import responsive
+from app.utils.images import generate_variants, make_thumbnail
+from app.utils.offload import run_in_process, run_in_thread
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.uploads import StreamedFile, stream_multipart
+
+logger = logging.getLogger(__name__)
 
 UPLOAD_DIR = Path(__file__).resolve().parent.parent / "static" / "uploads"
+THUMB_DIR = UPLOAD_DIR / "thumbs"
+VARIANT_DIR = UPLOAD_DIR / "variants"
 ALLOWED_MIME_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp", "image/svg+xml"}
+# GIFs may be animated and SVGs are vector - both are served as uploaded.
+RESIZABLE_MIME_TYPES = {"image/jpeg", "image/png", "image/webp"}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+# Stored names are derived from content + type, so identical bytes always map to one file
+MIME_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/svg+xml": ".svg",
+}
+
+# A file name as stored in UPLOAD_DIR: no path separators or dot segments
+UPLOAD_FILENAME_RE = re.compile(r"[\w-]+\.[A-Za-z0-9]+")
+# Originals only: the name part can't contain "/", so thumbs/ and variants/ never match
+UPLOAD_REF_RE = re.compile(r"/static/uploads/(" + UPLOAD_FILENAME_RE.pattern + ")")
+
+def _index_entry(v: MediaVariant) -> tuple[str, int, int, str]:
+    return (v.format, v.width, v.height, v.filename)
+
+
+async def load_variant_index(session: AsyncSession) -> int:
+    """(Re)load the in-memory srcset index from media_variants. Returns entry count."""
+    result = await session.execute(
+        select(Media.filename, MediaVariant.format, MediaVariant.width, MediaVariant.height, MediaVariant.filename)
+        .join(MediaVariant, MediaVariant.media_id == Media.id)
+    )
+    index: dict[str, list[tuple[str, int, int, str]]] = {}
+    for original, fmt, width, height, name in result:
+        index.setdefault(original, []).append((fmt, width, height, name))
+    responsive.replace_index(index)
+    return len(index)
+
+
+async def generate_media_variants(session: AsyncSession, media: Media) -> list[MediaVariant]:
+    """Generate responsive variants for media in the process pool and record them.
+
+    Runs as a media_variants job (see app.worker), so errors propagate and the
+    job is retried. Does nothing if the variants are already recorded.
+    """
+    if media.mime_type not in RESIZABLE_MIME_TYPES:
+        return []
+    if await session.scalar(select(exists().where(MediaVariant.media_id == media.id))):
+        return []
+
+    written = await run_in_process(
+        "image_variants",
+        generate_variants,
+        str(UPLOAD_DIR / media.filename),
+        str(VARIANT_DIR),
+        Path(media.filename).stem,
+    )
+
+    variants = [MediaVariant(media_id=media.id, **meta) for meta in written]
+    session.add_all(variants)
+    await session.commit()
+    responsive.set_variants(media.filename, [_index_entry(v) for v in variants])
+    return variants
+
+
+async def get_media_page(
+    session: AsyncSession,
+    *,
+    q: str | None = None,
+    after: str | None = None,
+    per_page: int = 24,
+) -> tuple[list[Media], str | None]:
+    """Newest-first media, keyset-paginated on (created_at, id). Returns (media, next_cursor)."""
+    query = select(Media)
+    if q:
+        query = query.where(Media.original_name.icontains(q, autoescape=True))
+    cursor = decode_cursor(after) if after else None
+    if cursor:
+        query = query.where(tuple_(Media.created_at, Media.id) < tuple_(*cursor))
+    query = query.order_by(Media.created_at.desc(), Media.id.desc()).limit(per_page + 1)
+
+    media = list((await session.execute(query)).scalars().all())
+    next_cursor = None
+    if len(media) > per_page:
+        media = media[:per_page]
+        next_cursor = encode_cursor(media[-1].created_at, media[-1].id)
+    return media, next_cursor
+
+
+async def get_media_by_id(session: AsyncSession, media_id: int) -> Media | None:
+    result = await session.execute(select(Media).where(Media.id == media_id))
+    return result.scalar_one_or_none()
+
+
+def referenced_uploads(*texts: str | None) -> set[str]:
+    """Upload filenames referenced from markdown / image URL fields."""
+    names: set[str] = set()
+    for text in texts:
+        if text:
+            names.update(UPLOAD_REF_RE.findall(text))
+    return names
+
+
+async def sync_media_usage(
+    session: AsyncSession,
+    *,
+    article_id: int | None = None,
+    page_id: int | None = None,
+    texts: tuple[str | None, ...],
+) -> None:
+    """Bring media_usage for one article or page in line with its current content.
+
+    Runs in the caller's transaction (commit is left to the caller): one lookup
+    of the referenced filenames, one DELETE of stale rows, one INSERT of new ones.
+    """
+    owner_col = MediaUsage.article_id if article_id is not None else MediaUsage.page_id
+    owner_id = article_id if article_id is not None else page_id
+
+    names = referenced_uploads(*texts)
+    media_ids: list[int] = []
+    if names:
+        result = await session.execute(select(Media.id).where(Media.filename.in_(names)))
+        media_ids = list(result.scalars().all())
+
+    await session.execute(
+        delete(MediaUsage).where(owner_col == owner_id, MediaUsage.media_id.not_in(media_ids))
+    )
+    if media_ids:
+        await session.execute(
+            pg_insert(MediaUsage)
+            .values([{"media_id": mid, owner_col.key: owner_id} for mid in media_ids])
+            .on_conflict_do_nothing()
+        )
 
 
-async def get_all_media(session: AsyncSession) -> list[Media]:
-    result = await session.execute(select(Media).order_by(Media.created_at.desc()))
-    return list(result.scalars().all())
+async def get_usage_counts(session: AsyncSession, media_ids: list[int]) -> dict[int, int]:
+    """{media_id: number of articles/pages using it} for the given ids (missing = unused)."""
+    if not media_ids:
+        return {}
+    result = await session.execute(
+        select(MediaUsage.media_id, func.count())
+        .where(MediaUsage.media_id.in_(media_ids))
+        .group_by(MediaUsage.media_id)
+    )
+    return dict(result.all())
+
+
+async def get_media_usage(session: AsyncSession, media_id: int) -> tuple[list, list]:
+    """(articles, pages) that reference media, as lightweight rows."""
+    articles = await session.execute(
+        select(Article.id, Article.title, Article.slug, Article.status)
+        .join(MediaUsage, MediaUsage.article_id == Article.id)
+        .where(MediaUsage.media_id == media_id)
+        .order_by(Article.title)
+    )
+    pages = await session.execute(
+        select(StaticPage.id, StaticPage.title, StaticPage.slug)
+        .join(MediaUsage, MediaUsage.page_id == StaticPage.id)
+        .where(MediaUsage.media_id == media_id)
+        .order_by(StaticPage.title)
+    )
+    return articles.all(), pages.all()
+
+
+async def collect_orphan_media(session: AsyncSession, *, grace_days: int) -> int:
+    """Delete media older than grace_days that nothing references. Returns count.
+
+    Set-based: one query picks the orphans (skipping rows another worker holds),
+    one fetches their variant filenames, one deletes them all.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=grace_days)
+    orphans = (await session.execute(
+        select(Media.id, Media.filename)
+        .where(
+            Media.created_at < cutoff,
+            ~exists().where(MediaUsage.media_id == Media.id),
+        )
+        .with_for_update(skip_locked=True)
+    )).all()
+    if not orphans:
+        return 0
+
+    ids = [o.id for o in orphans]
+    variant_names = (await session.execute(
+        select(MediaVariant.filename).where(MediaVariant.media_id.in_(ids))
+    )).scalars().all()
+    await session.execute(delete(Media).where(Media.id.in_(ids)))
+    await session.commit()
+
+    await asyncio.to_thread(_remove_media_files, [o.filename for o in orphans], variant_names)
+    for o in orphans:
+        responsive.drop_variants(o.filename)
+    return len(orphans)
+
+
+def _remove_media_files(filenames: list[str], variant_names: list[str]) -> None:
+    for name in filenames:
+        (UPLOAD_DIR / name).unlink(missing_ok=True)
+        (THUMB_DIR / f"{Path(name).stem}.webp").unlink(missing_ok=True)
+    for name in variant_names:
+        (VARIANT_DIR / name).unlink(missing_ok=True)
+
+
+async def ensure_thumbnail(media: Media) -> Path:
+    """Path to a small preview of media, generating it on first use.
+
+    SVGs are already small and scale freely, so the original is returned.
+    """
+    original = UPLOAD_DIR / media.filename
+    if media.mime_type == "image/svg+xml":
+        return original
+    thumb = THUMB_DIR / f"{Path(media.filename).stem}.webp"
+    if not thumb.exists():
+        await run_in_thread("thumbnail", make_thumbnail, original, thumb)
+    return thumb
+
+
+UPLOAD_ERRORS = {
+    "type": "Niedozwolony typ pliku. Dozwolone: JPEG, PNG, GIF, WebP, SVG.",
+    "size": f"Plik zbyt duży. Maksymalny rozmiar: {MAX_FILE_SIZE // (1024*1024)} MB.",
+}
+
+
+async def receive_uploads(request: Request, csrf_token: str | None) -> tuple[dict[str, str], list[StreamedFile]]:
+    """Stream the multipart upload request into temp files inside UPLOAD_DIR."""
+    return await stream_multipart(
+        request,
+        dest_dir=UPLOAD_DIR,
+        max_file_size=MAX_FILE_SIZE,
+        allowed_types=ALLOWED_MIME_TYPES,
+        csrf_token=csrf_token,
+    )
 
 
 async def upload_media(
     session: AsyncSession,
-    file: UploadFile,
+    upload: StreamedFile,
     alt_text: str | None = None,
 ) -> Media | str:
-    """Upload a file. Returns Media on success or error message string."""
-    if file.content_type not in ALLOWED_MIME_TYPES:
-        return "Niedozwolony typ pliku. Dozwolone: JPEG, PNG, GIF, WebP, SVG."
-
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE:
-        return f"Plik zbyt duży. Maksymalny rozmiar: {MAX_FILE_SIZE // (1024*1024)} MB."
-
-    ext = os.path.splitext(file.filename or "file")[1].lower()
-    unique_name = f"{uuid.uuid4().hex}{ext}"
-
-    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-    file_path = UPLOAD_DIR / unique_name
-    with open(file_path, "wb") as f:
-        f.write(content)
-
-    media = Media(
-        filename=unique_name,
-        original_name=file.filename or "file",
-        file_path=str(file_path),
-        file_size=len(content),
-        mime_type=file.content_type or "application/octet-stream",
-        alt_text=alt_text,
+    """Store a streamed upload. Returns Media on success or error message string.
+
+    Files are content-addressed (``<sha256>.<ext>``). Uploading bytes that are
+    already in the library returns the existing Media with its ref_count bumped
+    instead of storing a second copy.
+    """
+    if upload.error:
+        return f"{upload.filename}: {UPLOAD_ERRORS[upload.error]}"
+
+    filename = f"{upload.sha256}{MIME_EXTENSIONS[upload.content_type]}"
+    file_path = UPLOAD_DIR / filename
+
+    # Upsert on the hash: a concurrent upload of the same bytes waits on the row
+    # lock until we commit, so exactly one of them moves its file into place.
+    stmt = (
+        pg_insert(Media)
+        .values(
+            filename=filename,
+            original_name=upload.filename or "file",
+            file_path=str(file_path),
+            file_size=upload.size,
+            mime_type=upload.content_type,
+            alt_text=alt_text,
+            sha256=upload.sha256,
+            ref_count=1,
+        )
+        .on_conflict_do_update(
+            index_elements=[Media.sha256],
+            set_={"ref_count": Media.ref_count + 1},
+        )
+        .returning(Media.id, literal_column("xmax = 0").label("inserted"))
     )
-    session.add(media)
+    row = (await session.execute(stmt)).one()
+    if row.inserted:
+        # Same directory as the temp file, so this is an atomic rename
+        await asyncio.to_thread(os.replace, upload.temp_path, file_path)
+        upload.temp_path = None
+    else:
+        await asyncio.to_thread(upload.discard)
+    if row.inserted and upload.content_type in RESIZABLE_MIME_TYPES:
+        # Variants are built off the request path; srcset appears once they exist
+        await enqueue(session, "media_variants", {"media_id": row.id}, priority=10)
     await session.commit()
-    return media
 
+    return await session.get(Media, row.id, populate_existing=True)
 
-async def delete_media(session: AsyncSession, media_id: int) -> bool:
-    result = await session.execute(select(Media).where(Media.id == media_id))
-    media = result.scalar_one_or_none()
-    if not media:
-        return False
 
-    file_path = UPLOAD_DIR / media.filename
-    if file_path.exists():
-        file_path.unlink()
+async def delete_media(session: AsyncSession, media_id: int) -> str | None:
+    """Drop one reference to media; the row and its files go when none are left.
 
-    await session.delete(media)
+    Returns an error message string if the last copy is still used by an
+    article or page, None otherwise.
+    """
+    result = await session.execute(
+        select(Media.ref_count, Media.filename).where(Media.id == media_id).with_for_update()
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+    if row.ref_count > 1:
+        await session.execute(
+            update(Media).where(Media.id == media_id).values(ref_count=Media.ref_count - 1)
+        )
+        await session.commit()
+        return None
+
+    usage = (await get_usage_counts(session, [media_id])).get(media_id, 0)
+    if usage:
+        await session.rollback()
+        return f"Plik jest używany ({usage}) - najpierw usuń go z treści."
+
+    variants = await session.execute(select(MediaVariant.filename).where(MediaVariant.media_id == media_id))
+    variant_names = variants.scalars().all()
+    await session.execute(delete(Media).where(Media.id == media_id))
     await session.commit()
-    return True
+
+    await asyncio.to_thread(_remove_media_files, [row.filename], variant_names)
+    responsive.drop_variants(row.filename)
+    return None
@@ -0,0 +1,88 @@
+"""Leader-elected scheduler that publishes scheduled articles on time.
+
+Every worker runs run_publish_scheduler(), but only the one holding the
+advisory lock does anything. The others are parked in pg_advisory_lock() on
+their own connection, which costs no queries. If the leader dies its
+connection closes, the lock is released and the next worker takes over.
+
+The leader keeps a min-heap of upcoming scheduled_publish_at times and sleeps
+until the earliest one. A trigger on articles NOTIFYs PUBLISH_CHANNEL whenever
+a schedule is set, changed or cleared (from any worker). The leader LISTENs on
+its lock connection and rebuilds the heap when notified.
+"""
+import asyncio
+import heapq
+import logging
+from datetime import datetime
+
+import asyncpg
+
+from app.database import async_session, asyncpg_dsn
+from app.services.article_service import get_upcoming_publish_times, publish_scheduled_articles
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key for pg_advisory_lock
+PUBLISH_LOCK_KEY = 0x46495245_01
+PUBLISH_CHANNEL = "publish_schedule"
+# Upper bound on one sleep, so a missed notification can't stall publishing for long
+MAX_SLEEP_SECONDS = 3600
+RETRY_SECONDS = 5
+
+
+async def _load_heap() -> list[datetime]:
+    async with async_session() as session:
+        heap = await get_upcoming_publish_times(session)
+    heapq.heapify(heap)
+    return heap
+
+
+async def _publish_due() -> int:
+    async with async_session() as session:
+        return await publish_scheduled_articles(session)
+
+
+async def _lead(conn: asyncpg.Connection) -> None:
+    wake = asyncio.Event()
+    await conn.add_listener(PUBLISH_CHANNEL, lambda *_: wake.set())
+    conn.add_termination_listener(lambda _: wake.set())
+
+    heap = await _load_heap()
+    while not conn.is_closed():
+        now = datetime.utcnow()
+        if heap and heap[0] <= now:
+            count = await _publish_due()
+            if count:
+                logger.info("Published %d scheduled article(s)", count)
+            while heap and heap[0] <= now:
+                heapq.heappop(heap)
+
+        timeout = MAX_SLEEP_SECONDS
+        if heap:
+            timeout = min(timeout, max((heap[0] - datetime.utcnow()).total_seconds(), 0))
+        try:
+            await asyncio.wait_for(wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        # Schedules changed somewhere (including our own publishing), or the
+        # sleep ran out: rebuild either way, which also picks up a schedule
+        # whose notification was missed. Cleared before the reload so a change
+        # made during it wakes us again.
+        wake.clear()
+        heap = await _load_heap()
+
+
+async def run_publish_scheduler() -> None:
+    """Background task: wait for leadership, then publish articles as they come due."""
+    while True:
+        try:
+            conn = await asyncpg.connect(asyncpg_dsn())
+            try:
+                await conn.execute("SELECT pg_advisory_lock($1)", PUBLISH_LOCK_KEY)
+                logger.info("Publish scheduler: this worker is the leader")
+                await _lead(conn)
+            finally:
+                await conn.close()
+        except Exception:
+            logger.exception("Publish scheduler error")
+        await asyncio.sleep(RETRY_SECONDS)
@@ -0,0 +1,192 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.article_revision import ArticleRevision
+from app.utils.offload import run_in_process
+from app.utils.textdelta import apply_delta, make_delta, pack_text, unpack_text
+
+# A full snapshot at least every N revisions bounds how many deltas a read replays
+SNAPSHOT_EVERY = 10
+
+
+@dataclass
+class RevisionText:
+    revision: int
+    title: str
+    content: str
+    created_at: datetime
+
+
+def _content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+async def record_revision(
+    session: AsyncSession,
+    article_id: int,
+    *,
+    title: str,
+    content: str,
+    old_title: str | None = None,
+    old_content: str | None = None,
+) -> None:
+    """Append a revision for an article's new title/content. The caller commits.
+
+    Normally this is a delta against old_content. A snapshot is written instead
+    every SNAPSHOT_EVERY revisions, and for an article's first revision. If the
+    last stored revision doesn't match old_content (no history yet, or the
+    content was changed by an import), old_content is snapshotted first so the
+    previous version is kept and the delta chain stays valid.
+    """
+    last_snapshot = (
+        select(func.max(ArticleRevision.revision))
+        .where(ArticleRevision.article_id == article_id, ArticleRevision.is_snapshot)
+        .scalar_subquery()
+    )
+    result = await session.execute(
+        select(ArticleRevision.revision, ArticleRevision.content_hash, last_snapshot.label("last_snapshot"))
+        .where(ArticleRevision.article_id == article_id)
+        .order_by(ArticleRevision.revision.desc())
+        .limit(1)
+    )
+    last = result.one_or_none()
+    number = last.revision if last else 0
+    snapshot_at = (last.last_snapshot or 0) if last else 0
+
+    if old_content is not None and (last is None or last.content_hash != _content_hash(old_content)):
+        number += 1
+        snapshot_at = number
+        session.add(_snapshot(article_id, number, old_title or title, old_content))
+
+    number += 1
+    if old_content is None or number - snapshot_at >= SNAPSHOT_EVERY:
+        session.add(_snapshot(article_id, number, title, content))
+    else:
+        session.add(ArticleRevision(
+            article_id=article_id,
+            revision=number,
+            is_snapshot=False,
+            title=title,
+            data=await run_in_process("revision_delta", make_delta, old_content, content),
+            content_hash=_content_hash(content),
+            content_length=len(content),
+        ))
+
+
+def _snapshot(article_id: int, number: int, title: str, content: str) -> ArticleRevision:
+    return ArticleRevision(
+        article_id=article_id,
+        revision=number,
+        is_snapshot=True,
+        title=title,
+        data=pack_text(content),
+        content_hash=_content_hash(content),
+        content_length=len(content),
+    )
+
+
+async def get_revisions(session: AsyncSession, article_id: int) -> list:
+    """Newest-first revision list without the payloads (stored size included)."""
+    result = await session.execute(
+        select(
+            ArticleRevision.revision,
+            ArticleRevision.is_snapshot,
+            ArticleRevision.title,
+            ArticleRevision.content_length,
+            func.octet_length(ArticleRevision.data).label("stored_size"),
+            ArticleRevision.created_at,
+        )
+        .where(ArticleRevision.article_id == article_id)
+        .order_by(ArticleRevision.revision.desc())
+    )
+    return list(result.all())
+
+
+async def _replay(session: AsyncSession, article_id: int, first: int, last: int) -> dict[int, RevisionText]:
+    """Reconstruct revisions first..last, starting from the nearest snapshot at or before first."""
+    base = (
+        select(func.max(ArticleRevision.revision))
+        .where(
+            ArticleRevision.article_id == article_id,
+            ArticleRevision.is_snapshot,
+            ArticleRevision.revision <= first,
+        )
+        .scalar_subquery()
+    )
+    result = await session.execute(
+        select(
+            ArticleRevision.revision,
+            ArticleRevision.is_snapshot,
+            ArticleRevision.title,
+            ArticleRevision.data,
+            ArticleRevision.created_at,
+        )
+        .where(
+            ArticleRevision.article_id == article_id,
+            ArticleRevision.revision >= base,
+            ArticleRevision.revision <= last,
+        )
+        .order_by(ArticleRevision.revision)
+    )
+    states: dict[int, RevisionText] = {}
+    content = ""
+    for row in result:
+        content = unpack_text(row.data) if row.is_snapshot else apply_delta(content, row.data)
+        if row.revision >= first:
+            states[row.revision] = RevisionText(row.revision, row.title, content, row.created_at)
+    return states
+
+
+async def get_revision_pair(
+    session: AsyncSession, article_id: int, revision: int
+) -> tuple[RevisionText | None, RevisionText] | None:
+    """(previous, requested) revision texts for a diff; previous is None for the first one."""
+    states = await _replay(session, article_id, max(revision - 1, 1), revision)
+    if revision not in states:
+        return None
+    return states.get(revision - 1), states[revision]
+
+
+async def prune_revisions(session: AsyncSession, *, keep: int) -> int:
+    """Keep the newest `keep` revisions per article; returns the number deleted.
+
+    Only articles over the limit are touched. Their oldest kept revision is
+    rewritten as a snapshot, so it no longer depends on the rows being deleted.
+    """
+    over = await session.execute(
+        select(ArticleRevision.article_id)
+        .group_by(ArticleRevision.article_id)
+        .having(func.count() > keep)
+    )
+    deleted = 0
+    for (article_id,) in over.all():
+        cutoff = (await session.execute(
+            select(ArticleRevision.revision)
+            .where(ArticleRevision.article_id == article_id)
+            .order_by(ArticleRevision.revision.desc())
+            .offset(keep - 1)
+            .limit(1)
+        )).scalar_one()
+        state = (await _replay(session, article_id, cutoff, cutoff))[cutoff]
+        await session.execute(
+            update(ArticleRevision)
+            .where(
+                ArticleRevision.article_id == article_id,
+                ArticleRevision.revision == cutoff,
+                ~ArticleRevision.is_snapshot,
+            )
+            .values(is_snapshot=True, data=pack_text(state.content))
+        )
+        result = await session.execute(
+            delete(ArticleRevision).where(
+                ArticleRevision.article_id == article_id,
+                ArticleRevision.revision < cutoff,
+            )
+        )
+        deleted += result.rowcount
+        await session.commit()
+    return deleted
@@ -1,27 +1,25 @@
-from sqlalchemy import func, select, text
+from sqlalchemy import String, bindparam, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from app.models.article import Article, ArticleStatus
+from app.models.article import IS_PUBLISHED, Article
+from app.services.article_service import ArticleSummary, fetch_summaries, summary_select
+
+_ts_query = func.plainto_tsquery("simple", bindparam("q", type_=String))
+# Built once; the search text and limit are bound per call
+_SEARCH = (
+    summary_select()
+    .where(
+        IS_PUBLISHED,
+        Article.search_vector.op("@@")(_ts_query),
+    )
+    .order_by(func.ts_rank(Article.search_vector, _ts_query).desc())
+    .limit(bindparam("limit"))
+)
 
 
-async def search_articles(session: AsyncSession, query: str, limit: int = 10) -> list[Article]:
+async def search_articles(session: AsyncSession, query: str, limit: int = 10) -> list[ArticleSummary]:
     """Full-text search on articles using PostgreSQL tsvector."""
     if not query or not query.strip():
         return []
 
-    search_query = query.strip()
-
-    result = await session.execute(
-        select(Article)
-        .options(selectinload(Article.category), selectinload(Article.tags))
-        .where(
-            Article.status == ArticleStatus.PUBLISHED,
-            Article.search_vector.op("@@")(func.plainto_tsquery("simple", search_query)),
-        )
-        .order_by(
-            func.ts_rank(Article.search_vector, func.plainto_tsquery("simple", search_query)).desc()
-        )
-        .limit(limit)
-    )
-    return list(result.scalars().all())
+    return await fetch_summaries(session, _SEARCH, {"q": query.strip(), "limit": limit})
@@ -0,0 +1,95 @@
+import asyncio
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session
+from app.models.article import IS_PUBLISHED, Article
+from app.models.slug_redirect import SlugRedirect
+
+SLUG_INDEX_REFRESH_SECONDS = 300
+# NOTIFY channel fired by triggers on articles / slug_redirects (see migration b9e3f7a1d524)
+SLUG_INDEX_CHANNEL = "slug_index"
+
+# Per-worker index of the catch-all /{slug} namespace, so stale links get a 301
+# and unknown slugs (scanner probes, typos) a 404 without a DB round trip:
+#   _published: slugs of published articles
+#   _redirects: former slug -> current slug of a published article
+_published: frozenset[str] = frozenset()
+_redirects: dict[str, str] = {}
+# Bumped by every invalidation; the index is fresh while _loaded_generation
+# matches it. A load only counts for the generation it started in, so an
+# invalidation that arrives mid-load still wins.
+_generation = 1
+_loaded_generation = 0
+_reload_lock = asyncio.Lock()
+
+
+async def load_slug_index(session: AsyncSession) -> int:
+    """(Re)load published slugs and redirects. Returns published slug count."""
+    global _published, _redirects, _loaded_generation
+    generation = _generation
+    published = await session.execute(
+        select(Article.slug).where(IS_PUBLISHED)
+    )
+    redirects = await session.execute(
+        select(SlugRedirect.old_slug, Article.slug)
+        .join(Article, SlugRedirect.article_id == Article.id)
+        .where(IS_PUBLISHED)
+    )
+    published_slugs = frozenset(published.scalars())
+    # A load that started before the current index's load mustn't replace it
+    if generation >= _loaded_generation:
+        _published = published_slugs
+        _redirects = dict(redirects.all())
+        _loaded_generation = generation
+    return len(published_slugs)
+
+
+async def ensure_slug_index() -> None:
+    """Reload the index if a write marked it stale; concurrent callers share one reload.
+
+    Callers wait for the reload instead of reading the stale index. Always
+    reads the primary: a replica that hasn't replayed the write yet would
+    leave the index stale until the next periodic reload.
+    """
+    if _loaded_generation == _generation:
+        return
+    async with _reload_lock:
+        if _loaded_generation != _generation:
+            async with async_session() as session:
+                await load_slug_index(session)
+
+
+def invalidate_slug_index() -> None:
+    """Mark the index stale after a write. Other workers are told via the DB trigger."""
+    global _generation
+    _generation += 1
+
+
+def is_published_slug(slug: str) -> bool:
+    return slug in _published
+
+
+def lookup_redirect(slug: str) -> str | None:
+    return _redirects.get(slug)
+
+
+async def record_slug_change(session: AsyncSession, article_id: int, old_slug: str, new_slug: str) -> None:
+    """Point old_slug at the article (in the caller's transaction).
+
+    The redirect stores the article id, not the target slug, so a chain of
+    renames always resolves to the current slug in one hop.
+    """
+    await session.execute(
+        pg_insert(SlugRedirect)
+        .values(old_slug=old_slug, article_id=article_id)
+        .on_conflict_do_update(index_elements=[SlugRedirect.old_slug], set_={"article_id": article_id})
+    )
+    await release_slug(session, new_slug)
+
+
+async def release_slug(session: AsyncSession, slug: str) -> None:
+    """A live article now owns slug: drop any redirect that would shadow it."""
+    await session.execute(delete(SlugRedirect).where(SlugRedirect.old_slug == slug))
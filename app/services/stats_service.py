@@ -0,0 +1,126 @@
+import os
+import time
+from dataclasses import asdict
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import DEDICATED_CONNECTIONS, engine, gather_reads, replica_status
+
+from app.models.article import Article, ArticleStatus
+from app.models.category import Category
+from app.models.comment import Comment
+from app.models.contact_message import ContactMessage
+from app.utils.offload import pool_stats
+from app.utils.pool_metrics import metrics as pool_metrics
+
+STATS_REFRESH_SECONDS = 60
+RECENT_ARTICLES = 5
+
+# Per-worker snapshot: {"stats": {...}, "recent_articles": [...]}
+_snapshot: dict | None = None
+_snapshot_at: float = 0.0
+_stale = True
+
+
+def _stats_query():
+    """All dashboard counters in one statement (one-row subqueries, cross-joined)."""
+    articles = select(
+        func.count().label("articles"),
+        func.count().filter(Article.status == ArticleStatus.PUBLISHED).label("published"),
+        func.count().filter(Article.status == ArticleStatus.DRAFT).label("drafts"),
+        func.count().filter(Article.status == ArticleStatus.SCHEDULED).label("scheduled"),
+    ).select_from(Article).subquery()
+    comments = select(
+        func.count().label("comments"),
+        func.count().filter(Comment.is_approved == False).label("pending_comments"),
+    ).select_from(Comment).subquery()
+    messages = select(
+        func.count().filter(ContactMessage.is_read == False).label("unread_messages"),
+    ).select_from(ContactMessage).subquery()
+    categories = select(func.count().label("categories")).select_from(Category).subquery()
+    return select(articles, comments, messages, categories)
+
+
+async def _load_counters(session: AsyncSession) -> dict:
+    return dict((await session.execute(_stats_query())).mappings().one())
+
+
+async def _load_recent_articles(session: AsyncSession) -> list:
+    result = await session.execute(
+        select(Article.id, Article.title, Article.status, Article.created_at)
+        .order_by(Article.created_at.desc())
+        .limit(RECENT_ARTICLES)
+    )
+    return list(result)
+
+
+async def refresh_dashboard_stats(session: AsyncSession) -> dict:
+    global _snapshot, _snapshot_at, _stale
+    # Cleared first: an invalidation that arrives mid-refresh must win
+    _stale = False
+    try:
+        stats, recent = await gather_reads(session, _load_counters, _load_recent_articles)
+    except BaseException:
+        _stale = True
+        raise
+    _snapshot = {"stats": stats, "recent_articles": recent}
+    _snapshot_at = time.monotonic()
+    return _snapshot
+
+
+async def get_dashboard_stats(session: AsyncSession) -> dict:
+    """Return the cached snapshot, recomputing it only if a write marked it stale."""
+    if _snapshot is None or _stale or time.monotonic() - _snapshot_at > STATS_REFRESH_SECONDS:
+        return await refresh_dashboard_stats(session)
+    return _snapshot
+
+
+def invalidate_dashboard_stats() -> None:
+    """Mark the snapshot stale after a write (this worker only; others catch up on refresh)."""
+    global _stale
+    _stale = True
+
+
+async def get_runtime_metrics(session: AsyncSession) -> dict:
+    """This worker's DB pool, replica and offload metrics, plus connection sizing against Postgres."""
+    server = (await session.execute(text(
+        "SELECT current_setting('max_connections')::int AS max_connections,"
+        " current_setting('superuser_reserved_connections')::int AS reserved,"
+        " (SELECT count(*) FROM pg_stat_activity WHERE datname = current_database()) AS connections"
+    ))).one()
+    per_worker = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW + DEDICATED_CONNECTIONS
+    return {
+        "pid": os.getpid(),
+        "pool": pool_metrics.snapshot(engine.sync_engine.pool),
+        "replica": replica_status(),
+        # Compiled-SQL cache: entries should plateau; steady growth means a
+        # statement that varies per request (literal values, IN lists)
+        "statement_cache": {
+            "entries": len(engine.sync_engine._compiled_cache or ()),
+            "capacity": settings.DB_QUERY_CACHE_SIZE,
+            "prepared_per_connection": settings.DB_STATEMENT_CACHE_SIZE,
+        },
+        "sizing": {
+            "workers": settings.WEB_CONCURRENCY,
+            "per_worker": per_worker,
+            "peak_total": per_worker * settings.WEB_CONCURRENCY,
+            "max_connections": server.max_connections,
+            "available": server.max_connections - server.reserved,
+            "connections": server.connections,
+        },
+        "offload": [
+            {
+                "pool": pool.name,
+                "workers": pool.workers,
+                "capacity": pool.capacity,
+                "in_flight": pool.in_flight,
+                "tasks": {
+                    name: {**asdict(stats), "avg_run_ms": stats.avg_run_ms, "avg_wait_ms": stats.avg_wait_ms}
+                    for name, stats in tasks
+                },
+            }
+            for pool, tasks in pool_stats()
+        ],
+    }
@@ -0,0 +1,541 @@
+import asyncio
+import enum
+import json
+import tempfile
+import zipfile
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from fastapi import Request
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.article import Article, ArticleStatus, article_tag
+from app.models.category import Category
+from app.models.comment import Comment
+from app.models.media import Media
+from app.models.media_usage import MediaUsage
+from app.models.slug_redirect import SlugRedirect
+from app.models.static_page import StaticPage
+from app.models.tag import Tag
+from app.services.article_service import first_free_slug, slug_family_pattern
+from app.services.media_service import UPLOAD_DIR, UPLOAD_FILENAME_RE, referenced_uploads
+from app.services.slug_service import invalidate_slug_index
+from app.services.stats_service import invalidate_dashboard_stats
+from app.utils.markdown import render_markdown_batch
+from app.utils.seo import generate_slug
+from app.utils.uploads import StreamedFile, stream_multipart
+
+EXPORT_VERSION = 1
+EXPORT_BATCH = 500
+IMPORT_BATCH = 500
+IMPORT_MAX_FILE_SIZE = 1024 * 1024 * 1024  # 1GB
+# Browsers rarely know .jsonl; accept whatever they guess for a text/binary blob
+IMPORT_MIME_TYPES = {
+    "application/x-ndjson", "application/jsonl", "application/json",
+    "application/octet-stream", "text/plain",
+}
+
+# Export order is also the import order: everything a row refers to comes first
+EXPORT_KINDS = ("category", "tag", "media", "page", "article", "comment")
+
+
+# ──── Export ────
+
+
+def _export_query(kind: str):
+    if kind == "category":
+        return select(Category.slug, Category.name, Category.description, Category.created_at).order_by(Category.id)
+    if kind == "tag":
+        return select(Tag.slug, Tag.name, Tag.created_at).order_by(Tag.id)
+    if kind == "media":
+        return select(
+            Media.filename, Media.original_name, Media.file_size, Media.mime_type,
+            Media.alt_text, Media.sha256, Media.created_at,
+        ).order_by(Media.id)
+    if kind == "page":
+        return select(
+            StaticPage.slug, StaticPage.title, StaticPage.content_md, StaticPage.content_html,
+            StaticPage.meta_title, StaticPage.meta_description, StaticPage.updated_at,
+        ).order_by(StaticPage.id)
+    if kind == "article":
+        tag_slugs = (
+            select(func.array_agg(Tag.slug))
+            .join(article_tag, article_tag.c.tag_id == Tag.id)
+            .where(article_tag.c.article_id == Article.id)
+            .scalar_subquery()
+        )
+        return (
+            select(
+                Article.slug, Article.title, Article.content_md, Article.content_html, Article.excerpt,
+                Article.featured_image, Article.og_image, Article.status,
+                Article.meta_title, Article.meta_description,
+                Article.created_at, Article.updated_at, Article.published_at, Article.scheduled_publish_at,
+                Category.slug.label("category"), tag_slugs.label("tags"),
+            )
+            .outerjoin(Category, Article.category_id == Category.id)
+            .order_by(Article.id)
+        )
+    if kind == "comment":
+        return (
+            select(
+                Article.slug.label("article"), Comment.nickname, Comment.content,
+                Comment.is_approved, Comment.ip_address, Comment.created_at,
+            )
+            .join(Article, Comment.article_id == Article.id)
+            .order_by(Comment.id)
+        )
+    raise ValueError(kind)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def _dumps(obj: dict) -> str:
+    return json.dumps(obj, default=_json_default, ensure_ascii=False)
+
+
+async def _stream_rows(session: AsyncSession, kind: str) -> AsyncIterator[list[dict]]:
+    """Rows of one kind in partitions of EXPORT_BATCH, read through a server-side cursor."""
+    result = await session.stream(_export_query(kind).execution_options(yield_per=EXPORT_BATCH))
+    async for partition in result.partitions():
+        yield [row._asdict() for row in partition]
+
+
+async def export_jsonl(session: AsyncSession) -> AsyncIterator[bytes]:
+    """The whole site as JSON Lines: a header line, then one object per row.
+
+    Memory stays flat regardless of content size - rows are pulled in
+    EXPORT_BATCH partitions and each partition is yielded as one chunk.
+    """
+    header = {"type": "export", "version": EXPORT_VERSION, "exported_at": datetime.utcnow()}
+    yield (_dumps(header) + "\n").encode()
+    for kind in EXPORT_KINDS:
+        async for rows in _stream_rows(session, kind):
+            yield "".join(_dumps({"type": kind, **row}) + "\n" for row in rows).encode()
+
+
+class _ZipSink:
+    """Write-only, unseekable file object for zipfile; collects bytes until drained."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _markdown_file(meta: dict, body: str) -> str:
+    # JSON scalars and lists are valid YAML, so this is readable by any frontmatter parser
+    lines = [f"{key}: {_dumps(value)}" for key, value in meta.items() if value is not None]
+    return "---\n" + "\n".join(lines) + "\n---\n\n" + body
+
+
+async def export_markdown_zip(session: AsyncSession) -> AsyncIterator[bytes]:
+    """Articles and pages as Markdown files with frontmatter, plus content.jsonl
+    for categories, tags, media metadata and comments - streamed as one zip.
+    """
+    sink = _ZipSink()
+    # An unseekable sink makes zipfile write data descriptors instead of seeking back
+    archive = zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED)
+
+    with archive.open("content.jsonl", "w") as fh:
+        for kind in ("category", "tag", "media", "comment"):
+            async for rows in _stream_rows(session, kind):
+                data = "".join(_dumps({"type": kind, **row}) + "\n" for row in rows).encode()
+                await asyncio.to_thread(fh.write, data)
+                yield sink.drain()
+
+    for kind, folder in (("page", "pages"), ("article", "articles")):
+        async for rows in _stream_rows(session, kind):
+            for row in rows:
+                body = row.pop("content_md") or ""
+                row.pop("content_html", None)
+                await asyncio.to_thread(archive.writestr, f"{folder}/{row['slug']}.md", _markdown_file(row, body))
+            yield sink.drain()
+
+    archive.close()
+    yield sink.drain()
+
+
+# ──── Import ────
+
+
+# JSON types of each field the importer reads; null is always allowed. A row
+# with any other type is counted as skipped rather than failing the import.
+_TEXT_FIELDS = {
+    "category": ("slug", "name", "description", "created_at"),
+    "tag": ("slug", "name", "created_at"),
+    "media": ("filename", "original_name", "mime_type", "alt_text", "sha256", "created_at"),
+    "page": ("slug", "title", "content_md", "content_html", "meta_title", "meta_description", "updated_at"),
+    "article": (
+        "slug", "title", "content_md", "content_html", "excerpt", "featured_image", "og_image", "status",
+        "meta_title", "meta_description", "created_at", "updated_at", "published_at", "scheduled_publish_at",
+        "category",
+    ),
+    "comment": ("article", "nickname", "content", "ip_address", "created_at"),
+}
+
+
+def _valid_row(kind: str, row: dict) -> bool:
+    if any(row.get(f) is not None and not isinstance(row[f], str) for f in _TEXT_FIELDS[kind]):
+        return False
+    if kind == "media":
+        size = row.get("file_size")
+        return size is None or (isinstance(size, int) and not isinstance(size, bool))
+    if kind == "article":
+        tags = row.get("tags")
+        return tags is None or (isinstance(tags, list) and all(isinstance(t, str) for t in tags))
+    if kind == "comment":
+        return row.get("is_approved") is None or isinstance(row["is_approved"], bool)
+    return True
+
+
+@dataclass
+class ImportResult:
+    counts: dict[str, int] = field(default_factory=dict)
+    skipped: int = 0
+
+
+def _parse_dt(value) -> datetime | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).replace(tzinfo=None)
+    except (TypeError, ValueError):
+        return None
+
+
+def _dedupe(rows: list[dict], key: str) -> list[dict]:
+    """Last row wins per key - ON CONFLICT DO UPDATE can't touch one row twice per statement."""
+    return list({row[key]: row for row in rows}.values())
+
+
+async def _fill_content_html(rows: list[dict]) -> None:
+    """Render content_html for rows exported without it, one offload call per batch."""
+    missing = [r for r in rows if not r.get("content_html")]
+    if missing:
+        rendered = await render_markdown_batch([r.get("content_md") or "" for r in missing])
+        for row, html in zip(missing, rendered):
+            row["content_html"] = html
+
+
+async def _claim_unique_slugs(session: AsyncSession, bases: list[str], reserved: set[str]) -> list[str]:
+    """Unique article slugs for a batch of base slugs, with one query for the whole batch.
+
+    Slugs in reserved (the batch's explicit ones) count as taken too. Uses the
+    same "-2", "-3" suffix scheme as _ensure_unique_slug.
+    """
+    taken = set((await session.execute(
+        select(Article.slug).where(Article.slug.regexp_match(slug_family_pattern(set(bases))))
+    )).scalars()) | reserved
+    slugs = []
+    for base in bases:
+        slug = first_free_slug(base, taken)
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+class _Importer:
+    """Batched, set-based import of JSON Lines in export order.
+
+    Categories, tags and pages are upserted on slug, media on filename, and
+    articles on slug. Re-importing the same file updates rows in place instead
+    of duplicating them.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.result = ImportResult()
+        self.category_ids: dict[str, int] = {}
+        self.tag_ids: dict[str, int] = {}
+
+    def _count(self, kind: str, n: int) -> None:
+        self.result.counts[kind] = self.result.counts.get(kind, 0) + n
+
+    async def flush(self, kind: str, rows: list[dict]) -> None:
+        if rows:
+            await getattr(self, f"_import_{kind}")(rows)
+
+    async def _lookup(self, model, slugs: set[str], cache: dict[str, int]) -> None:
+        missing = [s for s in slugs if s not in cache]
+        if missing:
+            result = await self.session.execute(select(model.slug, model.id).where(model.slug.in_(missing)))
+            cache.update(dict(result.all()))
+
+    async def _replace_media_usage(self, owner: str, refs: dict[int, set[str]]) -> None:
+        """Replace the media usage rows of the batch's articles or pages (owner column) with refs."""
+        owner_col = getattr(MediaUsage, owner)
+        await self.session.execute(delete(MediaUsage).where(owner_col.in_(list(refs))))
+        names = set().union(*refs.values())
+        if not names:
+            return
+        media_ids = dict((await self.session.execute(
+            select(Media.filename, Media.id).where(Media.filename.in_(names))
+        )).all())
+        usage_rows = [
+            {"media_id": media_ids[name], owner: owner_id}
+            for owner_id, used in refs.items() for name in used if name in media_ids
+        ]
+        if usage_rows:
+            await self.session.execute(pg_insert(MediaUsage).values(usage_rows).on_conflict_do_nothing())
+
+    async def _import_category(self, rows: list[dict]) -> None:
+        values = _dedupe([{
+            "slug": generate_slug(r.get("slug") or r.get("name") or ""),
+            "name": r.get("name") or r.get("slug"),
+            "description": r.get("description"),
+            "created_at": _parse_dt(r.get("created_at")) or datetime.utcnow(),
+        } for r in rows if r.get("slug") or r.get("name")], "slug")
+        if not values:
+            return
+        stmt = pg_insert(Category).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Category.slug],
+            set_={"name": stmt.excluded.name, "description": stmt.excluded.description},
+        ).returning(Category.slug, Category.id)
+        self.category_ids.update(dict((await self.session.execute(stmt)).all()))
+        self._count("category", len(values))
+
+    async def _import_tag(self, rows: list[dict]) -> None:
+        values = _dedupe([{
+            "slug": generate_slug(r.get("slug") or r.get("name") or ""),
+            "name": r.get("name") or r.get("slug"),
+            "created_at": _parse_dt(r.get("created_at")) or datetime.utcnow(),
+        } for r in rows if r.get("slug") or r.get("name")], "slug")
+        if not values:
+            return
+        stmt = pg_insert(Tag).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Tag.slug], set_={"name": stmt.excluded.name},
+        ).returning(Tag.slug, Tag.id)
+        self.tag_ids.update(dict((await self.session.execute(stmt)).all()))
+        self._count("tag", len(values))
+
+    async def _import_media(self, rows: list[dict]) -> None:
+        # Metadata only: files are copied separately into UPLOAD_DIR. Deleting
+        # media unlinks UPLOAD_DIR / filename, so only plain upload names are
+        # accepted - nothing that could point outside the directory.
+        safe = [r for r in rows if r.get("filename") and UPLOAD_FILENAME_RE.fullmatch(r["filename"])]
+        self.result.skipped += len(rows) - len(safe)
+        values = _dedupe([{
+            "filename": r["filename"],
+            "original_name": r.get("original_name") or r["filename"],
+            "file_path": str(UPLOAD_DIR / r["filename"]),
+            "file_size": r.get("file_size") or 0,
+            "mime_type": r.get("mime_type") or "application/octet-stream",
+            "alt_text": r.get("alt_text"),
+            "sha256": r.get("sha256"),
+            "created_at": _parse_dt(r.get("created_at")) or datetime.utcnow(),
+        } for r in safe], "filename")
+        if not values:
+            return
+        await self.session.execute(pg_insert(Media).values(values).on_conflict_do_nothing())
+        self._count("media", len(values))
+
+    async def _import_page(self, rows: list[dict]) -> None:
+        await _fill_content_html(rows)
+        values = _dedupe([{
+            "slug": generate_slug(r["slug"]),
+            "title": r.get("title") or r["slug"],
+            "content_md": r.get("content_md") or "",
+            "content_html": r["content_html"],
+            "meta_title": r.get("meta_title"),
+            "meta_description": r.get("meta_description"),
+            "updated_at": _parse_dt(r.get("updated_at")) or datetime.utcnow(),
+        } for r in rows if r.get("slug")], "slug")
+        if not values:
+            return
+        stmt = pg_insert(StaticPage).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[StaticPage.slug],
+            set_={col: stmt.excluded[col] for col in values[0] if col != "slug"},
+        ).returning(StaticPage.slug, StaticPage.id)
+        page_ids = dict((await self.session.execute(stmt)).all())
+        # Imported media keep their old created_at: without usage rows the orphan GC would take them
+        await self._replace_media_usage("page_id", {
+            page_ids[v["slug"]]: referenced_uploads(v["content_md"]) for v in values
+        })
+        self._count("page", len(values))
+
+    async def _import_article(self, rows: list[dict]) -> None:
+        rows = [r for r in rows if r.get("title")]
+        if not rows:
+            return
+        await self._lookup(Category, {r["category"] for r in rows if r.get("category")}, self.category_ids)
+        await self._lookup(Tag, {t for r in rows for t in (r.get("tags") or [])}, self.tag_ids)
+
+        # Rows with a slug keep it (normalized) and update the existing article,
+        # if any. Rows without one, or whose slug normalizes to nothing, get one
+        # from the title, unique against the database and the batch's own slugs.
+        rows = [{**r, "slug": generate_slug(r.get("slug") or "")} for r in rows]
+        unslugged = [r for r in rows if not r["slug"]]
+        if unslugged:
+            bases = [generate_slug(r["title"]) or "artykul" for r in unslugged]
+            explicit = {r["slug"] for r in rows if r["slug"]}
+            for row, slug in zip(unslugged, await _claim_unique_slugs(self.session, bases, explicit)):
+                row["slug"] = slug
+        rows = _dedupe(rows, "slug")
+        await _fill_content_html(rows)
+
+        now = datetime.utcnow()
+        values = []
+        for r in rows:
+            try:
+                status = ArticleStatus(r.get("status") or ArticleStatus.DRAFT.value)
+            except ValueError:
+                status = ArticleStatus.DRAFT
+            values.append({
+                "slug": r["slug"],
+                "title": r["title"],
+                "content_md": r.get("content_md") or "",
+                "content_html": r["content_html"],
+                "excerpt": r.get("excerpt"),
+                "featured_image": r.get("featured_image"),
+                "og_image": r.get("og_image"),
+                "status": status,
+                "meta_title": r.get("meta_title"),
+                "meta_description": r.get("meta_description"),
+                "category_id": self.category_ids.get(r.get("category")),
+                "created_at": _parse_dt(r.get("created_at")) or now,
+                "updated_at": _parse_dt(r.get("updated_at")) or now,
+                "published_at": _parse_dt(r.get("published_at")),
+                "scheduled_publish_at": _parse_dt(r.get("scheduled_publish_at")),
+            })
+        stmt = pg_insert(Article).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Article.slug],
+            set_={col: stmt.excluded[col] for col in values[0] if col not in ("slug", "created_at")},
+        ).returning(Article.slug, Article.id)
+        article_ids = dict((await self.session.execute(stmt)).all())
+        ids = list(article_ids.values())
+        # Live articles win over redirects left behind by renames
+        await self.session.execute(delete(SlugRedirect).where(SlugRedirect.old_slug.in_(list(article_ids))))
+
+        # Tags and the media usage index are replaced wholesale for the batch
+        await self.session.execute(delete(article_tag).where(article_tag.c.article_id.in_(ids)))
+        tag_rows = [
+            {"article_id": article_ids[r["slug"]], "tag_id": self.tag_ids[t]}
+            for r in rows for t in set(r.get("tags") or []) if t in self.tag_ids
+        ]
+        if tag_rows:
+            await self.session.execute(pg_insert(article_tag).values(tag_rows).on_conflict_do_nothing())
+
+        await self._replace_media_usage("article_id", {
+            article_ids[v["slug"]]: referenced_uploads(v["content_md"], v["featured_image"], v["og_image"])
+            for v in values
+        })
+        self._count("article", len(values))
+
+    async def _import_comment(self, rows: list[dict]) -> None:
+        slugs = {r["article"] for r in rows if r.get("article")}
+        article_ids = dict((await self.session.execute(
+            select(Article.slug, Article.id).where(Article.slug.in_(slugs))
+        )).all())
+        ids = list(article_ids.values())
+        # No natural key on comments: skip ones already present so re-imports are idempotent
+        existing = set((await self.session.execute(
+            select(Comment.article_id, Comment.nickname, Comment.created_at).where(Comment.article_id.in_(ids))
+        )).all())
+
+        values = []
+        for r in rows:
+            article_id = article_ids.get(r.get("article"))
+            created_at = _parse_dt(r.get("created_at"))
+            if article_id is None or not r.get("nickname") or not r.get("content") or created_at is None:
+                self.result.skipped += 1
+                continue
+            key = (article_id, r["nickname"], created_at)
+            if key in existing:
+                continue
+            existing.add(key)
+            values.append({
+                "article_id": article_id,
+                "nickname": r["nickname"],
+                "content": r["content"],
+                "is_approved": bool(r.get("is_approved", True)),
+                "ip_address": r.get("ip_address"),
+                "created_at": created_at,
+            })
+        if values:
+            await self.session.execute(pg_insert(Comment).values(values))
+        self._count("comment", len(values))
+
+
+async def receive_import(request: Request, csrf_token: str | None) -> tuple[dict[str, str], list[StreamedFile]]:
+    """Stream the uploaded export file to a temp file; nothing is held in memory."""
+    return await stream_multipart(
+        request,
+        dest_dir=Path(tempfile.gettempdir()),
+        max_file_size=IMPORT_MAX_FILE_SIZE,
+        allowed_types=IMPORT_MIME_TYPES,
+        csrf_token=csrf_token,
+    )
+
+
+def _read_lines(fh, n: int) -> list[bytes]:
+    lines = []
+    for line in fh:
+        lines.append(line)
+        if len(lines) >= n:
+            break
+    return lines
+
+
+async def import_jsonl(session: AsyncSession, path: Path) -> ImportResult:
+    """Import a JSON Lines export in one transaction, IMPORT_BATCH rows per statement.
+
+    Rows are grouped into batches of consecutive lines of the same type, so a
+    file in export order (categories before articles before comments) resolves
+    all references. Unknown types, malformed lines and rows with fields of the
+    wrong type are counted as skipped.
+    """
+    importer = _Importer(session)
+    kind, batch = None, []
+    fh = await asyncio.to_thread(open, path, "rb")
+    try:
+        while lines := await asyncio.to_thread(_read_lines, fh, IMPORT_BATCH):
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    obj = json.loads(line)
+                    row_kind = obj.pop("type")
+                except (ValueError, KeyError, AttributeError, TypeError):
+                    importer.result.skipped += 1
+                    continue
+                if row_kind == "export":
+                    continue
+                if row_kind not in EXPORT_KINDS or not _valid_row(row_kind, obj):
+                    importer.result.skipped += 1
+                    continue
+                if row_kind != kind or len(batch) >= IMPORT_BATCH:
+                    await importer.flush(kind, batch)
+                    kind, batch = row_kind, []
+                batch.append(obj)
+        await importer.flush(kind, batch)
+    finally:
+        await asyncio.to_thread(fh.close)
+
+    await session.commit()
+    invalidate_dashboard_stats()
+    invalidate_slug_index()
+    return importer.result
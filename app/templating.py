@@ -5,6 +5,7 @@ from fastapi.templating import Jinja2Templates
 from markupsafe import Markup
 
 from app.config import settings
+from app.utils.responsive import picture
 
 BASE_DIR = Path(__file__).resolve().parent
 
@@ -22,5 +23,6 @@ templates.env.globals.update({
     "site_name": settings.SITE_NAME,
     "current_year": datetime.now().year,
     "csrf_input": _csrf_input,
+    "picture": picture,
     "config": settings,
 })
@@ -0,0 +1,55 @@
+from pathlib import Path
+
+from PIL import Image, ImageOps, features
+
+THUMB_WIDTH = 320
+
+# Responsive variant widths (px). Only widths smaller than the original are generated.
+VARIANT_WIDTHS = (480, 960, 1600)
+VARIANT_FORMATS = ("avif", "webp") if features.check("avif") else ("webp",)
+_QUALITY = {"avif": 55, "webp": 78}
+
+
+def _prepare(img: Image.Image) -> Image.Image:
+    img = ImageOps.exif_transpose(img)
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA")
+    return img
+
+
+def make_thumbnail(src: Path, dest: Path, width: int = THUMB_WIDTH) -> None:
+    """Write a small WebP thumbnail of src to dest (blocking - run in a thread)."""
+    with Image.open(src) as img:
+        img = _prepare(img)
+        img.thumbnail((width, width * 4))
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        img.save(dest, "WEBP", quality=75, method=4)
+
+
+def generate_variants(src: str, dest_dir: str, stem: str) -> list[dict]:
+    """Write resized AVIF/WebP copies of src into dest_dir.
+
+    CPU-bound and pure (str in, dicts out) so it can run in a process pool.
+    Returns one metadata dict per written file.
+    """
+    out_dir = Path(dest_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    with Image.open(src) as original:
+        original = _prepare(original)
+        widths = [w for w in VARIANT_WIDTHS if w < original.width] or [original.width]
+        for width in widths:
+            height = round(original.height * width / original.width)
+            resized = original.resize((width, height), Image.Resampling.LANCZOS)
+            for fmt in VARIANT_FORMATS:
+                filename = f"{stem}-{width}w.{fmt}"
+                path = out_dir / filename
+                resized.save(path, fmt.upper(), quality=_QUALITY[fmt])
+                written.append({
+                    "filename": filename,
+                    "width": width,
+                    "height": height,
+                    "format": fmt,
+                    "file_size": path.stat().st_size,
+                })
+    return written
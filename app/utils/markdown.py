@@ -2,12 +2,18 @@ import re
 
 import markdown
 
+from app.utils.offload import run_in_process
+from app.utils.responsive import add_srcset
+
 
 _md = markdown.Markdown(
     extensions=["fenced_code", "tables", "toc", "attr_list", "nl2br"],
     output_format="html",
 )
 
+# Shorter texts render inline: the process round-trip would cost more than it saves
+INLINE_MAX_CHARS = 2000
+
 _IMG_TAG_RE = re.compile(r"<img\b(?![^>]*\bloading=)")
 
 # Matches lines that start a block element: list items or headings.
@@ -40,9 +46,35 @@ def _preprocess_markdown(text: str) -> str:
     return "\n".join(result)
 
 
-def render_markdown(text: str) -> str:
-    """Render Markdown text to HTML."""
+def markdown_to_html(text: str) -> str:
+    """Markdown to HTML without srcset; safe to run in an offload process."""
     _md.reset()
     html = _md.convert(_preprocess_markdown(text))
-    html = _IMG_TAG_RE.sub('<img loading="lazy"', html)
-    return html
+    return _IMG_TAG_RE.sub('<img loading="lazy"', html)
+
+
+def _markdown_to_html_batch(texts: list[str]) -> list[str]:
+    return [markdown_to_html(t) for t in texts]
+
+
+def render_markdown(text: str) -> str:
+    """Render Markdown text to HTML."""
+    return add_srcset(markdown_to_html(text))
+
+
+async def render_markdown_async(text: str) -> str:
+    """render_markdown() with the conversion moved off the event loop.
+
+    srcset is added here rather than in the worker, because the variant index
+    lives in this process.
+    """
+    if len(text) <= INLINE_MAX_CHARS:
+        return render_markdown(text)
+    return add_srcset(await run_in_process("markdown", markdown_to_html, text))
+
+
+async def render_markdown_batch(texts: list[str]) -> list[str]:
+    """Render many texts with a single offload round-trip (bulk import)."""
+    if sum(len(t) for t in texts) <= INLINE_MAX_CHARS:
+        return [render_markdown(t) for t in texts]
+    return [add_srcset(h) for h in await run_in_process("markdown", _markdown_to_html_batch, texts)]
@@ -0,0 +1,155 @@
+"""Bounded executors for CPU-heavy work that would otherwise block the event loop.
+
+Two shared pools per worker:
+
+- threads: code that releases the GIL while it works (bcrypt, Pillow, zlib).
+- processes: pure-Python work that holds the GIL (Markdown, image variants).
+  Started with spawn, never fork, because the parent runs an event loop and a DB pool.
+
+Each pool accepts at most workers + queue_size tasks at once. A caller that can't
+get a slot within QUEUE_TIMEOUT_SECONDS gets OffloadBusy instead of queueing
+without limit. Per-task-name counters are kept for the metrics page.
+"""
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Callable
+
+from app.config import settings
+
+QUEUE_TIMEOUT_SECONDS = 10
+
+
+class OffloadBusy(Exception):
+    """Raised when a pool's queue stays full for longer than QUEUE_TIMEOUT_SECONDS."""
+
+
+@dataclass
+class TaskStats:
+    calls: int = 0
+    failures: int = 0
+    rejected: int = 0
+    run_seconds: float = 0.0
+    max_run_seconds: float = 0.0
+    wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+    @property
+    def avg_run_ms(self) -> float:
+        return self.run_seconds / self.calls * 1000 if self.calls else 0.0
+
+    @property
+    def avg_wait_ms(self) -> float:
+        return self.wait_seconds / self.calls * 1000 if self.calls else 0.0
+
+
+class BoundedPool:
+    def __init__(self, name: str, factory: Callable[[int], Executor], workers: int, queue_size: int):
+        self.name = name
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.in_flight = 0
+        self.stats: dict[str, TaskStats] = {}
+        self._factory = factory
+        self._executor: Executor | None = None
+        self._slots: asyncio.Semaphore | None = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = self._factory(self.workers)
+        return self._executor
+
+    async def run(self, task: str, fn: Callable, *args):
+        """Run fn(*args) in the pool under the name `task` and return its result."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.capacity)
+        stats = self.stats.setdefault(task, TaskStats())
+
+        queued = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), QUEUE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            stats.rejected += 1
+            raise OffloadBusy(f"{self.name} pool is full ({self.capacity} tasks)") from None
+
+        self.in_flight += 1
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._get_executor(), _timed, fn, args)
+        except BaseException:
+            self._release()
+            raise
+        # The slot is held until the task itself ends, not the caller: a caller
+        # cancelled by a deadline or a disconnect leaves its task running
+        future.add_done_callback(self._task_done)
+        try:
+            result, run_seconds, started = await asyncio.shield(future)
+        except Exception:
+            stats.failures += 1
+            raise
+
+        wait = max(started - queued, 0.0)
+        stats.calls += 1
+        stats.run_seconds += run_seconds
+        stats.max_run_seconds = max(stats.max_run_seconds, run_seconds)
+        stats.wait_seconds += wait
+        stats.max_wait_seconds = max(stats.max_wait_seconds, wait)
+        return result
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        self._slots.release()
+
+    def _task_done(self, future: asyncio.Future) -> None:
+        self._release()
+        # Also marks the exception retrieved when nobody awaits the task any more
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            # A worker died (OOM, segfault); start a fresh pool for the next caller
+            self._executor = None
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def _timed(fn: Callable, args: tuple) -> tuple:
+    # perf_counter is system-wide on Linux, so a start time taken in a
+    # spawned worker is comparable with the parent's queue timestamp.
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started, started
+
+
+threads = BoundedPool(
+    "thread",
+    lambda n: ThreadPoolExecutor(max_workers=n, thread_name_prefix="offload"),
+    settings.OFFLOAD_THREADS,
+    settings.OFFLOAD_QUEUE_SIZE,
+)
+processes = BoundedPool(
+    "process",
+    lambda n: ProcessPoolExecutor(max_workers=n, mp_context=multiprocessing.get_context("spawn")),
+    settings.OFFLOAD_PROCESSES,
+    settings.OFFLOAD_QUEUE_SIZE,
+)
+
+
+async def run_in_thread(task: str, fn: Callable, *args):
+    return await threads.run(task, fn, *args)
+
+
+async def run_in_process(task: str, fn: Callable, *args):
+    """fn and args must be picklable: a module-level function and plain data."""
+    return await processes.run(task, fn, *args)
+
+
+def pool_stats() -> list[tuple[BoundedPool, list[tuple[str, TaskStats]]]]:
+    return [(pool, sorted(pool.stats.items())) for pool in (threads, processes)]
+
+
+def shutdown_pools() -> None:
+    threads.shutdown()
+    processes.shutdown()
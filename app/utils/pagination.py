@@ -0,0 +1,23 @@
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(value, row_id: int) -> str:
+    """Encode a keyset position (sort value, id) as an opaque URL-safe token."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *, is_datetime: bool = True) -> tuple | None:
+    """Decode a cursor into (sort_value, id). Returns None if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, row_id = json.loads(raw)
+        if is_datetime:
+            value = datetime.fromisoformat(value)
+        return value, int(row_id)
+    except (ValueError, TypeError):
+        return None
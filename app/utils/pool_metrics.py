@@ -0,0 +1,88 @@
+"""Per-worker connection pool instrumentation.
+
+Pool events keep the connection counters; live in-use/idle/overflow figures
+come straight from the pool. No event fires before a checkout starts waiting,
+so InstrumentedPool times _do_get() itself to get the wait histogram and count
+pool timeouts.
+"""
+import time
+from bisect import bisect_left
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+# Upper bounds (ms) of the checkout wait histogram; the last bucket is open-ended
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.checkouts = 0
+        self.peak_in_use = 0
+        self.peak_overflow = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.started_at = time.time()
+
+    def observe_wait(self, ms: float) -> None:
+        self.wait_buckets[bisect_left(WAIT_BUCKETS_MS, ms)] += 1
+        self.wait_total_ms += ms
+        self.wait_max_ms = max(self.wait_max_ms, ms)
+
+    def histogram(self) -> list[tuple[str, int]]:
+        labels = [f"≤ {b} ms" for b in WAIT_BUCKETS_MS] + [f"> {WAIT_BUCKETS_MS[-1]} ms"]
+        return list(zip(labels, self.wait_buckets))
+
+    def snapshot(self, pool: Pool) -> dict:
+        waits = sum(self.wait_buckets)
+        return {
+            "pool_size": pool.size(),
+            "in_use": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "peak_in_use": self.peak_in_use,
+            "peak_overflow": self.peak_overflow,
+            "checkouts": self.checkouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": round(self.wait_total_ms / waits, 2) if waits else 0.0,
+            "wait_max_ms": round(self.wait_max_ms, 2),
+            "wait_histogram": self.histogram(),
+            "since": self.started_at,
+        }
+
+
+metrics = PoolMetrics()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            metrics.timeouts += 1
+            raise
+        finally:
+            metrics.observe_wait((time.perf_counter() - started) * 1000)
+
+
+def instrument_pool(pool: Pool) -> None:
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.connects += 1
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.checkouts += 1
+        metrics.peak_in_use = max(metrics.peak_in_use, pool.checkedout())
+        metrics.peak_overflow = max(metrics.peak_overflow, pool.overflow())
+
+    @event.listens_for(pool, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.invalidations += 1
@@ -0,0 +1,79 @@
+import re
+
+from markupsafe import Markup, escape
+
+UPLOADS_URL = "/static/uploads/"
+VARIANTS_URL = UPLOADS_URL + "variants/"
+
+CARD_SIZES = "(min-width: 1024px) 660px, 100vw"
+CONTENT_SIZES = "(min-width: 800px) 768px, 100vw"
+
+# Preferred first: browsers pick the first <source> whose type they support.
+_FORMAT_ORDER = ("avif", "webp")
+
+# Per-worker index of generated variants, loaded from media_variants at startup
+# and updated on upload/delete: {original filename: [(format, width, height, variant filename)]}
+_variants: dict[str, list[tuple[str, int, int, str]]] = {}
+
+_CONTENT_IMG_RE = re.compile(r'<img\b[^>]*\bsrc="' + re.escape(UPLOADS_URL) + r'([^"/]+)"[^>]*>')
+
+
+def replace_index(index: dict[str, list[tuple[str, int, int, str]]]) -> None:
+    global _variants
+    _variants = index
+
+
+def set_variants(filename: str, variants: list[tuple[str, int, int, str]]) -> None:
+    _variants[filename] = variants
+
+
+def drop_variants(filename: str) -> None:
+    _variants.pop(filename, None)
+
+
+def _filename(url: str | None) -> str | None:
+    if url and url.startswith(UPLOADS_URL):
+        return url[len(UPLOADS_URL):]
+    return None
+
+
+def _sources(variants: list[tuple[str, int, int, str]], sizes: str) -> str:
+    parts = []
+    for fmt in _FORMAT_ORDER:
+        srcset = ", ".join(
+            f"{VARIANTS_URL}{name} {width}w"
+            for f, width, _, name in sorted(variants, key=lambda v: v[1])
+            if f == fmt
+        )
+        if srcset:
+            parts.append(f'<source type="image/{fmt}" srcset="{srcset}" sizes="{sizes}">')
+    return "".join(parts)
+
+
+def picture(url: str | None, alt: str = "", *, sizes: str = CARD_SIZES, css_class: str = "", loading: str = "lazy") -> Markup:
+    """<picture> with AVIF/WebP srcset for an uploaded image; plain <img> otherwise."""
+    if not url:
+        return Markup("")
+    variants = _variants.get(_filename(url) or "")
+    attrs = f'src="{escape(url)}" alt="{escape(alt)}"'
+    if css_class:
+        attrs += f' class="{escape(css_class)}"'
+    if loading:
+        attrs += f' loading="{loading}"'
+    if not variants:
+        return Markup(f"<img {attrs}>")
+    _, width, height, _ = max(variants, key=lambda v: v[1])
+    img = f'<img {attrs} width="{width}" height="{height}" decoding="async">'
+    return Markup(f"<picture>{_sources(variants, sizes)}{img}</picture>")
+
+
+def add_srcset(html: str, sizes: str = CONTENT_SIZES) -> str:
+    """Wrap uploaded images in rendered Markdown with <picture> srcset sources."""
+
+    def wrap(match: re.Match) -> str:
+        variants = _variants.get(match.group(1))
+        if not variants:
+            return match.group(0)
+        return f"<picture>{_sources(variants, sizes)}{match.group(0)}</picture>"
+
+    return _CONTENT_IMG_RE.sub(wrap, html)
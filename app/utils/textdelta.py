@@ -0,0 +1,57 @@
+"""Compact line-based deltas between two versions of a text.
+
+A delta is a zlib-compressed JSON list of operations applied to the base text's
+lines in order: ``n`` (int > 0) copies n lines, ``-n`` skips n lines, and a list
+of strings inserts those lines. Unchanged lines cost a few bytes however long
+they are, so small edits to a large article produce tiny deltas.
+"""
+import difflib
+import json
+import zlib
+
+COMPRESSION_LEVEL = 6
+
+
+def pack_text(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def unpack_text(data: bytes) -> str:
+    return zlib.decompress(data).decode("utf-8")
+
+
+def make_delta(old: str, new: str) -> bytes:
+    a = old.splitlines(keepends=True)
+    b = new.splitlines(keepends=True)
+    ops: list = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            ops.append(i2 - i1)
+            continue
+        if i2 > i1:
+            ops.append(-(i2 - i1))
+        if j2 > j1:
+            ops.append(b[j1:j2])
+    return zlib.compress(json.dumps(ops, separators=(",", ":")).encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def apply_delta(old: str, delta: bytes) -> str:
+    a = old.splitlines(keepends=True)
+    out: list[str] = []
+    pos = 0
+    for op in json.loads(zlib.decompress(delta)):
+        if isinstance(op, list):
+            out.extend(op)
+        elif op > 0:
+            out.extend(a[pos:pos + op])
+            pos += op
+        else:
+            pos -= op
+    return "".join(out)
+
+
+def html_diff_table(old: str, new: str, old_label: str, new_label: str) -> str:
+    """Side-by-side HTML diff of two texts (changed lines with 3 lines of context)."""
+    return difflib.HtmlDiff(wrapcolumn=70).make_table(
+        old.splitlines(), new.splitlines(), old_label, new_label, context=True, numlines=3
+    )
@@ -0,0 +1,206 @@
+import asyncio
+import hashlib
+import os
+import secrets
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import Request
+
+MAX_FIELD_SIZE = 64 * 1024
+
+
+class UploadRejected(Exception):
+    """The whole multipart request is refused (malformed body, oversized field)."""
+
+    status_code = 400
+
+
+class CSRFRejected(UploadRejected):
+    """The multipart request's CSRF token is missing or wrong."""
+
+    status_code = 403
+
+
+@dataclass
+class StreamedFile:
+    """A file part streamed to a temp file next to its final location."""
+
+    field_name: str
+    filename: str
+    content_type: str
+    temp_path: Path | None = None
+    size: int = 0
+    sha256: str = ""
+    error: str | None = None
+    _hash: object = field(default_factory=hashlib.sha256, repr=False)
+    _fh: object = field(default=None, repr=False)
+
+    def discard(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        if self.temp_path is not None:
+            self.temp_path.unlink(missing_ok=True)
+            self.temp_path = None
+
+
+def _open_temp(dest_dir: Path):
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(dir=dest_dir, prefix=".upload-", suffix=".part")
+    return os.fdopen(fd, "wb"), Path(name)
+
+
+def _write_chunks(fh, chunks: list[bytes]) -> None:
+    for chunk in chunks:
+        fh.write(chunk)
+
+
+async def stream_multipart(
+    request: Request,
+    *,
+    dest_dir: Path,
+    max_file_size: int,
+    allowed_types: set[str],
+    csrf_token: str | None,
+) -> tuple[dict[str, str], list[StreamedFile]]:
+    """Parse a multipart body chunk by chunk, writing files straight to disk.
+
+    Memory use is bounded by the socket chunk size, not the file size: file data
+    is hashed (SHA-256) as it arrives and written to a temp file in dest_dir via
+    the default thread pool. A file that exceeds max_file_size, or has a type not in
+    allowed_types, stops being written right away and gets an ``error`` instead.
+
+    The CSRF token must arrive as a form field before the first file part. This
+    is the normal browser order when the hidden input comes before the file input.
+    Otherwise the request is rejected before any file bytes touch the disk.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise UploadRejected("Expected multipart/form-data")
+
+    fields: dict[str, str] = {}
+    files: list[StreamedFile] = []
+
+    part_headers: dict[bytes, bytes] = {}
+    header_name = bytearray()
+    header_value = bytearray()
+    field_name: str | None = None
+    field_data = bytearray()
+    current: StreamedFile | None = None
+    pending: list[tuple[StreamedFile, bytes]] = []
+    opened: list[StreamedFile] = []
+    finished: list[StreamedFile] = []
+
+    def on_part_begin():
+        nonlocal field_name, current
+        part_headers.clear()
+        field_name, current = None, None
+        field_data.clear()
+
+    def on_header_field(data, start, end):
+        header_name.extend(data[start:end])
+
+    def on_header_value(data, start, end):
+        header_value.extend(data[start:end])
+
+    def on_header_end():
+        part_headers[bytes(header_name).lower()] = bytes(header_value)
+        header_name.clear()
+        header_value.clear()
+
+    def on_headers_finished():
+        nonlocal field_name, current
+        _, options = parse_options_header(part_headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        if b"filename" not in options:
+            field_name = name
+            return
+        filename = options[b"filename"].decode("utf-8", "replace")
+        if not filename:
+            return  # empty <input type="file">
+        if csrf_token is not None and not (
+            csrf_token and secrets.compare_digest(fields.get("csrf_token", ""), csrf_token)
+        ):
+            raise CSRFRejected("CSRF validation failed")
+        mime = part_headers.get(b"content-type", b"application/octet-stream").decode("latin-1")
+        current = StreamedFile(field_name=name, filename=filename, content_type=mime)
+        if mime not in allowed_types:
+            current.error = "type"
+        else:
+            opened.append(current)
+        files.append(current)
+
+    def on_part_data(data, start, end):
+        chunk = data[start:end]
+        if current is not None:
+            if current.error:
+                return
+            current.size += len(chunk)
+            if current.size > max_file_size:
+                current.error = "size"
+                return
+            current._hash.update(chunk)
+            pending.append((current, bytes(chunk)))
+        elif field_name is not None:
+            if len(field_data) + len(chunk) > MAX_FIELD_SIZE:
+                raise UploadRejected("Form field too large")
+            field_data.extend(chunk)
+
+    def on_part_end():
+        if current is not None:
+            finished.append(current)
+        elif field_name is not None:
+            fields[field_name] = field_data.decode("utf-8", "replace")
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            await _flush(dest_dir, opened, pending, finished)
+        parser.finalize()
+    except BaseException:
+        for f in files:
+            f.discard()
+        raise
+
+    for f in files:
+        if f.error:
+            await asyncio.to_thread(f.discard)
+        else:
+            f.sha256 = f._hash.hexdigest()
+    return fields, files
+
+
+async def _flush(dest_dir: Path, opened: list, pending: list, finished: list) -> None:
+    """Apply the file I/O queued by the (synchronous) parser callbacks, off the event loop."""
+    for f in opened:
+        f._fh, f.temp_path = await asyncio.to_thread(_open_temp, dest_dir)
+    opened.clear()
+
+    by_file: dict[int, tuple[StreamedFile, list[bytes]]] = {}
+    for f, chunk in pending:
+        by_file.setdefault(id(f), (f, []))[1].append(chunk)
+    pending.clear()
+    for f, chunks in by_file.values():
+        if f.error:
+            await asyncio.to_thread(f.discard)
+        elif f._fh is not None:
+            await asyncio.to_thread(_write_chunks, f._fh, chunks)
+
+    for f in finished:
+        if f._fh is not None:
+            await asyncio.to_thread(f._fh.close)
+            f._fh = None
+    finished.clear()
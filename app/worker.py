@@ -0,0 +1,283 @@
+"""Background job worker for the jobs table (app.services.job_service).
+
+Runs inside every web worker when JOB_CONCURRENCY > 0, or on its own:
+
+    python -m app.worker [--concurrency N]
+
+Up to N jobs run at once, each with its own session. Idle workers wait on
+LISTEN jobs and also poll every JOB_POLL_SECONDS, which picks up retries whose
+backoff has passed and covers a dropped listener connection.
+"""
+import argparse
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Awaitable, Callable
+
+import asyncpg
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session, asyncpg_dsn
+from app.models.article import Article
+from app.models.job import Job
+from app.models.media import Media
+from app.models.media_usage import MediaUsage
+from app.models.static_page import StaticPage
+from app.services.job_service import (
+    HEARTBEAT_SECONDS,
+    JOB_CHANNEL,
+    claim_job,
+    enqueue,
+    finish_job,
+    heartbeat,
+    prune_jobs,
+    requeue_stale_jobs,
+)
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[AsyncSession, dict], Awaitable[None]]
+HANDLERS: dict[str, Handler] = {}
+
+# How often each worker looks for RUNNING jobs whose heartbeat stopped
+REAP_SECONDS = 300
+RETRY_SECONDS = 5
+
+
+def handler(kind: str) -> Callable[[Handler], Handler]:
+    """Register fn as the handler for jobs of this kind."""
+    def register(fn: Handler) -> Handler:
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+# ──── Handlers ────────────────────────────────────────────────────────────────
+
+
+@handler("media_variants")
+async def _media_variants(session: AsyncSession, payload: dict) -> None:
+    from app.services.media_service import generate_media_variants
+
+    media = await session.get(Media, payload["media_id"])
+    if media is None:
+        return  # deleted before we got to it
+    if await generate_media_variants(session, media):
+        # Stored HTML that already embeds this image has no srcset yet
+        usage = (await session.execute(
+            select(MediaUsage.article_id, MediaUsage.page_id).where(MediaUsage.media_id == media.id)
+        )).all()
+        article_ids = [a for a, _ in usage if a is not None]
+        page_ids = [p for _, p in usage if p is not None]
+        if article_ids or page_ids:
+            await enqueue(session, "rerender_content", {"article_ids": article_ids, "page_ids": page_ids})
+            await session.commit()
+
+
+@handler("rerender_content")
+async def _rerender_content(session: AsyncSession, payload: dict) -> None:
+    """Re-render content_html from content_md; all rows when no ids are given."""
+    from app.services.media_service import load_variant_index
+    from app.utils.markdown import render_markdown_async
+
+    # This process may not have served a request yet; srcset needs the index
+    await load_variant_index(session)
+    everything = "article_ids" not in payload and "page_ids" not in payload
+    for model, ids in ((Article, payload.get("article_ids")), (StaticPage, payload.get("page_ids"))):
+        if not (everything or ids):
+            continue
+        query = select(model.id, model.content_md, model.content_html)
+        if ids:
+            query = query.where(model.id.in_(ids))
+        for row_id, content_md, content_html in (await session.execute(query)).all():
+            html = await render_markdown_async(content_md)
+            if html != content_html:
+                # updated_at is kept: the content itself didn't change
+                await session.execute(
+                    update(model)
+                    .where(model.id == row_id)
+                    .values(content_html=html, updated_at=model.updated_at)
+                )
+        await session.commit()
+
+
+@handler("media_gc")
+async def _media_gc(session: AsyncSession, payload: dict) -> None:
+    from app.services.media_service import collect_orphan_media
+
+    count = await collect_orphan_media(session, grace_days=settings.MEDIA_ORPHAN_GRACE_DAYS)
+    if count:
+        logger.info("Removed %d orphaned media file(s)", count)
+
+
+@handler("prune_revisions")
+async def _prune_revisions(session: AsyncSession, payload: dict) -> None:
+    from app.services.revision_service import prune_revisions
+
+    count = await prune_revisions(session, keep=settings.ARTICLE_REVISIONS_KEEP)
+    if count:
+        logger.info("Pruned %d old article revision(s)", count)
+
+
+@handler("comment_partitions")
+async def _comment_partitions(session: AsyncSession, payload: dict) -> None:
+    from app.services.comment_service import ensure_comment_partitions, purge_hidden_comments
+
+    if created := await ensure_comment_partitions(session):
+        logger.info("Created %d comment partition(s)", created)
+    if settings.COMMENT_HIDDEN_RETENTION_DAYS > 0:
+        deleted, dropped = await purge_hidden_comments(
+            session, older_than_days=settings.COMMENT_HIDDEN_RETENTION_DAYS
+        )
+        if deleted or dropped:
+            logger.info("Purged %d hidden comment(s), dropped %d empty partition(s)", deleted, dropped)
+
+
+@handler("prune_jobs")
+async def _prune_jobs(session: AsyncSession, payload: dict) -> None:
+    count = await prune_jobs(session, keep_days=settings.JOB_KEEP_DAYS)
+    if count:
+        logger.info("Pruned %d finished job(s)", count)
+
+
+async def enqueue_maintenance() -> None:
+    """Queue today's housekeeping jobs; the dedupe key makes repeat calls no-ops."""
+    today = datetime.utcnow().date().isoformat()
+    kinds = ["prune_jobs", "comment_partitions"]
+    if settings.MEDIA_ORPHAN_GRACE_DAYS > 0:
+        kinds.append("media_gc")
+    if settings.ARTICLE_REVISIONS_KEEP > 0:
+        kinds.append("prune_revisions")
+    async with async_session() as session:
+        for kind in kinds:
+            await enqueue(session, kind, priority=-1, dedupe_key=f"{kind}:{today}")
+        await session.commit()
+
+
+# ──── Worker loop ─────────────────────────────────────────────────────────────
+
+
+async def _heartbeat(job_id: int) -> None:
+    """Keep a running job's heartbeat fresh until cancelled."""
+    while True:
+        await asyncio.sleep(HEARTBEAT_SECONDS)
+        try:
+            async with async_session() as session:
+                await heartbeat(session, job_id)
+        except Exception:
+            logger.exception("Job %d heartbeat failed", job_id)
+
+
+async def _run(job: Job) -> None:
+    error = None
+    beat = asyncio.create_task(_heartbeat(job.id))
+    try:
+        fn = HANDLERS.get(job.kind)
+        if fn is None:
+            raise LookupError(f"No handler for job kind {job.kind!r}")
+        async with async_session() as session:
+            await fn(session, job.payload)
+    except asyncio.CancelledError:
+        raise  # shutting down; the job is requeued once its heartbeat goes stale
+    except Exception as exc:
+        logger.exception("Job %d (%s) failed, attempt %d/%d", job.id, job.kind, job.attempts, job.max_attempts)
+        error = f"{type(exc).__name__}: {exc}"
+    finally:
+        beat.cancel()
+    async with async_session() as session:
+        await finish_job(session, job, error)
+
+
+async def _listen(wake: asyncio.Event) -> None:
+    """Set `wake` on every NOTIFY jobs; own connection, outside the pool."""
+    while True:
+        try:
+            conn = await asyncpg.connect(asyncpg_dsn())
+            try:
+                await conn.add_listener(JOB_CHANNEL, lambda *_: wake.set())
+                wake.set()  # anything queued while disconnected
+                while not conn.is_closed():
+                    await asyncio.sleep(5)
+            finally:
+                await conn.close()
+        except Exception:
+            logger.exception("Job listener error")
+        await asyncio.sleep(RETRY_SECONDS)
+
+
+async def run_worker(concurrency: int) -> None:
+    """Claim and run jobs until cancelled, at most `concurrency` at a time."""
+    wake = asyncio.Event()
+    listener = asyncio.create_task(_listen(wake))
+    slots = asyncio.Semaphore(concurrency)
+    running: set[asyncio.Task] = set()
+    last_reap = 0.0
+
+    def _done(task: asyncio.Task) -> None:
+        running.discard(task)
+        slots.release()
+
+    try:
+        while True:
+            await slots.acquire()
+            # Cleared before claiming, so a job queued during the claim wakes us again
+            wake.clear()
+            job = None
+            try:
+                async with async_session() as session:
+                    if time.monotonic() - last_reap > REAP_SECONDS:
+                        last_reap = time.monotonic()
+                        if count := await requeue_stale_jobs(session):
+                            logger.warning("Requeued %d stale job(s)", count)
+                    job = await claim_job(session)
+            except Exception:
+                logger.exception("Job claim error")
+                slots.release()
+                await asyncio.sleep(RETRY_SECONDS)
+                continue
+
+            if job is None:
+                slots.release()
+                try:
+                    await asyncio.wait_for(wake.wait(), settings.JOB_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            task = asyncio.create_task(_run(job))
+            running.add(task)
+            task.add_done_callback(_done)
+    finally:
+        listener.cancel()
+        for task in running:
+            task.cancel()
+
+
+def main() -> None:
+    from app.database import engine
+    from app.utils.offload import shutdown_pools
+
+    parser = argparse.ArgumentParser(description="Run background jobs from the jobs table.")
+    parser.add_argument("--concurrency", type=int, default=settings.JOB_CONCURRENCY or 2)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    async def _main() -> None:
+        try:
+            await run_worker(args.concurrency)
+        finally:
+            shutdown_pools()
+            await engine.dispose()
+
+    logger.info("Job worker started, concurrency %d", args.concurrency)
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Backfill media.sha256 for uploads stored before content addressing.
+
+Legacy files keep their UUID names (articles link to them), but once hashed
+they take part in upload deduplication. When several legacy rows share the
+same bytes only the first gets the hash - the rest stay as they are.
+"""
+import asyncio
+import hashlib
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.models.media import Media
+from app.services.media_service import UPLOAD_DIR
+
+
+def _file_sha256(path) -> str | None:
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+async def backfill():
+    engine = create_async_engine(settings.DATABASE_URL)
+    async_session = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with async_session() as session:
+        known = set((await session.execute(
+            select(Media.sha256).where(Media.sha256.is_not(None))
+        )).scalars())
+        legacy = (await session.execute(
+            select(Media.id, Media.filename).where(Media.sha256.is_(None)).order_by(Media.id)
+        )).all()
+
+        hashed = missing = duplicates = 0
+        for media_id, filename in legacy:
+            sha = await asyncio.to_thread(_file_sha256, UPLOAD_DIR / filename)
+            if sha is None:
+                missing += 1
+            elif sha in known:
+                duplicates += 1
+            else:
+                known.add(sha)
+                await session.execute(update(Media).where(Media.id == media_id).values(sha256=sha))
+                hashed += 1
+
+        await session.commit()
+        print("Backfill completed.")
+        print(f"  Hashed: {hashed}")
+        print(f"  Duplicates left unhashed: {duplicates}")
+        print(f"  Missing files: {missing}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill())
@@ -0,0 +1,127 @@
+"""Per-request cost of the middleware stack, before and after going pure ASGI.
+
+The stack is built in app.main's order, outermost first (ProxyHeaders ->
+SecurityHeaders -> Deadline -> CSRF), around an endpoint that returns a small
+response without touching a database, and driven directly with ASGI
+messages, so there is no server or socket in the numbers.
+
+Stacks:
+  bare     - the endpoint alone
+  before   - SecurityHeaders on BaseHTTPMiddleware, CSRF building a Request
+             and setting its cookie on every path (as the code was before)
+  after    - the middlewares in app.middleware now
+
+Printed per path is the time per request and the overhead over `bare`.
+
+No database needed:  python -m scripts.bench_middleware [requests]
+"""
+import asyncio
+import secrets
+import sys
+import time
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+
+from app.middleware import CSRFMiddleware, DeadlineMiddleware, SecurityHeadersMiddleware
+
+PATHS = ["/", "/static/css/style.css"]
+DEADLINES = [("/static/", None), ("/", 30.0)]
+
+
+class LegacySecurityHeaders(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        response.headers["Permissions-Policy"] = "camera=(), microphone=(), geolocation=()"
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        return response
+
+
+class LegacyCSRF:
+    """The old CSRFMiddleware's safe-method path; unsafe methods aren't benchmarked."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        request = Request(scope, receive)
+        csrf_cookie = request.cookies.get("csrf_token") or secrets.token_hex(32)
+        request.state.csrf_token = csrf_cookie
+        cookie = f"csrf_token={csrf_cookie}; Path=/; Max-Age=86400; SameSite=Strict"
+        if request.url.scheme == "https":
+            cookie += "; Secure"
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"set-cookie", cookie.encode()))
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+async def endpoint(scope, receive, send):
+    await PlainTextResponse("ok")(scope, receive, send)
+
+
+def _stack(security, csrf):
+    app = csrf(endpoint)
+    app = DeadlineMiddleware(app, deadlines=DEADLINES, timeout_response=None)
+    app = security(app)
+    return ProxyHeadersMiddleware(app, trusted_hosts=["*"])
+
+
+STACKS = {
+    "bare": endpoint,
+    "before": _stack(LegacySecurityHeaders, LegacyCSRF),
+    "after": _stack(SecurityHeadersMiddleware, CSRFMiddleware),
+}
+
+
+def _scope(path: str) -> dict:
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"localhost"), (b"cookie", b"csrf_token=" + b"a" * 64 + b"; theme=dark")],
+        "client": ("127.0.0.1", 50000), "server": ("localhost", 8000),
+    }
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+async def _us(app, path: str, number: int) -> float:
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(number):
+            await app(_scope(path), _receive, _send)
+        best = min(best, time.perf_counter() - start)
+    return best / number * 1e6
+
+
+async def _main(number: int) -> None:
+    print(f"{'path':<24} {'bare':>10} {'before':>10} {'after':>10} {'overhead before -> after':>28}")
+    for path in PATHS:
+        bare, before, after = [await _us(app, path, number) for app in STACKS.values()]
+        overhead = f"{before - bare:.1f}us -> {after - bare:.1f}us"
+        print(f"{path:<24} {bare:>8.1f}us {before:>8.1f}us {after:>8.1f}us {overhead:>28}")
+
+
+def main(number: int = 2000) -> None:
+    asyncio.run(_main(number))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,118 @@
+"""Per-request statement cost of the hot public queries, before and after pre-building.
+
+SQLAlchemy caches compiled SQL, but a statement built per request still has to
+be constructed and have its cache key generated on every execute. Statements
+built once at import time skip both (Select memoizes its cache key).
+
+For each query this prints:
+  compile  - full compile on a cache miss (first request per process)
+  before   - per request: build the statement the old way + cache key
+  after    - per request: reuse the module-level statement + cache key
+
+No database needed:  python -m scripts.bench_statements [iterations]
+"""
+import sys
+import timeit
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import asyncpg
+from sqlalchemy.orm import selectinload
+
+from app.models.article import Article, ArticleStatus, article_tag
+from app.models.category import Category
+from app.models.comment import Comment
+from app.models.static_page import StaticPage
+from app.routers import blog, pages
+from app.services import article_service, comment_service, search_service
+from app.services.article_service import summary_select
+
+_published = Article.status == ArticleStatus.PUBLISHED
+
+
+def _ts():
+    return func.plainto_tsquery("simple", "emerytura")
+
+
+# name -> (per-request builder as the code was before, pre-built statement now)
+QUERIES = {
+    "article_detail": (
+        lambda: select(Article)
+        .options(selectinload(Article.category), selectinload(Article.tags))
+        .where(Article.slug == "jak-zaczac", _published),
+        blog._PUBLISHED_ARTICLE,
+    ),
+    "article_comments": (
+        lambda: select(Comment)
+        .where(Comment.article_id == 42, Comment.is_approved == True)
+        .order_by(Comment.created_at.asc()),
+        comment_service._APPROVED_COMMENTS,
+    ),
+    "home_page": (
+        lambda: summary_select().where(_published).order_by(Article.created_at.desc()).offset(10).limit(10),
+        article_service._published_summaries_stmts("created_at", False)[0],
+    ),
+    "home_count": (
+        lambda: select(func.count(Article.id)).where(_published),
+        article_service._published_summaries_stmts("created_at", False)[1],
+    ),
+    "category_by_slug": (
+        lambda: select(Category).where(Category.slug == "inwestowanie"),
+        blog._CATEGORY_BY_SLUG,
+    ),
+    "category_page": (
+        lambda: summary_select()
+        .where(_published, Article.category_id == 3)
+        .order_by(Article.published_at.desc())
+        .offset(0)
+        .limit(10),
+        article_service._published_summaries_stmts("published_at", True)[0],
+    ),
+    "category_count": (
+        lambda: select(func.count(Article.id)).where(_published, Article.category_id == 3),
+        article_service._published_summaries_stmts("published_at", True)[1],
+    ),
+    "sidebar_categories": (
+        lambda: select(Category).order_by(Category.name),
+        article_service._ALL_CATEGORIES,
+    ),
+    "search": (
+        lambda: summary_select()
+        .where(_published, Article.search_vector.op("@@")(_ts()))
+        .order_by(func.ts_rank(Article.search_vector, _ts()).desc())
+        .limit(10),
+        search_service._SEARCH,
+    ),
+    "beginner_articles": (
+        lambda: summary_select()
+        .join(article_tag, Article.id == article_tag.c.article_id)
+        .where(_published, article_tag.c.tag_id == 7)
+        .order_by(Article.published_at.desc()),
+        pages._BEGINNER_ARTICLES,
+    ),
+    "about_page": (
+        lambda: select(StaticPage).where(StaticPage.slug == "o-mnie"),
+        pages._ABOUT_PAGE,
+    ),
+}
+
+
+def _us(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main(number: int = 2000) -> None:
+    dialect = asyncpg.dialect()
+    print(f"{'query':<20} {'compile':>10} {'before':>10} {'after':>10} {'saved':>7}")
+    total_before = total_after = 0.0
+    for name, (build, stmt) in QUERIES.items():
+        compile_us = _us(lambda: stmt.compile(dialect=dialect), max(number // 20, 10))
+        before = _us(lambda: build()._generate_cache_key(), number)
+        after = _us(lambda: stmt._generate_cache_key(), number)
+        total_before += before
+        total_after += after
+        print(f"{name:<20} {compile_us:>8.1f}us {before:>8.1f}us {after:>8.1f}us {1 - after / before:>6.0%}")
+    print(f"{'total':<20} {'':>10} {total_before:>8.1f}us {total_after:>8.1f}us {1 - total_after / total_before:>6.0%}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,3 @@
+#!/bin/sh
+# Docker init script for the dev database: let the replica service stream WAL.
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"
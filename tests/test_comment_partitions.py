@@ -0,0 +1,56 @@
+import asyncio
+from datetime import date, datetime
+
+from app.models.comment import Comment
+from app.services import comment_service
+from app.services.comment_service import _month_start, partition_name
+
+
+class FakeSession:
+    def __init__(self, partitions):
+        self.partitions = partitions
+        self.sql = []
+
+    async def execute(self, stmt):
+        sql = str(stmt)
+        self.sql.append(sql)
+        if "pg_inherits" in sql:
+            return [(name,) for name in self.partitions]
+        return None
+
+    async def commit(self):
+        pass
+
+
+def test_month_arithmetic():
+    assert _month_start(date(2026, 11, 17)) == date(2026, 11, 1)
+    assert _month_start(date(2026, 11, 17), 2) == date(2027, 1, 1)
+    assert _month_start(date(2026, 1, 31), -1) == date(2025, 12, 1)
+    assert partition_name(date(2027, 1, 1)) == "comments_p202701"
+
+
+def test_ensure_creates_only_missing_months(monkeypatch):
+    class FixedDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            return datetime(2026, 11, 17, 12, 0)
+
+    monkeypatch.setattr(comment_service, "datetime", FixedDatetime)
+    session = FakeSession(["comments_p202611", "comments_p202612", "comments_default"])
+
+    created = asyncio.run(comment_service.ensure_comment_partitions(session, months_ahead=3))
+
+    assert created == 2
+    ddl = [s for s in session.sql if s.startswith("CREATE TABLE")]
+    assert ddl == [
+        "CREATE TABLE comments_p202701 PARTITION OF comments FOR VALUES FROM ('2027-01-01') TO ('2027-02-01')",
+        "CREATE TABLE comments_p202702 PARTITION OF comments FOR VALUES FROM ('2027-02-01') TO ('2027-03-01')",
+    ]
+    assert any("lock_timeout" in s for s in session.sql)
+
+
+def test_table_is_partitioned_on_created_at():
+    table = Comment.__table__
+    assert table.dialect_options["postgresql"]["partition_by"] == "RANGE (created_at)"
+    assert [c.name for c in table.primary_key] == ["id", "created_at"]
+    assert "ix_comments_is_approved" not in {i.name for i in table.indexes}
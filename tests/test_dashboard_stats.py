@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+
+from app.services import stats_service
+
+
+@pytest.fixture(autouse=True)
+def _reset(monkeypatch):
+    monkeypatch.setattr(stats_service, "_snapshot", None)
+    monkeypatch.setattr(stats_service, "_snapshot_at", 0.0)
+    monkeypatch.setattr(stats_service, "_stale", True)
+
+
+def test_invalidation_during_refresh_is_kept(monkeypatch):
+    async def gather_reads(session, *loaders):
+        stats_service.invalidate_dashboard_stats()  # a write lands mid-refresh
+        return {"articles": 1}, []
+
+    monkeypatch.setattr(stats_service, "gather_reads", gather_reads)
+    asyncio.run(stats_service.refresh_dashboard_stats(None))
+    assert stats_service._stale
+
+
+def test_failed_refresh_leaves_snapshot_stale(monkeypatch):
+    async def gather_reads(session, *loaders):
+        raise OSError("connection lost")
+
+    monkeypatch.setattr(stats_service, "gather_reads", gather_reads)
+    monkeypatch.setattr(stats_service, "_stale", False)
+    with pytest.raises(OSError):
+        asyncio.run(stats_service.refresh_dashboard_stats(None))
+    assert stats_service._stale
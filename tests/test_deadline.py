@@ -0,0 +1,100 @@
+import asyncio
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.middleware import DeadlineMiddleware
+
+cancelled = []
+
+
+async def slow(request):
+    try:
+        await asyncio.sleep(1)
+    except asyncio.CancelledError:
+        cancelled.append(request.url.path)
+        raise
+    return PlainTextResponse("done")
+
+
+async def deadline(request):
+    return PlainTextResponse(str(request.state.deadline is not None))
+
+
+def _client():
+    app = Starlette(routes=[
+        Route("/slow", slow),
+        Route("/free/slow", slow),
+        Route("/deadline", deadline),
+    ])
+    app.add_middleware(
+        DeadlineMiddleware,
+        deadlines=[("/free/", None), ("/", 0.05)],
+        timeout_response=lambda scope: PlainTextResponse("timeout", status_code=504),
+    )
+    return TestClient(app)
+
+
+def test_expired_deadline_cancels_handler_and_returns_504():
+    cancelled.clear()
+    response = _client().get("/slow")
+    assert response.status_code == 504
+    assert cancelled == ["/slow"]
+
+
+def test_deadline_is_exposed_on_request_state():
+    assert _client().get("/deadline").text == "True"
+
+
+def test_exempt_prefix_has_no_deadline():
+    response = _client().get("/free/slow")
+    assert response.status_code == 200
+    assert response.text == "done"
+
+
+def test_client_disconnect_cancels_handler():
+    cancelled.clear()
+    app = _client().app
+
+    async def run():
+        sent = []
+
+        async def receive():
+            if not sent:
+                sent.append(True)
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.sleep(0.01)
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            "type": "http", "method": "GET", "path": "/free/slow", "raw_path": b"/free/slow",
+            "query_string": b"", "headers": [], "root_path": "", "scheme": "http", "server": ("t", 80),
+        }
+        middleware = DeadlineMiddleware(app, deadlines=[("/", 5)], timeout_response=None)
+        await asyncio.wait_for(middleware(scope, receive, send), 0.5)
+        return sent
+
+    sent = asyncio.run(run())
+    assert cancelled == ["/free/slow"]
+    assert len(sent) == 1  # nothing was sent back
+
+
+def test_timeout_response_gets_security_headers():
+    from app.main import app as main_app
+    from app.middleware import SECURITY_HEADERS, SecurityHeadersMiddleware
+
+    # Registered after DeadlineMiddleware in app.main, i.e. wrapped around it
+    order = [m.cls for m in main_app.user_middleware]
+    assert order.index(SecurityHeadersMiddleware) < order.index(DeadlineMiddleware)
+
+    client = _client()
+    client.app.add_middleware(SecurityHeadersMiddleware)
+    response = client.get("/slow")
+    assert response.status_code == 504
+    for name, value in SECURITY_HEADERS:
+        assert response.headers[name.decode()] == value.decode()
@@ -0,0 +1,42 @@
+import asyncio
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.models.article import Article
+from app.models.category import Category
+from app.services import article_service
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return SimpleNamespace(rowcount=3)
+
+    async def commit(self):
+        self.commits += 1
+
+
+def test_relationships_leave_cascades_to_the_database():
+    assert Article.comments.property.passive_deletes
+    assert Article.tags.property.passive_deletes
+    assert Category.articles.property.passive_deletes
+
+
+def test_delete_articles_is_one_statement():
+    session = RecordingSession()
+    assert asyncio.run(article_service.delete_articles(session, [1, 2, 3])) == 3
+    [stmt] = session.statements
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert sql == "DELETE FROM articles WHERE articles.id = ANY (%(ids)s::INTEGER[])"
+    assert session.commits == 1
+
+
+def test_delete_articles_without_ids_does_nothing():
+    session = RecordingSession()
+    assert asyncio.run(article_service.delete_articles(session, [])) == 0
+    assert session.statements == []
@@ -0,0 +1,122 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app import database
+
+
+class FakePool:
+    def __init__(self, checked_out=0, size=5):
+        self._checked_out = checked_out
+        self._size = size
+
+    def checkedout(self):
+        return self._checked_out
+
+    def size(self):
+        return self._size
+
+
+class FakeSession:
+    def __init__(self, bind=None, **kw):
+        self.bind = bind
+        self.info = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def _session(pool):
+    return FakeSession(SimpleNamespace(sync_engine=SimpleNamespace(pool=pool)))
+
+
+async def _loader_log(session, log, name, delay=0.02):
+    log.append(("start", name, session))
+    await asyncio.sleep(delay)
+    log.append(("end", name, session))
+    return name
+
+
+def test_independent_loaders_run_concurrently_on_own_sessions(monkeypatch):
+    monkeypatch.setattr(database, "AsyncSession", FakeSession)
+    session, log = _session(FakePool()), []
+    results = asyncio.run(database.gather_reads(
+        session, *(lambda s, n=n: _loader_log(s, log, n) for n in "abc")
+    ))
+    assert results == ["a", "b", "c"]
+    assert [e[0] for e in log[:3]] == ["start"] * 3
+    used = [e[2] for e in log if e[0] == "start"]
+    assert used[0] is session and len({id(s) for s in used}) == 3
+    assert database._parallel_in_use == 0
+
+
+def test_busy_pool_runs_loaders_sequentially(monkeypatch):
+    monkeypatch.setattr(database, "AsyncSession", FakeSession)
+    session, log = _session(FakePool(checked_out=5, size=5)), []
+    results = asyncio.run(database.gather_reads(
+        session, *(lambda s, n=n: _loader_log(s, log, n) for n in "ab")
+    ))
+    assert results == ["a", "b"]
+    assert [e[0] for e in log] == ["start", "end", "start", "end"]
+    assert all(e[2] is session for e in log)
+
+
+def test_failure_is_raised_after_all_loaders_finish(monkeypatch):
+    monkeypatch.setattr(database, "AsyncSession", FakeSession)
+    session, log = _session(FakePool()), []
+
+    async def boom(s):
+        raise ValueError("nope")
+
+    with pytest.raises(ValueError):
+        asyncio.run(database.gather_reads(session, lambda s: _loader_log(s, log, "slow"), boom))
+    assert ("end", "slow", session) in log
+    assert database._parallel_in_use == 0
+
+
+def test_article_edit_form_checks_tags_loaded_on_another_session(monkeypatch):
+    # With spare pool capacity the article and the tag list come from different
+    # sessions, so the form's Tag objects are never the article's Tag objects
+    from starlette.requests import Request
+
+    from app.main import app
+    from app.models.article import Article, ArticleStatus
+    from app.models.tag import Tag
+    from app.routers import panel
+
+    def tags():
+        return [Tag(id=1, name="Podstawy", slug="podstawy"), Tag(id=2, name="ETF", slug="etf")]
+
+    async def get_article_by_id(session, article_id):
+        return Article(
+            id=article_id, title="Tytuł", slug="tytul", content_md="", status=ArticleStatus.DRAFT,
+            tags=[t for t in tags() if t.id == 2],
+        )
+
+    async def get_all_tags(session):
+        return tags()
+
+    async def get_all_categories(session):
+        return []
+
+    monkeypatch.setattr(database, "AsyncSession", FakeSession)
+    monkeypatch.setattr(panel, "get_article_by_id", get_article_by_id)
+    monkeypatch.setattr(panel, "get_all_tags", get_all_tags)
+    monkeypatch.setattr(panel, "get_all_categories", get_all_categories)
+    scope = {
+        "type": "http", "method": "GET", "path": "/panel/articles/7/edit", "raw_path": b"/panel/articles/7/edit",
+        "query_string": b"", "headers": [], "root_path": "", "scheme": "http", "server": ("t", 80),
+        "app": app, "router": app.router,
+    }
+    response = asyncio.run(panel.article_edit(Request(scope), 7, {"username": "admin"}, _session(FakePool())))
+    html = response.body.decode()
+
+    def checkbox(tag_id):
+        return html.split(f'name="tag_ids" value="{tag_id}"')[1].split(">")[0]
+
+    assert "checked" in checkbox(2)
+    assert "checked" not in checkbox(1)
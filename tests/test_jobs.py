@@ -0,0 +1,116 @@
+import asyncio
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app import worker
+from app.services import job_service
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def _job(kind, attempts=1, max_attempts=5):
+    return SimpleNamespace(id=1, kind=kind, payload={"x": 1}, attempts=attempts, max_attempts=max_attempts)
+
+
+def _run(monkeypatch, job):
+    finished = []
+
+    async def fake_finish(session, job, error=None):
+        finished.append(error)
+
+    monkeypatch.setattr(worker, "async_session", FakeSession)
+    monkeypatch.setattr(worker, "finish_job", fake_finish)
+    asyncio.run(worker._run(job))
+    return finished
+
+
+def test_claim_uses_skip_locked(monkeypatch):
+    captured = []
+
+    class Session:
+        async def execute(self, stmt):
+            captured.append(stmt)
+            return SimpleNamespace(scalar_one_or_none=lambda: None)
+
+        async def commit(self):
+            pass
+
+    assert asyncio.run(job_service.claim_job(Session())) is None
+    sql = str(captured[0].compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "ORDER BY jobs.priority DESC, jobs.run_at" in sql
+    assert "RETURNING" in sql
+
+
+def test_backoff_grows_and_is_capped():
+    assert 24 <= job_service.backoff_seconds(1) <= 36
+    assert 48 <= job_service.backoff_seconds(2) <= 72
+    assert job_service.backoff_seconds(30) <= job_service.BACKOFF_MAX_SECONDS * 1.2
+
+
+def test_successful_job_is_finished_without_error(monkeypatch):
+    seen = []
+
+    async def ok(session, payload):
+        seen.append(payload)
+
+    monkeypatch.setitem(worker.HANDLERS, "test_ok", ok)
+    assert _run(monkeypatch, _job("test_ok")) == [None]
+    assert seen == [{"x": 1}]
+
+
+def test_failing_job_records_error(monkeypatch):
+    async def boom(session, payload):
+        raise ValueError("nope")
+
+    monkeypatch.setitem(worker.HANDLERS, "test_boom", boom)
+    assert _run(monkeypatch, _job("test_boom")) == ["ValueError: nope"]
+
+
+def test_unknown_kind_fails(monkeypatch):
+    [error] = _run(monkeypatch, _job("no_such_kind"))
+    assert error.startswith("LookupError")
+
+
+def test_running_job_sends_heartbeats(monkeypatch):
+    beats = []
+
+    async def fake_heartbeat(session, job_id):
+        beats.append(job_id)
+
+    async def slow(session, payload):
+        await asyncio.sleep(0.05)
+
+    monkeypatch.setattr(worker, "HEARTBEAT_SECONDS", 0.01)
+    monkeypatch.setattr(worker, "heartbeat", fake_heartbeat)
+    monkeypatch.setitem(worker.HANDLERS, "test_slow", slow)
+    assert _run(monkeypatch, _job("test_slow")) == [None]
+    count = len(beats)
+    assert count >= 2 and set(beats) == {1}
+    asyncio.run(asyncio.sleep(0.03))
+    assert len(beats) == count
+
+
+def test_stale_jobs_are_judged_by_heartbeat():
+    captured = []
+
+    class Session:
+        async def execute(self, stmt):
+            captured.append(stmt)
+            return SimpleNamespace(rowcount=0)
+
+        async def commit(self):
+            pass
+
+    asyncio.run(job_service.requeue_stale_jobs(Session()))
+    for stmt in captured:
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "jobs.heartbeat_at <" in sql
+        assert "jobs.started_at <" not in sql
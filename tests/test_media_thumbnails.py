@@ -0,0 +1,36 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi.responses import FileResponse
+
+from app.routers import panel
+
+ADMIN = {"username": "admin"}
+
+
+@pytest.fixture
+def undecodable(tmp_path, monkeypatch):
+    """Media whose thumbnail can't be made; originals live in tmp_path."""
+    async def get_media_by_id(session, media_id):
+        return SimpleNamespace(id=media_id, filename="plik.png")
+
+    async def ensure_thumbnail(media):
+        raise OSError("cannot identify image file")
+
+    monkeypatch.setattr(panel, "get_media_by_id", get_media_by_id)
+    monkeypatch.setattr(panel, "ensure_thumbnail", ensure_thumbnail)
+    monkeypatch.setattr(panel, "UPLOAD_DIR", tmp_path)
+    return tmp_path
+
+
+def test_thumbnail_falls_back_to_original(undecodable):
+    (undecodable / "plik.png").write_bytes(b"not really a png")
+    response = asyncio.run(panel.media_thumbnail(1, ADMIN, None))
+    assert isinstance(response, FileResponse)
+    assert response.path == undecodable / "plik.png"
+
+
+def test_thumbnail_of_missing_original_is_404(undecodable):
+    response = asyncio.run(panel.media_thumbnail(1, ADMIN, None))
+    assert response.status_code == 404
@@ -0,0 +1,17 @@
+from app.services.media_service import referenced_uploads
+
+
+def test_referenced_uploads_from_markdown_and_fields():
+    content = (
+        "![Wykres](/static/uploads/ab12cd.png)\n"
+        '<img src="https://projektfire.pl/static/uploads/legacy-uuid.jpg">'
+    )
+    assert referenced_uploads(content, "/static/uploads/cover.webp", None) == {
+        "ab12cd.png", "legacy-uuid.jpg", "cover.webp",
+    }
+
+
+def test_referenced_uploads_ignores_derived_files():
+    content = "/static/uploads/variants/ab12cd-480w.webp /static/uploads/thumbs/ab12cd.webp"
+    assert referenced_uploads(content) == set()
+
@@ -0,0 +1,64 @@
+import asyncio
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.middleware import SECURITY_HEADERS, CSRFMiddleware, SecurityHeadersMiddleware
+
+
+async def token(request):
+    return PlainTextResponse(request.state.csrf_token)
+
+
+async def framed(request):
+    return PlainTextResponse("ok", headers={"X-Frame-Options": "SAMEORIGIN"})
+
+
+def _client():
+    app = Starlette(routes=[
+        Route("/token", token),
+        Route("/framed", framed),
+        Route("/static/style.css", framed),
+    ])
+    app.add_middleware(SecurityHeadersMiddleware)
+    app.add_middleware(CSRFMiddleware)
+    return TestClient(app)
+
+
+def test_security_headers_replace_route_headers():
+    response = _client().get("/framed")
+    for name, value in SECURITY_HEADERS:
+        assert response.headers.get_list(name.decode()) == [value.decode()]
+
+
+def test_csrf_token_from_cookie_reaches_request_state():
+    client = _client()
+    first = client.get("/token")
+    assert first.cookies["csrf_token"] == first.text
+    second = client.get("/token")
+    assert second.text == first.text
+
+
+def test_static_paths_skip_csrf():
+    client = _client()
+    response = client.get("/static/style.css")
+    assert "set-cookie" not in response.headers
+    assert response.headers["x-content-type-options"] == "nosniff"
+
+
+def test_response_start_is_passed_on_before_the_body_is_produced():
+    events = []
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        events.append("app: body")
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def send(message):
+        events.append(message["type"])
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": []}
+    asyncio.run(SecurityHeadersMiddleware(app)(scope, None, send))
+    assert events == ["http.response.start", "app: body", "http.response.body"]
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.utils import offload
+from app.utils.markdown import markdown_to_html, render_markdown, render_markdown_async
+
+
+def _pool(workers=1, queue_size=0):
+    return offload.BoundedPool("test", lambda n: ThreadPoolExecutor(max_workers=n), workers, queue_size)
+
+
+def test_pool_runs_task_and_records_stats():
+    pool = _pool()
+
+    async def run():
+        return await pool.run("add", lambda a, b: a + b, 2, 3)
+
+    try:
+        assert asyncio.run(run()) == 5
+    finally:
+        pool.shutdown()
+    stats = pool.stats["add"]
+    assert (stats.calls, stats.failures, stats.rejected) == (1, 0, 0)
+    assert pool.in_flight == 0
+
+
+def test_pool_counts_failures():
+    pool = _pool()
+
+    def boom():
+        raise ValueError("nope")
+
+    try:
+        with pytest.raises(ValueError):
+            asyncio.run(pool.run("boom", boom))
+    finally:
+        pool.shutdown()
+    assert pool.stats["boom"].failures == 1
+    assert pool.stats["boom"].calls == 0
+
+
+def test_full_pool_rejects(monkeypatch):
+    monkeypatch.setattr(offload, "QUEUE_TIMEOUT_SECONDS", 0.05)
+    pool = _pool(workers=1, queue_size=0)
+    release = threading.Event()
+
+    async def run():
+        blocker = asyncio.create_task(pool.run("slow", release.wait, 5))
+        await asyncio.sleep(0.01)
+        try:
+            with pytest.raises(offload.OffloadBusy):
+                await pool.run("fast", int)
+        finally:
+            release.set()
+            await blocker
+
+    try:
+        asyncio.run(run())
+    finally:
+        pool.shutdown()
+    assert pool.stats["fast"].rejected == 1
+    assert pool.stats["slow"].calls == 1
+
+
+def test_cancelled_caller_keeps_slot_until_task_ends(monkeypatch):
+    monkeypatch.setattr(offload, "QUEUE_TIMEOUT_SECONDS", 0.05)
+    pool = _pool(workers=1, queue_size=0)
+    release = threading.Event()
+
+    async def run():
+        caller = asyncio.create_task(pool.run("slow", release.wait, 5))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        # The task is still running in the pool, so its slot is still taken
+        assert pool.in_flight == 1
+        with pytest.raises(offload.OffloadBusy):
+            await pool.run("fast", int)
+        release.set()
+        while pool.in_flight:
+            await asyncio.sleep(0.01)
+        return await pool.run("fast", int)
+
+    try:
+        assert asyncio.run(run()) == 0
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+def test_render_markdown_async_matches_sync():
+    long_text = "Akapit **pogrubiony**.\n\n" * 200
+    try:
+        result = asyncio.run(render_markdown_async(long_text))
+    finally:
+        offload.shutdown_pools()
+    assert result == render_markdown(long_text)
+    assert result == markdown_to_html(long_text)
@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_roundtrip_datetime():
+    cursor = encode_cursor(datetime(2026, 3, 1, 12, 30), 42)
+    assert decode_cursor(cursor) == (datetime(2026, 3, 1, 12, 30), 42)
+
+
+def test_cursor_roundtrip_string():
+    cursor = encode_cursor("Jak zacząć inwestować", 7)
+    assert decode_cursor(cursor, is_datetime=False) == ("Jak zacząć inwestować", 7)
+
+
+def test_malformed_cursor():
+    assert decode_cursor("not-a-cursor") is None
+    assert decode_cursor("") is None
@@ -0,0 +1,13 @@
+from app.utils.pool_metrics import WAIT_BUCKETS_MS, PoolMetrics
+
+
+def test_wait_histogram_buckets():
+    m = PoolMetrics()
+    for ms in (0.2, 1, 3, 120, 9000):
+        m.observe_wait(ms)
+    counts = dict(m.histogram())
+    assert counts["≤ 1 ms"] == 2
+    assert counts["≤ 5 ms"] == 1
+    assert counts["≤ 250 ms"] == 1
+    assert counts[f"> {WAIT_BUCKETS_MS[-1]} ms"] == 1
+    assert m.wait_max_ms == 9000
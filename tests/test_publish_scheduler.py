@@ -0,0 +1,40 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from app.services import publish_scheduler
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    async def add_listener(self, channel, callback):
+        pass
+
+    def add_termination_listener(self, callback):
+        pass
+
+    def is_closed(self):
+        return self.closed
+
+
+def test_leader_reloads_schedules_after_max_sleep(monkeypatch):
+    # No NOTIFY ever arrives: the schedule is only seen by reloading on timeout
+    conn = FakeConnection()
+    loads = []
+    due = datetime.utcnow() - timedelta(seconds=1)
+
+    async def load_heap():
+        loads.append(True)
+        return [] if len(loads) == 1 else [due]
+
+    async def publish_due():
+        conn.closed = True
+        return 1
+
+    monkeypatch.setattr(publish_scheduler, "MAX_SLEEP_SECONDS", 0.01)
+    monkeypatch.setattr(publish_scheduler, "_load_heap", load_heap)
+    monkeypatch.setattr(publish_scheduler, "_publish_due", publish_due)
+    asyncio.run(asyncio.wait_for(publish_scheduler._lead(conn), 1))
+    assert conn.closed
+    assert len(loads) >= 2
@@ -0,0 +1,179 @@
+"""Query-plan checks for the hot queries.
+
+Each query is EXPLAINed against a seeded database and must be served by an
+index in the order it asks for: no Seq Scan and no Sort nodes in the plan.
+Seq scans and sorts are switched off for the check (enable_seqscan /
+enable_sort). Postgres still falls back to them when no index can do the job,
+so the result doesn't depend on table sizes or statistics. A failure means a
+query and its index have drifted apart.
+
+Each query is also checked as a generic plan, the one Postgres switches to
+once asyncpg's prepared statement cache has run it five times; only
+predicates written as literals can use the partial indexes there.
+
+Needs a migrated database (DATABASE_URL, like test_routes.py) and is skipped
+when none is reachable. Seed rows are inserted in a transaction that is
+rolled back.
+"""
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import asyncpg as asyncpg_dialect
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import NullPool
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.config import settings
+from app.models.article import Article
+from app.models.comment import Comment
+from app.routers import blog, pages, seo
+from app.services import article_service, comment_service, search_service
+
+FORBIDDEN_NODES = {"Seq Scan", "Sort", "Incremental Sort"}
+
+SEED_SQL = [
+    """INSERT INTO categories (name, slug, created_at)
+       SELECT 'Plan ' || g, 'plan-category-' || g, now() FROM generate_series(1, 20) g""",
+    """INSERT INTO tags (name, slug, created_at) VALUES ('Beginner', 'beginner', now())
+       ON CONFLICT (slug) DO NOTHING""",
+    """INSERT INTO articles (title, slug, content_md, content_html, status, category_id,
+                             created_at, updated_at, published_at, scheduled_publish_at)
+       SELECT 'Plan ' || g, 'plan-article-' || g, 'Treść', '<p>Treść</p>',
+              (CASE g % 10 WHEN 0 THEN 'DRAFT' WHEN 1 THEN 'SCHEDULED' ELSE 'PUBLISHED' END)::articlestatus,
+              (SELECT min(id) FROM categories) + g % 20,
+              now() - g * interval '1 hour', now(),
+              CASE WHEN g % 10 > 1 THEN now() - g * interval '1 hour' END,
+              CASE WHEN g % 10 = 1 THEN now() + g * interval '1 hour' END
+       FROM generate_series(1, 5000) g""",
+    """INSERT INTO article_tags (article_id, tag_id)
+       SELECT a.id, t.id FROM articles a, tags t
+       WHERE t.slug = 'beginner' AND a.slug LIKE 'plan-article-%' AND a.id % 7 = 0
+       ON CONFLICT DO NOTHING""",
+    """INSERT INTO comments (article_id, nickname, content, is_approved, created_at)
+       SELECT a.id, 'Gość', 'Komentarz', g % 5 <> 0,
+              (now() AT TIME ZONE 'UTC') - (g % 60) * interval '1 day'
+       FROM (SELECT id FROM articles WHERE slug LIKE 'plan-article-%' LIMIT 1000) a,
+            generate_series(1, 20) g""",
+    "ANALYZE categories, tags, articles, article_tags, comments",
+    "SET LOCAL enable_seqscan = off",
+    "SET LOCAL enable_sort = off",
+]
+
+summaries = article_service._published_summaries_stmts
+page = {"offset": 20, "limit": 10}
+
+# name -> (statement, bound values, whether the query's own ordering needs a sort)
+HOT_QUERIES = {
+    "home_page": (summaries("created_at", False)[0], page, False),
+    "home_count": (summaries("created_at", False)[1], {}, False),
+    "category_page": (summaries("published_at", True)[0], {"category_id": 3, **page}, False),
+    "category_count": (summaries("published_at", True)[1], {"category_id": 3}, False),
+    "article_detail": (blog._PUBLISHED_ARTICLE, {"slug": "plan-article-42"}, False),
+    "approved_comments": (comment_service._APPROVED_COMMENTS, {"article_id": 3}, False),
+    "beginner_articles": (pages._BEGINNER_ARTICLES, {}, False),
+    "sitemap_articles": (seo._SITEMAP_ARTICLES, {}, False),
+    "upcoming_publish_times": (article_service._UPCOMING_PUBLISH_TIMES, {}, False),
+    "panel_articles": (
+        select(Article.id).order_by(Article.created_at.desc(), Article.id.desc()).limit(26), {}, False,
+    ),
+    "moderation_queue": (select(Comment).order_by(Comment.id.desc()).limit(51), {}, False),
+    "moderation_hidden": (
+        select(Comment).where(Comment.is_approved == False).order_by(Comment.id.desc()).limit(51),  # noqa: E712
+        {},
+        False,
+    ),
+    # Ranked by ts_rank, which no index provides: only the scan is checked
+    "search": (search_service._SEARCH, {"q": "plan", "limit": 10}, True),
+}
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) <stmt>, with stmt's parameters bound as usual."""
+
+    inherit_cache = False
+
+    def __init__(self, stmt):
+        self.stmt = stmt
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.stmt, **kw)
+
+
+def _nodes(plan: dict):
+    yield plan["Node Type"]
+    for child in plan.get("Plans", ()):
+        yield from _nodes(child)
+
+
+async def _explain(stmt, params: dict, *settings_sql: str) -> dict:
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        async with engine.connect() as conn:
+            trans = await conn.begin()
+            try:
+                for statement in (*SEED_SQL, *settings_sql):
+                    await conn.exec_driver_sql(statement)
+                plan = (await conn.execute(Explain(stmt), params)).scalar()
+            finally:
+                await trans.rollback()
+    finally:
+        await engine.dispose()
+    return (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+
+
+@pytest.fixture(scope="module")
+def database():
+    async def ping():
+        engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool, connect_args={"timeout": 2})
+        try:
+            async with engine.connect():
+                pass
+        finally:
+            await engine.dispose()
+
+    try:
+        asyncio.run(ping())
+    except (OSError, asyncio.TimeoutError, DBAPIError) as exc:
+        pytest.skip(f"database not reachable: {exc}")
+
+
+def test_every_statement_renders():
+    # Runs without a database too: a statement that can't be rendered would
+    # otherwise only show up as a skipped plan check
+    dialect = asyncpg_dialect.dialect()
+    for stmt, _, _ in HOT_QUERIES.values():
+        assert str(Explain(stmt).compile(dialect=dialect)).startswith("EXPLAIN (FORMAT JSON) SELECT")
+
+
+def test_status_filters_are_not_bound():
+    # A bound status can't match the partial indexes' predicates in a generic
+    # plan, so it must be rendered inline
+    dialect = asyncpg_dialect.dialect()
+    for name, (stmt, _, _) in HOT_QUERIES.items():
+        sql = str(stmt.compile(dialect=dialect))
+        assert "::articlestatus" not in sql, name
+
+
+def _check_plan(name: str, *settings_sql: str) -> None:
+    stmt, params, sorts = HOT_QUERIES[name]
+    plan = asyncio.run(_explain(stmt, params, *settings_sql))
+    forbidden = FORBIDDEN_NODES - ({"Sort", "Incremental Sort"} if sorts else set())
+    found = sorted(set(_nodes(plan)) & forbidden)
+    assert not found, f"{name}: {', '.join(found)} in plan\n{json.dumps(plan, indent=2)}"
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_indexes(database, name):
+    _check_plan(name)
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_indexes_with_generic_plan(database, name):
+    # What the prepared statement cache runs after five executions
+    _check_plan(name, "SET LOCAL plan_cache_mode = force_generic_plan")
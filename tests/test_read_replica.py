@@ -0,0 +1,109 @@
+import asyncio
+from types import SimpleNamespace
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app import database
+from app.middleware import ReadYourWritesMiddleware
+
+
+class FakeSession:
+    def __init__(self, name, fail=False):
+        self.name = name
+        self.fail = fail
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def connection(self):
+        if self.fail:
+            raise OSError("connection refused")
+
+
+class FakeRequest:
+    def __init__(self, cookies=None):
+        self.cookies = cookies or {}
+        self.state = SimpleNamespace()
+
+
+def _read_session(monkeypatch, *, replica_fails=False, replica_ok=True, cookies=None):
+    monkeypatch.setattr(database, "async_session", lambda: FakeSession("primary"))
+    monkeypatch.setattr(database, "replica_session", lambda: FakeSession("replica", fail=replica_fails))
+    monkeypatch.setattr(database, "_replica_ok", replica_ok)
+
+    async def first():
+        gen = database.get_read_db(FakeRequest(cookies))
+        session = await gen.__anext__()
+        await gen.aclose()
+        return session.name
+
+    return asyncio.run(first())
+
+
+def test_reads_go_to_healthy_replica(monkeypatch):
+    assert _read_session(monkeypatch) == "replica"
+
+
+def test_lagging_replica_falls_back_to_primary(monkeypatch):
+    assert _read_session(monkeypatch, replica_ok=False) == "primary"
+
+
+def test_recent_writer_reads_primary(monkeypatch):
+    assert _read_session(monkeypatch, cookies={database.PRIMARY_COOKIE: "1"}) == "primary"
+
+
+def test_unreachable_replica_falls_back_and_is_disabled(monkeypatch):
+    assert _read_session(monkeypatch, replica_fails=True) == "primary"
+    assert database._replica_ok is False
+
+
+def test_write_sets_primary_cookie():
+    async def ok(request):
+        return PlainTextResponse("ok")
+
+    async def rejected(request):
+        return PlainTextResponse("no", status_code=422)
+
+    app = Starlette(routes=[Route("/ok", ok, methods=["GET", "POST"]), Route("/bad", rejected, methods=["POST"])])
+    app.add_middleware(ReadYourWritesMiddleware, cookie_name="read_primary", max_age=10)
+    client = TestClient(app)
+
+    assert "read_primary" in client.post("/ok").headers.get("set-cookie", "")
+    assert "set-cookie" not in client.get("/ok").headers
+    assert "set-cookie" not in client.post("/bad").headers
+
+
+def _check_replica(monkeypatch, lag):
+    class Connection:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, stmt):
+            return SimpleNamespace(scalar_one=lambda: lag)
+
+    monkeypatch.setattr(database, "replica_engine", SimpleNamespace(connect=Connection))
+    monkeypatch.setattr(database, "_replica_ok", True)
+    monkeypatch.setattr(database, "_replica_lag", 0.0)
+    asyncio.run(database.check_replica())
+    return database.replica_status()
+
+
+def test_replica_that_stopped_streaming_is_disabled(monkeypatch):
+    # NULL from the lag query: the WAL receiver isn't streaming from the primary
+    status = _check_replica(monkeypatch, None)
+    assert status["ok"] is False and status["lag"] is None
+    assert "pg_stat_wal_receiver WHERE status = 'streaming'" in str(database._REPLICA_LAG_SQL)
+
+
+def test_replica_within_lag_limit_is_enabled(monkeypatch):
+    status = _check_replica(monkeypatch, 0)
+    assert status["ok"] is True and status["lag"] == 0.0
@@ -0,0 +1,40 @@
+from app.utils import responsive
+from app.utils.markdown import render_markdown
+
+VARIANTS = [
+    ("webp", 480, 240, "photo-480w.webp"),
+    ("webp", 960, 480, "photo-960w.webp"),
+    ("avif", 480, 240, "photo-480w.avif"),
+]
+
+
+def setup_module():
+    responsive.set_variants("photo.jpg", VARIANTS)
+
+
+def teardown_module():
+    responsive.drop_variants("photo.jpg")
+
+
+def test_picture_with_variants():
+    html = responsive.picture("/static/uploads/photo.jpg", "Alt")
+    assert html.startswith("<picture>")
+    assert html.index('type="image/avif"') < html.index('type="image/webp"')
+    assert "/static/uploads/variants/photo-960w.webp 960w" in html
+    assert 'width="960" height="480"' in html
+
+
+def test_picture_without_variants():
+    html = responsive.picture("https://example.com/img.jpg", "Alt")
+    assert html == '<img src="https://example.com/img.jpg" alt="Alt" loading="lazy">'
+
+
+def test_markdown_images_get_srcset():
+    result = render_markdown("![alt](/static/uploads/photo.jpg)")
+    assert "<picture>" in result
+    assert "photo-480w.avif 480w" in result
+
+
+def test_markdown_unknown_images_untouched():
+    result = render_markdown("![alt](/static/uploads/other.jpg)")
+    assert "<picture>" not in result
@@ -27,3 +27,62 @@ def test_numbers():
 
 def test_empty_string():
     assert generate_slug("") == ""
+
+
+def test_first_free_slug():
+    from app.services.article_service import first_free_slug
+
+    assert first_free_slug("etf", set()) == "etf"
+    assert first_free_slug("etf", {"etf", "etf-2", "etf-4"}) == "etf-3"
+
+
+def test_slug_family_pattern():
+    import re
+
+    from app.services.article_service import slug_family_pattern
+
+    pattern = re.compile(slug_family_pattern(["etf"]))
+    assert pattern.match("etf") and pattern.match("etf-12")
+    assert not pattern.match("etf-global") and not pattern.match("x-etf")
+
+
+class _FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return iter(self.rows)
+
+    def all(self):
+        return self.rows
+
+
+class _FakeSession:
+    """Answers the two index queries; on_execute runs mid-load."""
+
+    def __init__(self, on_execute=lambda: None):
+        self.on_execute = on_execute
+        self.calls = 0
+
+    async def execute(self, stmt):
+        self.calls += 1
+        self.on_execute()
+        return _FakeResult(["jak-zaczac"] if self.calls == 1 else [("stary", "jak-zaczac")])
+
+
+def test_slug_index_invalidated_mid_load_stays_stale(monkeypatch):
+    import asyncio
+
+    from app.services import slug_service
+
+    monkeypatch.setattr(slug_service, "_generation", 1)
+    monkeypatch.setattr(slug_service, "_loaded_generation", 0)
+    monkeypatch.setattr(slug_service, "_published", frozenset())
+    monkeypatch.setattr(slug_service, "_redirects", {})
+    asyncio.run(slug_service.load_slug_index(_FakeSession(on_execute=slug_service.invalidate_slug_index)))
+    assert slug_service.is_published_slug("jak-zaczac")
+    assert slug_service._loaded_generation != slug_service._generation
+
+    asyncio.run(slug_service.load_slug_index(_FakeSession()))
+    assert slug_service._loaded_generation == slug_service._generation
+    assert slug_service.lookup_redirect("stary") == "jak-zaczac"
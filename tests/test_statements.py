@@ -0,0 +1,16 @@
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app.services.article_service import _published_summaries_stmts
+from app.services.search_service import _SEARCH
+
+
+def test_listing_statements_are_built_once():
+    assert _published_summaries_stmts("created_at", False) is _published_summaries_stmts("created_at", False)
+    assert _published_summaries_stmts("created_at", True) is not _published_summaries_stmts("created_at", False)
+
+
+def test_prebuilt_statements_bind_request_values():
+    page, count = _published_summaries_stmts("published_at", True)
+    assert {"category_id", "offset", "limit"} <= set(page.compile(dialect=asyncpg.dialect()).params)
+    assert "category_id" in count.compile(dialect=asyncpg.dialect()).params
+    assert {"q", "limit"} <= set(_SEARCH.compile(dialect=asyncpg.dialect()).params)
@@ -0,0 +1,42 @@
+import asyncio
+
+from app.utils import offload
+from app.utils.textdelta import apply_delta, html_diff_table, make_delta, pack_text, unpack_text
+
+BASE = "".join(f"Akapit {i}: " + "treść " * 40 + "\n" for i in range(200))
+
+
+def test_roundtrip_edit():
+    new = BASE.replace("Akapit 10:", "Akapit dziesiąty:").replace("Akapit 150: ", "") + "Nowe zakończenie"
+    assert apply_delta(BASE, make_delta(BASE, new)) == new
+
+
+def test_roundtrip_edge_cases():
+    for old, new in [("", "abc"), ("abc", ""), ("a\nb", "a\nb\n"), ("x\r\ny\n", "x\r\nz\n")]:
+        assert apply_delta(old, make_delta(old, new)) == new
+
+
+def test_small_edit_gives_small_delta():
+    new = BASE.replace("Akapit 100:", "Akapit sto:")
+    assert len(make_delta(BASE, new)) < len(pack_text(new)) / 10
+
+
+def test_pack_text():
+    assert unpack_text(pack_text(BASE)) == BASE
+
+
+def test_delta_and_diff_table_run_in_process_pool():
+    new = BASE.replace("Akapit 10:", "Akapit dziesiąty:")
+
+    async def run():
+        delta = await offload.run_in_process("revision_delta", make_delta, BASE, new)
+        table = await offload.run_in_process("revision_diff", html_diff_table, BASE, new, "Rewizja 1", "Rewizja 2")
+        return delta, table
+
+    try:
+        delta, table = asyncio.run(run())
+    finally:
+        offload.shutdown_pools()
+    assert apply_delta(BASE, delta) == new
+    assert "Rewizja 2" in table and "dziesiąty" in table
+    assert offload.processes.stats["revision_diff"].calls == 1
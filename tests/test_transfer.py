@@ -0,0 +1,135 @@
+import asyncio
+import io
+import zipfile
+from types import SimpleNamespace
+
+from app.services import transfer_service
+
+
+def test_markdown_file_frontmatter():
+    text = transfer_service._markdown_file({"title": 'Cytat "FIRE"', "tags": ["a", "b"], "excerpt": None}, "Treść")
+    assert text == '---\ntitle: "Cytat \\"FIRE\\""\ntags: ["a", "b"]\n---\n\nTreść'
+
+
+def test_markdown_zip_is_streamed_and_valid(monkeypatch):
+    async def fake_rows(session, kind):
+        if kind == "article":
+            for batch in range(2):
+                yield [{"slug": f"post-{batch}-{i}", "title": "T", "content_md": "# x", "content_html": "<h1>x</h1>"}
+                       for i in range(3)]
+        elif kind == "tag":
+            yield [{"slug": "etf", "name": "ETF"}]
+
+    monkeypatch.setattr(transfer_service, "_stream_rows", fake_rows)
+
+    async def collect():
+        return [chunk async for chunk in transfer_service.export_markdown_zip(None)]
+
+    chunks = asyncio.run(collect())
+    assert len(chunks) > 2
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert archive.testzip() is None
+    assert "articles/post-1-2.md" in archive.namelist()
+    assert archive.read("articles/post-0-0.md").decode().endswith("---\n\n# x")
+    assert archive.read("content.jsonl") == b'{"type": "tag", "slug": "etf", "name": "ETF"}\n'
+
+
+def test_dedupe_keeps_last_row():
+    rows = [{"slug": "a", "n": 1}, {"slug": "b", "n": 2}, {"slug": "a", "n": 3}]
+    assert transfer_service._dedupe(rows, "slug") == [{"slug": "a", "n": 3}, {"slug": "b", "n": 2}]
+
+
+def test_import_skips_rows_with_wrong_field_types(tmp_path, monkeypatch):
+    class FakeSession:
+        committed = False
+
+        async def commit(self):
+            self.committed = True
+
+    monkeypatch.setattr(transfer_service, "invalidate_dashboard_stats", lambda: None)
+    monkeypatch.setattr(transfer_service, "invalidate_slug_index", lambda: None)
+    path = tmp_path / "export.jsonl"
+    path.write_text("\n".join([
+        '{"type": "export", "version": 1}',
+        '{"type": "article", "title": "Tytuł", "slug": 123}',
+        '{"type": "article", "title": "Tytuł", "tags": "etf"}',
+        '{"type": "category", "slug": ["a"]}',
+        '{"type": "media", "filename": "a.png", "file_size": "12"}',
+        '{"type": "comment", "article": {"slug": "a"}, "nickname": "Gość", "content": "Hej"}',
+        '{"type": ["article"]}',
+        '[1, 2]',
+        'nie json',
+    ]))
+    session = FakeSession()
+    result = asyncio.run(transfer_service.import_jsonl(session, path))
+    assert result.skipped == 8
+    assert result.counts == {}
+    assert session.committed
+
+
+def test_valid_row_accepts_exported_types():
+    assert transfer_service._valid_row("article", {
+        "slug": "a", "title": "A", "status": "published", "tags": ["etf"], "category": None,
+    })
+    assert transfer_service._valid_row("media", {"filename": "a.png", "file_size": 12})
+    assert transfer_service._valid_row("comment", {"article": "a", "is_approved": False})
+
+
+class RecordingSession:
+    """Answers each execute() with the next canned rows and records the statement."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        rows = self.results.pop(0) if self.results else []
+        return SimpleNamespace(all=lambda: rows, scalars=lambda: iter(rows))
+
+
+def test_imported_pages_record_media_usage():
+    session = RecordingSession([("o-mnie", 5)], [], [("a.png", 9)])
+    importer = transfer_service._Importer(session)
+    asyncio.run(importer._import_page([{
+        "slug": "o-mnie", "title": "O mnie",
+        "content_md": "![x](/static/uploads/a.png) ![y](/static/uploads/missing.png)",
+        "content_html": "<p></p>",
+    }]))
+    usage_insert = session.statements[-1]
+    assert usage_insert.table.name == "media_usage"
+    assert usage_insert.compile().params == {"media_id_m0": 9, "page_id_m0": 5}
+    delete_usage = session.statements[1]
+    assert delete_usage.table.name == "media_usage" and "page_id" in str(delete_usage)
+    assert importer.result.counts == {"page": 1}
+
+
+def test_media_with_unsafe_filenames_is_skipped():
+    session = RecordingSession()
+    importer = transfer_service._Importer(session)
+    asyncio.run(importer._import_media([
+        {"filename": "../../app/main.py"},
+        {"filename": "sub/dir.png"},
+        {"filename": "plik"},
+        {"filename": "3f2a-b1.png", "file_size": 12},
+    ]))
+    [insert] = session.statements
+    params = insert.compile().params
+    assert params["filename_m0"] == "3f2a-b1.png"
+    assert "filename_m1" not in params
+    assert importer.result.skipped == 3
+    assert importer.result.counts == {"media": 1}
+
+
+def test_generated_article_slugs_avoid_the_batch_explicit_slugs():
+    session = RecordingSession([], [("poradnik", 1), ("poradnik-2", 2), ("poradnik-3", 3)])
+    importer = transfer_service._Importer(session)
+    asyncio.run(importer._import_article([
+        {"title": "Poradnik", "slug": "poradnik", "content_html": "<p></p>"},
+        {"title": "Poradnik", "content_html": "<p></p>"},
+        {"title": "Poradnik", "slug": "!!!", "content_html": "<p></p>"},
+    ]))
+    insert = session.statements[1]
+    params = insert.compile().params
+    assert sorted(v for k, v in params.items() if k.startswith("slug_m")) == ["poradnik", "poradnik-2", "poradnik-3"]
+    assert importer.result.counts == {"article": 3}
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from app.utils.uploads import CSRFRejected, UploadRejected, stream_multipart
+
+BOUNDARY = "xyz"
+
+
+def _request(body: bytes, content_type: str = f"multipart/form-data; boundary={BOUNDARY}") -> Request:
+    sent = []
+
+    async def receive():
+        if sent:
+            return {"type": "http.disconnect"}
+        sent.append(True)
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    scope = {"type": "http", "method": "POST", "path": "/", "headers": [(b"content-type", content_type.encode())]}
+    return Request(scope, receive)
+
+
+def _stream(request, tmp_path):
+    return asyncio.run(stream_multipart(
+        request, dest_dir=tmp_path, max_file_size=1024, allowed_types={"image/png"}, csrf_token="good",
+    ))
+
+
+def test_wrong_csrf_token_is_rejected_with_403(tmp_path):
+    body = (
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"csrf_token\"\r\n\r\nbad\r\n"
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.png\"\r\n"
+        f"Content-Type: image/png\r\n\r\nPNG\r\n--{BOUNDARY}--\r\n"
+    ).encode()
+    with pytest.raises(CSRFRejected) as exc:
+        _stream(_request(body), tmp_path)
+    assert exc.value.status_code == 403
+    assert not list(tmp_path.iterdir())
+
+
+def test_non_multipart_body_is_rejected_with_400(tmp_path):
+    with pytest.raises(UploadRejected) as exc:
+        _stream(_request(b"a=1", "application/x-www-form-urlencoded"), tmp_path)
+    assert not isinstance(exc.value, CSRFRejected)
+    assert exc.value.status_code == 400